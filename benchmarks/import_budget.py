@@ -0,0 +1,105 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# ---------------------------------------------------------
+# Cek budget waktu import (untuk CI). Setiap entry point diimport di interpreter baru dengan
+# `python -X importtime`, diulang beberapa kali, dan diambil waktu tercepat.
+# Exit code 1 jika waktu import kumulatif melebihi budget, atau jika modul berat yang
+# seharusnya lazy (plotting, scikit-learn, gdown) ikut termuat saat import.
+# ---------------------------------------------------------
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+ENTRY_POINTS = {
+    "etl_pipeline": ["main1", "ingest_service", "analytics_runner", "index_advisor"],
+    "elt_pipeline": ["elt_runner"],
+}
+BUDGET_SECONDS = float(os.getenv("IMPORT_BUDGET_SECONDS", "1.0"))
+# Hanya boleh dimuat saat benar-benar dipakai (plot, notebook, download sumber data)
+LAZY_MODULES = ("matplotlib", "seaborn", "sklearn", "gdown")
+REPEAT = 3
+
+
+def _parse_importtime(stderr):
+    """Baris `-X importtime` -> list (nama modul, kedalaman, cumulative detik)"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), depth, int(cumulative) / 1e6))
+    return entries
+
+
+def measure(package, module):
+    """Satu kali import 'module' di interpreter baru; mengembalikan (detik, modul langsung, semua modul)"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=os.path.join(REPO_DIR, package), capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} gagal:\n{proc.stderr.strip().splitlines()[-1]}")
+    entries = _parse_importtime(proc.stderr)
+    seconds = next(c for name, depth, c in reversed(entries) if name == module and depth == 0)
+    direct = sorted(((name, c) for name, depth, c in entries if depth == 1), key=lambda e: -e[1])
+    return seconds, direct, {name for name, _, _ in entries}
+
+
+def check(package, module, budget, repeat=REPEAT):
+    try:
+        runs = [measure(package, module) for _ in range(repeat)]
+    except RuntimeError as e:
+        return {"entry_point": f"{package}/{module}", "budget_seconds": budget, "error": str(e), "ok": False}
+    seconds, direct, modules = min(runs, key=lambda r: r[0])
+    lazy = sorted({m.split(".")[0] for m in modules} & set(LAZY_MODULES))
+    return {
+        "entry_point": f"{package}/{module}",
+        "import_seconds": round(seconds, 4),
+        "budget_seconds": budget,
+        "heaviest": [{"module": name, "seconds": round(c, 4)} for name, c in direct[:3]],
+        "lazy_violations": lazy,
+        "ok": seconds <= budget and not lazy,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cek budget waktu import entry point pipeline")
+    parser.add_argument("--budget", type=float, default=BUDGET_SECONDS,
+                        help="Budget waktu import per entry point (detik, env IMPORT_BUDGET_SECONDS)")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="Jumlah pengulangan (diambil tercepat)")
+    parser.add_argument("--output", help="Simpan hasil ke file JSON")
+    args = parser.parse_args()
+
+    results = []
+    for package, modules in ENTRY_POINTS.items():
+        for module in modules:
+            result = check(package, module, args.budget, args.repeat)
+            results.append(result)
+            if "error" in result:
+                print(f"❌ FAIL {result['entry_point']:<32} {result['error']}")
+                continue
+            status = "✅ PASS" if result["ok"] else "❌ FAIL"
+            heaviest = ", ".join(f"{h['module']} {h['seconds']:.3f}s" for h in result["heaviest"])
+            print(f"{status} {result['entry_point']:<32} {result['import_seconds']:.3f}s "
+                  f"(budget {args.budget:.2f}s) | terberat: {heaviest}")
+            if result["lazy_violations"]:
+                print(f"      ⚠️ Modul yang seharusnya lazy ikut diimport: {result['lazy_violations']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"   -> Hasil disimpan ke {args.output}")
+
+    failed = [r["entry_point"] for r in results if not r["ok"]]
+    if failed:
+        print(f"\n[FAILED] Budget import terlampaui: {failed}")
+        sys.exit(1)
+    print("\n[SUCCESS] Semua entry point dalam budget import.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import argparse
+import json
+import os
+import random
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+import synthetic_data
+
+# ---------------------------------------------------------
+# Mock server Open-Meteo Historical API (/v1/archive) untuk menguji etl_pipeline/weather_api.py
+# tanpa internet. Data dilayani dari Weather.csv + city_locations.csv (misal hasil
+# synthetic_data.py), sehingga output extractor API bisa dibandingkan langsung dengan CSV.
+# - latitude/longitude boleh berisi banyak koordinat (dipisah koma) -> respons berupa list
+# - --fail-rate menyisipkan respons 429/503 acak untuk menguji retry, --latency menambah jeda
+# Contoh:
+#   python mock_open_meteo.py --data-dir data/100k --port 8765
+#   OPEN_METEO_URL=http://127.0.0.1:8765/v1/archive python main1.py --weather-source api \
+#       --city-locations ../benchmarks/data/100k/city_locations.csv
+# ---------------------------------------------------------
+
+UNITS = {name.split(" (")[0]: name.split(" (")[1].rstrip(")") for name in synthetic_data.WEATHER_HEADER[2:]}
+
+
+def load_archive(data_dir):
+    """{(lat, lon): DataFrame per lokasi} dari Weather.csv + city_locations.csv di data_dir"""
+    weather = pd.read_csv(os.path.join(data_dir, "Weather.csv"), sep=";")
+    weather.columns = ["location_id", "time"] + [c.split(" (")[0] for c in weather.columns[2:]]
+    locations = pd.read_csv(os.path.join(data_dir, "city_locations.csv"))
+    archive = {}
+    for loc in locations.itertuples(index=False):
+        frame = weather[weather["location_id"] == loc.location_id].sort_values("time", kind="stable")
+        archive[(round(loc.latitude, 4), round(loc.longitude, 4))] = frame.reset_index(drop=True)
+    return archive
+
+
+def _location_payload(frame, lat, lon, start, end, variables):
+    times = frame["time"].to_numpy(dtype=object)
+    lo = np.searchsorted(times, f"{start}T00:00", side="left")
+    hi = np.searchsorted(times, f"{end}T23:59", side="right")
+    part = frame.iloc[lo:hi]
+    hourly = {"time": part["time"].tolist()}
+    for v in variables:
+        values = part[v].astype(object).where(part[v].notna(), None)
+        hourly[v] = values.tolist()
+    return {
+        "latitude": lat, "longitude": lon, "utc_offset_seconds": 0, "timezone": "GMT",
+        "hourly_units": {"time": "iso8601", **{v: UNITS.get(v, "") for v in variables}},
+        "hourly": hourly,
+    }
+
+
+def make_handler(archive, fail_rate=0.0, latency=0.0, seed=0):
+    rng = random.Random(seed)
+    lock = threading.Lock()
+    stats = {"requests": 0, "failures": 0, "locations": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, payload, headers=()):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in headers:
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urllib.parse.urlparse(self.path)
+            with lock:
+                stats["requests"] += 1
+                fail = rng.random() < fail_rate
+                status = rng.choice([429, 503]) if fail else 200
+                stats["failures"] += fail
+            if latency:
+                time.sleep(latency)
+            if url.path != "/v1/archive":
+                return self._send(404, {"error": True, "reason": f"Unknown path {url.path}"})
+            if fail:
+                return self._send(status, {"error": True, "reason": "Injected failure"}, [("Retry-After", "0")])
+
+            query = {k: v[0] for k, v in urllib.parse.parse_qs(url.query).items()}
+            try:
+                lats = [float(x) for x in query["latitude"].split(",")]
+                lons = [float(x) for x in query["longitude"].split(",")]
+                start, end = query["start_date"], query["end_date"]
+                variables = query["hourly"].split(",")
+            except (KeyError, ValueError) as e:
+                return self._send(400, {"error": True, "reason": f"Invalid parameters: {e}"})
+            if len(lats) != len(lons):
+                return self._send(400, {"error": True, "reason": "latitude/longitude length mismatch"})
+
+            items = []
+            for lat, lon in zip(lats, lons):
+                frame = archive.get((round(lat, 4), round(lon, 4)))
+                if frame is None:
+                    return self._send(400, {"error": True, "reason": f"No data for {lat},{lon}"})
+                unknown = [v for v in variables if v not in frame.columns]
+                if unknown:
+                    return self._send(400, {"error": True, "reason": f"Unknown variables {unknown}"})
+                items.append(_location_payload(frame, lat, lon, start, end, variables))
+            with lock:
+                stats["locations"] += len(items)
+            self._send(200, items if len(items) > 1 else items[0])
+
+    return Handler, stats
+
+
+def serve(data_dir, host="127.0.0.1", port=0, fail_rate=0.0, latency=0.0, seed=0):
+    """Menjalankan server di thread background. Mengembalikan (server, base_url, stats)."""
+    handler, stats = make_handler(load_archive(data_dir), fail_rate, latency, seed)
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1/archive", stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Open-Meteo Historical API dari Weather.csv")
+    parser.add_argument("--data-dir", required=True, help="Folder berisi Weather.csv & city_locations.csv")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Peluang respons 429/503 per request")
+    parser.add_argument("--latency", type=float, default=0.0, help="Jeda per request (detik)")
+    args = parser.parse_args()
+
+    server, url, stats = serve(args.data_dir, args.host, args.port, args.fail_rate, args.latency)
+    print(f"Mock Open-Meteo di {url} (Ctrl+C untuk berhenti)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(f"Request: {stats['requests']} ({stats['failures']} gagal disengaja), lokasi: {stats['locations']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,439 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import synthetic_data
+
+# ---------------------------------------------------------
+# Benchmark harness ETL (main1.py) & ELT (elt_runner.py) dengan data sintetis.
+# Setiap (skala, pipeline) dijalankan di subprocess tersendiri agar pengukuran
+# memori bersih. Per fase dicatat wall time, CPU time, peak RSS (sampling),
+# delta RSS dan jumlah baris, lalu ditambahkan ke file JSON Lines bersama
+# commit git sehingga regresi bisa dilacak antar commit.
+# --top-n menjalankan ETL untuk beberapa N (jumlah kota teratas) dengan Weather.csv &
+# city_locations.csv berisi N lokasi, untuk melihat biaya merge & load seiring N.
+# ---------------------------------------------------------
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+DATA_DIR = os.path.join(BENCH_DIR, "data")
+RESULTS_FILE = os.path.join(BENCH_DIR, "results", "benchmarks.jsonl")
+PIPELINES = ("etl", "elt")
+SAMPLE_INTERVAL = 0.02
+DEFAULT_TOP_N = synthetic_data.DEFAULT_LOCATIONS
+SCALING_PHASES = ("filter", "standardization", "merging", "load_fact")
+
+
+# ---------------------------------------------------------
+# PENGUKURAN MEMORI
+# ---------------------------------------------------------
+def _rss_mb():
+    """RSS proses saat ini (MB). Linux: /proc/self/statm, fallback: ru_maxrss."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError, AttributeError):
+        return _max_rss_mb()
+
+
+def _max_rss_mb():
+    """High-water mark RSS proses sejak start (MB)"""
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+class _PeakSampler(threading.Thread):
+    """Thread yang membaca RSS secara periodik dan menyimpan nilai tertinggi"""
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = _rss_mb()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.peak = max(self.peak, _rss_mb())
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        self.peak = max(self.peak, _rss_mb())
+        return self.peak
+
+
+class PhaseRecorder:
+    """
+    Mencatat metrik per fase ke file JSON Lines (satu baris per fase, ditulis langsung
+    agar hasil parsial tetap ada jika proses mati karena kehabisan memori).
+    """
+
+    def __init__(self, pipeline, result_file):
+        self.pipeline = pipeline
+        self.result_file = result_file
+
+    @contextmanager
+    def phase(self, name):
+        info = {"rows": None}
+        rss_before = _rss_mb()
+        sampler = _PeakSampler()
+        sampler.start()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        status, error = "ok", None
+        try:
+            yield info
+        except Exception as e:
+            status, error = "error", f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            record = {
+                "pipeline": self.pipeline,
+                "phase": name,
+                "status": status,
+                "seconds": round(time.perf_counter() - wall_start, 4),
+                "cpu_seconds": round(time.process_time() - cpu_start, 4),
+                "peak_rss_mb": round(sampler.stop(), 2),
+                "rss_delta_mb": round(_rss_mb() - rss_before, 2),
+                "max_rss_mb": round(_max_rss_mb(), 2),
+                "rows": info["rows"],
+            }
+            for key, value in info.items():
+                if key != "rows":
+                    record[key] = value
+            if error:
+                record["error"] = error
+            with open(self.result_file, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+
+
+# ---------------------------------------------------------
+# WORKER: ETL (graf fase main1.build_phase_graph, sekuensial tanpa plot)
+# ---------------------------------------------------------
+def _rows(value):
+    """Jumlah baris dari DataFrame, tuple (DataFrame pertama) atau tabel star schema (fact)"""
+    if isinstance(value, dict) and "fact_flights" in value:
+        value = value["fact_flights"]["frame"]
+    if isinstance(value, (tuple, list)):
+        value = next((v for v in value if hasattr(v, "shape")), None)
+    return len(value) if hasattr(value, "shape") else None
+
+
+def _recorded(recorder, name, func):
+    """
+    Membungkus task scheduler dengan recorder.phase. Sub-step instrumentation milik task
+    (misal COPY per tabel, refresh rollup) ikut dicatat di field 'steps'.
+    """
+    import instrumentation
+
+    def run(*args):
+        with recorder.phase(name) as p:
+            result = func(*args)
+            p["rows"] = _rows(result)
+            if p["rows"] is None:
+                p["rows"] = next((r for r in map(_rows, args) if r is not None), None)
+            steps = [r for r in instrumentation.get_records() if r["depth"] == 1 and r["step"].startswith(f"{name}.")]
+            if steps:
+                p["steps"] = [{"step": r["step"][len(name) + 1:], "seconds": round(r["wall_seconds"], 4),
+                               "rows": r["rows_out"]} for r in steps]
+        return result
+    return run
+
+
+def run_etl_phases(recorder, skip_db=False):
+    sys.path.insert(0, os.path.join(REPO_DIR, "etl_pipeline"))
+    import column_plan
+    import export_columnar
+    import instrumentation
+    import main1
+    import phase_scheduler
+
+    # Sama dengan main1 --workers 1 --no-plots: waktu per fase tidak saling tumpang tindih
+    instrumentation.start_run("etl")
+    column_plan.reset()
+    scheduler = phase_scheduler.PhaseScheduler(max_workers=1)
+    main1.build_phase_graph(scheduler, plots=False, load=not skip_db)
+    for name, task in scheduler.tasks.items():
+        task["func"] = _recorded(recorder, name, task["func"])
+
+    shutil.rmtree(os.path.abspath(export_columnar.EXPORT_DIR), ignore_errors=True)  # export penuh, bukan incremental
+    try:
+        scheduler.run()
+    finally:
+        main1.rollback_unfinished_load(scheduler)
+
+
+# ---------------------------------------------------------
+# WORKER: ELT (setiap stage elt_runner diukur terpisah)
+# ---------------------------------------------------------
+def run_elt_stages(recorder, ingest_workers=4):
+    sys.path.insert(0, os.path.join(REPO_DIR, "elt_pipeline"))
+    import psycopg2
+    import elt_runner
+
+    conn_args = elt_runner.conn_args_from_env()
+    paths = {
+        "flights": os.path.abspath("Flight.csv"),
+        "weather": os.path.abspath("Weather.csv"),
+        "weather_location": None,
+        "ingest_workers": ingest_workers,
+    }
+    for name, _ in elt_runner.STAGES:
+        with recorder.phase(name) as p:
+            report = elt_runner.run_elt(paths, [name], conn_args)
+            p["rows"] = report[0]["rows"]
+            conn = psycopg2.connect(**conn_args)
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT pg_database_size(current_database());")
+                    p["db_size_mb"] = round(cur.fetchone()[0] / 1024 / 1024, 2)
+            finally:
+                conn.close()
+
+
+def worker_main(args):
+    """Mode subprocess: cwd = folder data, hasil per fase ke --result-file"""
+    recorder = PhaseRecorder(args.worker, args.result_file)
+    if args.worker == "etl":
+        run_etl_phases(recorder, skip_db=args.skip_db)
+    else:
+        run_elt_stages(recorder, ingest_workers=args.ingest_workers)
+
+
+# ---------------------------------------------------------
+# ORKESTRASI
+# ---------------------------------------------------------
+def _git_commit():
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=REPO_DIR,
+                               capture_output=True, text=True, check=True).stdout.strip()
+        return sha + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def ensure_data(scale, n_rows, seed, data_root=DATA_DIR):
+    """Membuat data sintetis untuk satu skala jika belum ada (di-cache per skala & seed)"""
+    out_dir = os.path.join(data_root, f"{scale}-seed{seed}")
+    marker = os.path.join(out_dir, "generated.json")
+    if os.path.exists(marker):
+        return out_dir, None
+    print(f"   -> Generate data {scale} ({n_rows:,} baris) ...")
+    stats = synthetic_data.generate(out_dir, n_rows, seed)
+    with open(marker, "w", encoding="utf-8") as f:
+        json.dump(stats, f, indent=2)
+    return out_dir, stats
+
+
+def ensure_top_n_data(data_dir, top_n, seed):
+    """
+    Folder data untuk top N kota: Flight.csv di-link dari folder skala, Weather.csv &
+    city_locations.csv dibuat untuk N lokasi. N default memakai folder skala apa adanya.
+    """
+    if top_n == DEFAULT_TOP_N:
+        return data_dir, None
+    out_dir = os.path.join(data_dir, f"top{top_n}")
+    marker = os.path.join(out_dir, "generated.json")
+    if os.path.exists(marker):
+        return out_dir, None
+    os.makedirs(out_dir, exist_ok=True)
+    flight_path = os.path.join(out_dir, "Flight.csv")
+    if not os.path.exists(flight_path):
+        try:
+            os.link(os.path.join(data_dir, "Flight.csv"), flight_path)
+        except OSError:
+            shutil.copyfile(os.path.join(data_dir, "Flight.csv"), flight_path)
+    print(f"   -> Generate Weather.csv untuk {top_n} lokasi ...")
+    stats = synthetic_data.generate_weather(out_dir, seed, n_locations=top_n)
+    with open(marker, "w", encoding="utf-8") as f:
+        json.dump(stats, f, indent=2)
+    return out_dir, stats
+
+
+def run_worker(pipeline, data_dir, log_path, skip_db=False, ingest_workers=4, verbose=False,
+               top_n=DEFAULT_TOP_N):
+    """Menjalankan satu pipeline di subprocess; mengembalikan (records, returncode)"""
+    result_file = os.path.join(data_dir, f"_{pipeline}_result.jsonl")
+    if os.path.exists(result_file):
+        os.remove(result_file)
+
+    cmd = [sys.executable, os.path.abspath(__file__), "--worker", pipeline,
+           "--result-file", result_file, "--ingest-workers", str(ingest_workers)]
+    if skip_db:
+        cmd.append("--skip-db")
+    env = dict(os.environ, MPLBACKEND="Agg", PYTHONUNBUFFERED="1", ETL_TOP_N=str(top_n))
+    locations_file = os.path.join(data_dir, "city_locations.csv")
+    if os.path.exists(locations_file):  # cache data lama tanpa kamus: pakai kamus bawaan (10 kota)
+        env["ETL_CITY_LOCATIONS"] = locations_file
+
+    with open(log_path, "w", encoding="utf-8") as log:
+        proc = subprocess.run(cmd, cwd=data_dir, env=env,
+                              stdout=None if verbose else log, stderr=subprocess.STDOUT)
+
+    records = []
+    if os.path.exists(result_file):
+        with open(result_file, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        os.remove(result_file)
+    return records, proc.returncode
+
+
+def print_summary(records):
+    print(f"\n{'scale':<8}{'top_n':>6}  {'pipeline':<10}{'phase':<30}{'rows':>12}{'seconds':>11}{'cpu':>10}"
+          f"{'peak MB':>10}{'ΔMB':>10}")
+    for r in records:
+        rows = f"{r['rows']:,}" if r.get("rows") is not None else "-"
+        flag = "" if r["status"] == "ok" else f"  [{r['status']}]"
+        print(f"{r['scale']:<8}{r.get('top_n', DEFAULT_TOP_N):>6}  {r['pipeline']:<10}{r['phase']:<30}{rows:>12}{r['seconds']:>11.3f}"
+              f"{r.get('cpu_seconds') or 0:>10.3f}{r.get('peak_rss_mb') or 0:>10.1f}{r.get('rss_delta_mb') or 0:>10.1f}{flag}")
+
+
+def print_top_n_scaling(records):
+    """Biaya fase ETL utama per N relatif terhadap N terkecil (per skala)"""
+    ok = [r for r in records if r["pipeline"] == "etl" and r["status"] == "ok" and r["phase"] in SCALING_PHASES]
+    if len({r["top_n"] for r in ok}) < 2:
+        return
+    print("\n--- Skala top N kota (rasio waktu terhadap N terkecil) ---")
+    print(f"{'scale':<8}{'phase':<18}{'top_n':>6}{'rows':>12}{'seconds':>11}{'x':>8}{'peak MB':>10}")
+    for scale in dict.fromkeys(r["scale"] for r in ok):
+        for phase in SCALING_PHASES:
+            rows = sorted((r for r in ok if r["scale"] == scale and r["phase"] == phase), key=lambda r: r["top_n"])
+            for r in rows:
+                ratio = r["seconds"] / max(rows[0]["seconds"], 1e-9)
+                print(f"{scale:<8}{phase:<18}{r['top_n']:>6}{r['rows'] or 0:>12,}{r['seconds']:>11.3f}"
+                      f"{ratio:>8.2f}{r['peak_rss_mb']:>10.1f}")
+
+
+def compare_with(results_file, baseline_commit, records):
+    """Membandingkan hasil run ini dengan run terakhir milik 'baseline_commit'"""
+    run_ids = {r["run_id"] for r in records}
+    baseline = {}
+    with open(results_file, encoding="utf-8") as f:
+        for line in f:
+            r = json.loads(line)
+            if (r.get("git_commit", "").startswith(baseline_commit) and r["status"] == "ok"
+                    and r.get("run_id") not in run_ids):
+                baseline[(r["scale"], r.get("top_n", DEFAULT_TOP_N), r["pipeline"], r["phase"])] = r
+    if not baseline:
+        print(f"\n   ⚠️ Tidak ada hasil untuk commit {baseline_commit} di {results_file}")
+        return
+
+    print(f"\n--- Komparasi dengan commit {baseline_commit} (rasio > 1 = lebih lambat/boros) ---")
+    print(f"{'scale':<8}{'pipeline':<10}{'phase':<30}{'time x':>10}{'peak MB x':>12}")
+    for r in records:
+        base = baseline.get((r["scale"], r.get("top_n", DEFAULT_TOP_N), r["pipeline"], r["phase"]))
+        if base is None or r["status"] != "ok":
+            continue
+        t = r["seconds"] / max(base["seconds"], 1e-9)
+        m = r["peak_rss_mb"] / max(base["peak_rss_mb"], 1e-9)
+        print(f"{r['scale']:<8}{r['pipeline']:<10}{r['phase']:<30}{t:>10.2f}{m:>12.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ETL & ELT dengan data sintetis multi-skala")
+    parser.add_argument("--scales", nargs="+", default=["100k"],
+                        help="Skala data: 100k 1m 10m 50m atau jumlah baris (default: 100k)")
+    parser.add_argument("--pipelines", nargs="+", choices=PIPELINES, default=list(PIPELINES))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--top-n", nargs="+", type=int, default=[DEFAULT_TOP_N],
+                        help="Jumlah kota teratas, misal 10 25 50 100 (N > 10 hanya ETL)")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="Cache data sintetis per skala")
+    parser.add_argument("--output", default=RESULTS_FILE, help="File JSON Lines hasil (di-append)")
+    parser.add_argument("--skip-db", action="store_true", help="ETL tanpa fase load (ELT dilewati)")
+    parser.add_argument("--ingest-workers", type=int, default=4, help="Koneksi COPY paralel untuk ELT")
+    parser.add_argument("--compare", metavar="COMMIT", help="Bandingkan dengan hasil commit tertentu")
+    parser.add_argument("--verbose", action="store_true", help="Tampilkan output pipeline (default: ke log)")
+    parser.add_argument("--worker", choices=PIPELINES, help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker_main(args)
+        return
+
+    pipelines = [p for p in args.pipelines if not (args.skip_db and p == "elt")]
+    output = os.path.abspath(args.output)
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    log_dir = os.path.join(os.path.dirname(output), "logs")
+    os.makedirs(log_dir, exist_ok=True)
+
+    run_info = {
+        "run_id": uuid.uuid4().hex[:12],
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "host": platform.node(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "seed": args.seed,
+    }
+    print(f"Benchmark run {run_info['run_id']} @ {run_info['git_commit']}")
+
+    records = []
+    for scale in args.scales:
+        n_rows = synthetic_data.parse_rows(scale)
+        data_dir, gen_stats = ensure_data(scale, n_rows, args.seed, args.data_dir)
+        if gen_stats:
+            records.append({"pipeline": "data", "phase": "generate", "status": "ok", "rows": n_rows,
+                            "seconds": round(gen_stats["flight_seconds"] + gen_stats["weather_seconds"], 4),
+                            "flight_bytes": gen_stats["flight_bytes"], "weather_bytes": gen_stats["weather_bytes"],
+                            "scale": scale, "scale_rows": n_rows, **run_info})
+
+        for top_n in args.top_n:
+            run_dir, weather_stats = ensure_top_n_data(data_dir, top_n, args.seed)
+            if weather_stats:
+                records.append({"pipeline": "data", "phase": "generate_weather", "status": "ok",
+                                "rows": weather_stats["weather_rows"], "seconds": weather_stats["weather_seconds"],
+                                "weather_bytes": weather_stats["weather_bytes"], "top_n": top_n,
+                                "scale": scale, "scale_rows": n_rows, **run_info})
+
+            for pipeline in pipelines:
+                if pipeline == "elt" and top_n != DEFAULT_TOP_N:
+                    print(f"\n   ⚠️ Skip ELT top {top_n}: elt_runner memakai top {DEFAULT_TOP_N} kota (CITY_ORDER)")
+                    continue
+                suffix = "" if top_n == DEFAULT_TOP_N else f"-top{top_n}"
+                log_path = os.path.join(log_dir, f"{scale}{suffix}-{pipeline}.log")
+                print(f"\n>>> {scale} / top {top_n} / {pipeline.upper()} (log: {log_path})")
+                phase_records, returncode = run_worker(pipeline, run_dir, log_path, args.skip_db,
+                                                       args.ingest_workers, args.verbose, top_n)
+                for r in phase_records:
+                    r.update(scale=scale, scale_rows=n_rows, top_n=top_n, **run_info)
+                    print(f"   {'✅' if r['status'] == 'ok' else '❌'} {r['phase']:<30}{r['seconds']:>10.3f} s"
+                          f"{r['peak_rss_mb']:>10.1f} MB")
+                if returncode != 0:
+                    # Proses berhenti (error / OOM): dicatat agar terlihat di riwayat hasil
+                    phase_records.append({"pipeline": pipeline, "phase": "process_exit", "status": "failed",
+                                          "seconds": 0.0, "rows": None, "returncode": returncode, "top_n": top_n,
+                                          "scale": scale, "scale_rows": n_rows, **run_info})
+                    print(f"   ❌ Worker keluar dengan kode {returncode}, lihat {log_path}")
+                records.extend(phase_records)
+
+    with open(output, "a", encoding="utf-8") as f:
+        for r in records:
+            f.write(json.dumps(r) + "\n")
+
+    print_summary(records)
+    print_top_n_scaling(records)
+    print(f"\nHasil ditambahkan ke {output}")
+    if args.compare:
+        compare_with(output, args.compare, records)
+
+
+if __name__ == "__main__":
+    main()
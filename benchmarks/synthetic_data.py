@@ -0,0 +1,416 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+# ---------------------------------------------------------
+# Generator data sintetis (seeded) dengan skema persis Flight.csv & Weather.csv.
+# raw/Flight.csv dan raw/Weather.csv di repo hanya pointer LFS, jadi benchmark
+# memakai data ini agar hasilnya reproducible tanpa download 614 MB.
+# - Flight: kolom & format Kaggle (FL_DATE YYYY-MM-DD, kolom waktu float hhmm),
+#   distribusi kota skewed: 10 kota teratas sama dengan data asli (urutan stabil)
+#   diikuti kota menengah (Zipf) dan ekor kota regional.
+# - Weather: ';'-separated, per jam untuk location_id 0..N-1 sepanjang rentang tanggal (default
+#   N=10), ditambah city_locations.csv (kamus kota -> location_id) untuk N kota teramai.
+# Seed + jumlah baris yang sama selalu menghasilkan file yang identik.
+# ---------------------------------------------------------
+
+SCALES = {"100k": 100_000, "1m": 1_000_000, "10m": 10_000_000, "50m": 50_000_000}
+CHUNK_ROWS = 500_000
+DEFAULT_START = "2019-01-01"
+DEFAULT_END = "2023-08-31"
+DEFAULT_LOCATIONS = 10
+
+FLIGHT_HEADER = [
+    "FL_DATE", "AIRLINE", "AIRLINE_DOT", "AIRLINE_CODE", "DOT_CODE", "FL_NUMBER",
+    "ORIGIN", "ORIGIN_CITY", "DEST", "DEST_CITY", "CRS_DEP_TIME", "DEP_TIME",
+    "DEP_DELAY", "TAXI_OUT", "WHEELS_OFF", "WHEELS_ON", "TAXI_IN", "CRS_ARR_TIME",
+    "ARR_TIME", "ARR_DELAY", "CANCELLED", "CANCELLATION_CODE", "DIVERTED",
+    "CRS_ELAPSED_TIME", "ELAPSED_TIME", "AIR_TIME", "DISTANCE",
+    "DELAY_DUE_CARRIER", "DELAY_DUE_WEATHER", "DELAY_DUE_NAS",
+    "DELAY_DUE_SECURITY", "DELAY_DUE_LATE_AIRCRAFT",
+]
+
+WEATHER_HEADER = [
+    "location_id", "time", "temperature_2m (°C)", "precipitation (mm)", "rain (mm)",
+    "snowfall (cm)", "weather_code (wmo code)", "surface_pressure (hPa)", "cloud_cover (%)",
+    "cloud_cover_low (%)", "wind_speed_10m (km/h)", "wind_speed_100m (km/h)",
+    "wind_direction_10m (°)", "wind_direction_100m (°)", "wind_gusts_10m (km/h)",
+]
+
+# (kota, bandara, lat, lon, bobot) -- bobot top 10 mengikuti proporsi data asli
+TOP_CITIES = [
+    ("Chicago, IL", ["ORD", "MDW"], 41.88, -87.63, 0.055),
+    ("Atlanta, GA", ["ATL"], 33.75, -84.39, 0.050),
+    ("Dallas/Fort Worth, TX", ["DFW"], 32.90, -97.04, 0.045),
+    ("Denver, CO", ["DEN"], 39.74, -104.99, 0.042),
+    ("New York, NY", ["LGA", "JFK"], 40.71, -74.01, 0.039),
+    ("Charlotte, NC", ["CLT"], 35.23, -80.84, 0.035),
+    ("Houston, TX", ["IAH", "HOU"], 29.76, -95.37, 0.032),
+    ("Los Angeles, CA", ["LAX"], 34.05, -118.24, 0.030),
+    ("Washington, DC", ["DCA", "IAD"], 38.91, -77.04, 0.028),
+    ("Phoenix, AZ", ["PHX"], 33.45, -112.07, 0.026),
+]
+
+MID_CITIES = [
+    ("Las Vegas, NV", ["LAS"], 36.17, -115.14),
+    ("Seattle, WA", ["SEA"], 47.61, -122.33),
+    ("Orlando, FL", ["MCO"], 28.54, -81.38),
+    ("San Francisco, CA", ["SFO"], 37.77, -122.42),
+    ("Minneapolis, MN", ["MSP"], 44.98, -93.27),
+    ("Detroit, MI", ["DTW"], 42.33, -83.05),
+    ("Boston, MA", ["BOS"], 42.36, -71.06),
+    ("Newark, NJ", ["EWR"], 40.74, -74.17),
+    ("Salt Lake City, UT", ["SLC"], 40.76, -111.89),
+    ("Philadelphia, PA", ["PHL"], 39.95, -75.17),
+    ("Miami, FL", ["MIA"], 25.76, -80.19),
+    ("Baltimore, MD", ["BWI"], 39.29, -76.61),
+    ("San Diego, CA", ["SAN"], 32.72, -117.16),
+    ("Nashville, TN", ["BNA"], 36.16, -86.78),
+    ("Dallas, TX", ["DAL"], 32.78, -96.80),
+    ("Austin, TX", ["AUS"], 30.27, -97.74),
+    ("Tampa, FL", ["TPA"], 27.95, -82.46),
+    ("Portland, OR", ["PDX"], 45.52, -122.68),
+    ("St. Louis, MO", ["STL"], 38.63, -90.20),
+    ("Honolulu, HI", ["HNL"], 21.31, -157.86),
+]
+MID_SHARE = 0.33
+N_TAIL_CITIES = 300
+
+AIRLINES = [
+    ("Southwest Airlines Co.", "WN", 19393, 0.19),
+    ("Delta Air Lines Inc.", "DL", 19790, 0.13),
+    ("American Airlines Inc.", "AA", 19805, 0.13),
+    ("SkyWest Airlines Inc.", "OO", 20304, 0.11),
+    ("United Air Lines Inc.", "UA", 19977, 0.09),
+    ("Republic Airline", "YX", 20452, 0.05),
+    ("Envoy Air", "MQ", 20398, 0.04),
+    ("Endeavor Air Inc.", "9E", 20363, 0.04),
+    ("JetBlue Airways", "B6", 20409, 0.04),
+    ("PSA Airlines Inc.", "OH", 20397, 0.04),
+    ("Alaska Airlines Inc.", "AS", 19930, 0.03),
+    ("Spirit Air Lines", "NK", 20416, 0.03),
+    ("Frontier Airlines Inc.", "F9", 20436, 0.02),
+    ("Allegiant Air", "G4", 20368, 0.02),
+    ("Mesa Airlines Inc.", "YV", 20378, 0.02),
+    ("Hawaiian Airlines Inc.", "HA", 19690, 0.01),
+    ("Horizon Air", "QX", 19687, 0.01),
+]
+
+# Iklim per location_id 0..9 (urutan etl_pipeline/city_locations.csv):
+# (suhu rata-rata °C, amplitudo musiman, peluang hujan per jam)
+LOCATION_CLIMATE = [
+    (10.0, 13.0, 0.10),  # 0 Chicago
+    (17.0, 9.0, 0.10),   # 1 Atlanta
+    (19.0, 10.0, 0.07),  # 2 Dallas/Fort Worth
+    (10.0, 12.0, 0.06),  # 3 Denver
+    (13.0, 12.0, 0.10),  # 4 New York
+    (16.0, 10.0, 0.09),  # 5 Charlotte
+    (21.0, 8.0, 0.10),   # 6 Houston
+    (18.0, 4.0, 0.03),   # 7 Los Angeles
+    (14.0, 12.0, 0.09),  # 8 Washington
+    (24.0, 10.0, 0.02),  # 9 Phoenix
+]
+
+CANCEL_RATE = 0.026
+DIVERT_RATE = 0.0025
+MISSING_RATE = 0.0005  # baris tidak batal dengan waktu kosong (untuk tahap cleaning)
+
+
+def _city_table(seed):
+    """Tabel kota (nama, bandara, koordinat, bobot) termasuk ekor kota regional"""
+    rng = np.random.default_rng([seed, 0])
+    cities = [(name, airports, lat, lon, w) for name, airports, lat, lon, w in TOP_CITIES]
+
+    ranks = np.arange(1, len(MID_CITIES) + 1)
+    mid_w = 1.0 / ranks ** 0.8
+    mid_w = mid_w / mid_w.sum() * MID_SHARE
+    # kota menengah terbesar tetap di bawah kota ke-10 agar urutan top 10 stabil
+    mid_w = np.minimum(mid_w, TOP_CITIES[-1][4] * 0.8)
+    for (name, airports, lat, lon), w in zip(MID_CITIES, mid_w):
+        cities.append((name, airports, lat, lon, float(w)))
+
+    tail_share = 1.0 - sum(c[4] for c in cities)
+    tail_w = rng.pareto(1.5, N_TAIL_CITIES) + 1.0
+    tail_w = np.minimum(tail_w / tail_w.sum() * tail_share, mid_w[-1])
+    tail_lat = rng.uniform(26.0, 48.0, N_TAIL_CITIES)
+    tail_lon = rng.uniform(-122.0, -70.0, N_TAIL_CITIES)
+    for i in range(N_TAIL_CITIES):
+        code = "X" + chr(65 + i // 26 % 26) + chr(65 + i % 26)
+        cities.append((f"Regional {i + 1:03d}, US", [code], tail_lat[i], tail_lon[i], float(tail_w[i])))
+
+    names = np.array([c[0] for c in cities], dtype=object)
+    airports = [c[1] for c in cities]
+    coords = np.radians(np.array([[c[2], c[3]] for c in cities]))
+    weights = np.array([c[4] for c in cities])
+    return names, airports, coords, weights / weights.sum()
+
+
+def _distance_miles(coords, origin_idx, dest_idx):
+    """Jarak great-circle (mil) antar kota"""
+    lat1, lon1 = coords[origin_idx, 0], coords[origin_idx, 1]
+    lat2, lon2 = coords[dest_idx, 0], coords[dest_idx, 1]
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return np.maximum(np.round(3958.8 * 2 * np.arcsin(np.sqrt(a))), 67.0)
+
+
+def _hhmm(minutes):
+    """Menit sejak tengah malam -> format hhmm (float, wrap 24 jam, 0 ditulis 2400)"""
+    m = np.mod(np.round(minutes), 1440)
+    hhmm = (m // 60) * 100 + m % 60
+    return np.where(hhmm == 0, 2400.0, hhmm)
+
+
+def _airport(rng, airports, city_idx):
+    """Memilih bandara untuk tiap kota (kota multi-bandara dipilih acak)"""
+    first = np.array([a[0] for a in airports], dtype=object)
+    codes = first[city_idx]
+    for i, options in enumerate(airports):
+        if len(options) > 1:
+            mask = city_idx == i
+            codes[mask] = np.array(options, dtype=object)[rng.integers(0, len(options), mask.sum())]
+    return codes
+
+
+def make_flight_chunk(rng, n, cities, dates):
+    """Satu chunk DataFrame Flight (kolom sesuai FLIGHT_HEADER)"""
+    names, airports, coords, weights = cities
+    origin = rng.choice(len(names), n, p=weights)
+    dest = rng.choice(len(names), n, p=weights)
+    same = origin == dest
+    dest[same] = (dest[same] + 1 + rng.integers(0, 9, same.sum())) % len(names)
+
+    a_w = np.array([a[3] for a in AIRLINES])
+    airline = rng.choice(len(AIRLINES), n, p=a_w / a_w.sum())
+    a_name = np.array([a[0] for a in AIRLINES], dtype=object)
+    a_code = np.array([a[1] for a in AIRLINES], dtype=object)
+    a_dot = np.array([a[2] for a in AIRLINES])
+
+    distance = _distance_miles(coords, origin, dest)
+    crs_elapsed = np.round(distance / 8.0 + 35 + rng.normal(0, 5, n))
+    taxi_out = np.round(rng.gamma(4.0, 4.5, n)) + 1
+    taxi_in = np.round(rng.gamma(2.5, 3.0, n)) + 1
+
+    crs_dep_min = np.clip(rng.normal(810, 260, n), 330, 1410)
+    crs_dep_min = np.round(crs_dep_min / 5) * 5
+    dep_delay = np.where(rng.random(n) < 0.65, np.round(rng.normal(-4, 5, n)), np.round(rng.exponential(35, n)))
+    air_time = np.maximum(np.round(crs_elapsed - taxi_out - taxi_in + rng.normal(0, 6, n)), 15)
+    elapsed = taxi_out + air_time + taxi_in
+    arr_delay = dep_delay + (elapsed - crs_elapsed)
+
+    dep_min = crs_dep_min + dep_delay
+    wheels_off_min = dep_min + taxi_out
+    wheels_on_min = wheels_off_min + air_time
+    arr_min = wheels_on_min + taxi_in
+
+    cancelled = rng.random(n) < CANCEL_RATE
+    diverted = ~cancelled & (rng.random(n) < DIVERT_RATE)
+    missing = ~cancelled & ~diverted & (rng.random(n) < MISSING_RATE)
+
+    def nan_where(values, mask):
+        values = values.astype("float64")
+        values[mask] = np.nan
+        return values
+
+    # Kolom penyebab delay hanya terisi jika ARR_DELAY >= 15 (aturan BTS)
+    has_cause = ~cancelled & ~diverted & (arr_delay >= 15)
+    shares = rng.dirichlet([1.5, 0.2, 1.0, 0.05, 1.5], n)
+    delay_parts = np.round(shares * np.maximum(arr_delay, 0)[:, None])
+    delay_parts[:, 4] += np.maximum(arr_delay, 0) - delay_parts.sum(axis=1)  # sisa pembulatan
+
+    no_arr = cancelled | diverted
+    df = pd.DataFrame({
+        "FL_DATE": dates[rng.integers(0, len(dates), n)],
+        "AIRLINE": a_name[airline],
+        "AIRLINE_DOT": [f"{name}: {code}" for name, code in zip(a_name[airline], a_code[airline])],
+        "AIRLINE_CODE": a_code[airline],
+        "DOT_CODE": a_dot[airline],
+        "FL_NUMBER": rng.integers(1, 7000, n),
+        "ORIGIN": _airport(rng, airports, origin),
+        "ORIGIN_CITY": names[origin],
+        "DEST": _airport(rng, airports, dest),
+        "DEST_CITY": names[dest],
+        "CRS_DEP_TIME": _hhmm(crs_dep_min).astype("int64"),
+        "DEP_TIME": nan_where(_hhmm(dep_min), cancelled),
+        "DEP_DELAY": nan_where(dep_delay, cancelled),
+        "TAXI_OUT": nan_where(taxi_out, cancelled),
+        "WHEELS_OFF": nan_where(_hhmm(wheels_off_min), cancelled),
+        "WHEELS_ON": nan_where(_hhmm(wheels_on_min), no_arr),
+        "TAXI_IN": nan_where(taxi_in, no_arr),
+        "CRS_ARR_TIME": _hhmm(crs_dep_min + crs_elapsed).astype("int64"),
+        "ARR_TIME": nan_where(_hhmm(arr_min), no_arr | missing),
+        "ARR_DELAY": nan_where(arr_delay, no_arr | missing),
+        "CANCELLED": cancelled.astype("float64"),
+        "CANCELLATION_CODE": np.where(cancelled, rng.choice(np.array(["A", "B", "C", "D"], dtype=object), n,
+                                                            p=[0.3, 0.45, 0.24, 0.01]), None),
+        "DIVERTED": diverted.astype("float64"),
+        "CRS_ELAPSED_TIME": crs_elapsed,
+        "ELAPSED_TIME": nan_where(elapsed, no_arr | missing),
+        "AIR_TIME": nan_where(air_time, no_arr | missing),
+        "DISTANCE": distance,
+    })
+    for i, col in enumerate(FLIGHT_HEADER[-5:]):
+        df[col] = nan_where(delay_parts[:, i], ~has_cause)
+    return df
+
+
+def generate_flights(path, n_rows, seed=42, start=DEFAULT_START, end=DEFAULT_END, chunk_rows=CHUNK_ROWS):
+    """Menulis Flight.csv secara bertahap per chunk (memori konstan untuk 50M baris)"""
+    cities = _city_table(seed)
+    dates = pd.date_range(start, end, freq="D").strftime("%Y-%m-%d").to_numpy(dtype=object)
+    written = 0
+    chunk_idx = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        while written < n_rows:
+            n = min(chunk_rows, n_rows - written)
+            rng = np.random.default_rng([seed, 1, chunk_idx])
+            chunk = make_flight_chunk(rng, n, cities, dates)
+            chunk.to_csv(f, index=False, header=(chunk_idx == 0), lineterminator="\n")
+            written += n
+            chunk_idx += 1
+    return written
+
+
+def location_table(seed=42, n_locations=DEFAULT_LOCATIONS):
+    """Kamus city_locations.csv untuk N kota dengan bobot terbesar (location_id 0..N-1)"""
+    names, _, coords, weights = _city_table(seed)
+    if not 1 <= n_locations <= len(names):
+        raise ValueError(f"n_locations harus antara 1 dan {len(names)}, bukan {n_locations}")
+    order = np.argsort(-weights, kind="stable")[:n_locations]
+    return pd.DataFrame({
+        "city": names[order],
+        "location_id": np.arange(n_locations),
+        "latitude": np.round(np.degrees(coords[order, 0]), 2),
+        "longitude": np.round(np.degrees(coords[order, 1]), 2),
+    })
+
+
+def location_climate(locations, seed=42):
+    """Iklim per location_id: 10 kota teratas dari LOCATION_CLIMATE, sisanya diturunkan dari lintang"""
+    rng = np.random.default_rng([seed, 3])
+    lat = locations["latitude"].to_numpy()
+    wet = rng.uniform(0.03, 0.11, len(lat))
+    climate = [(round(38.0 - 0.65 * la, 1), round(0.55 * la - 10.0, 1), round(w, 3)) for la, w in zip(lat, wet)]
+    n_known = min(len(LOCATION_CLIMATE), len(climate))
+    return LOCATION_CLIMATE[:n_known] + climate[n_known:]
+
+
+def make_weather(seed=42, start=DEFAULT_START, end=DEFAULT_END, climate=LOCATION_CLIMATE):
+    """DataFrame Weather per jam untuk location_id 0..len(climate)-1 (kolom sesuai WEATHER_HEADER)"""
+    rng = np.random.default_rng([seed, 2])
+    hours = pd.date_range(start, f"{end} 23:00", freq="h")
+    n_hours = len(hours)
+    n_loc = len(climate)
+    m = n_hours * n_loc
+
+    doy = np.tile(hours.dayofyear.to_numpy(), n_loc)
+    hour = np.tile(hours.hour.to_numpy(), n_loc)
+    mean_t, amp_t, wet_p = (np.repeat(np.array(v, dtype="float64"), n_hours) for v in zip(*climate))
+
+    temperature = (mean_t - amp_t * np.cos(2 * np.pi * (doy - 15) / 365.25)
+                   - 4.0 * np.cos(2 * np.pi * (hour - 3) / 24) + rng.normal(0, 2.5, m))
+    temperature = np.round(temperature, 1)
+
+    wet = rng.random(m) < wet_p
+    precipitation = np.where(wet, np.round(rng.exponential(1.2, m) + 0.1, 1), 0.0)
+    rain = np.where(temperature > 0, precipitation, 0.0)
+    snowfall = np.where(temperature <= 0, np.round(precipitation * 0.7, 2), 0.0)
+
+    cloud = np.where(wet, rng.integers(80, 101, m), rng.integers(0, 101, m))
+    cloud_low = np.round(cloud * rng.random(m)).astype("int64")
+
+    code = np.select([cloud < 20, cloud < 50, cloud < 80], [0, 1, 2], default=3)
+    code = np.where(~wet & (rng.random(m) < 0.01), 45, code)
+    code = np.where(rain > 0, np.select([rain < 0.5, rain < 2.5, rain < 7.5], [51, 61, 63], default=65), code)
+    code = np.where((rain > 4.0) & (temperature > 20), 95, code)
+    code = np.where(snowfall > 0, np.select([snowfall < 1.0, snowfall < 3.0], [71, 73], default=75), code)
+
+    wind = np.round(rng.gamma(2.0, 6.0, m), 1)
+    direction = rng.integers(0, 360, m)
+    return pd.DataFrame({
+        "location_id": np.repeat(np.arange(n_loc), n_hours),
+        "time": np.tile(hours.strftime("%Y-%m-%dT%H:%M").to_numpy(dtype=object), n_loc),
+        "temperature_2m (°C)": temperature,
+        "precipitation (mm)": precipitation,
+        "rain (mm)": rain,
+        "snowfall (cm)": snowfall,
+        "weather_code (wmo code)": code,
+        "surface_pressure (hPa)": np.round(rng.normal(1013, 7, m) - 5 * wet, 1),
+        "cloud_cover (%)": cloud,
+        "cloud_cover_low (%)": cloud_low,
+        "wind_speed_10m (km/h)": wind,
+        "wind_speed_100m (km/h)": np.round(wind * rng.uniform(1.3, 2.0, m), 1),
+        "wind_direction_10m (°)": direction,
+        "wind_direction_100m (°)": (direction + rng.integers(-20, 21, m)) % 360,
+        "wind_gusts_10m (km/h)": np.round(wind * rng.uniform(1.5, 2.5, m), 1),
+    })[WEATHER_HEADER]
+
+
+def generate_weather(out_dir, seed=42, start=DEFAULT_START, end=DEFAULT_END, n_locations=DEFAULT_LOCATIONS):
+    """Menulis Weather.csv & city_locations.csv untuk N lokasi. Mengembalikan statistik file."""
+    os.makedirs(out_dir, exist_ok=True)
+    start_time = time.time()
+    locations = location_table(seed, n_locations)
+    locations.to_csv(os.path.join(out_dir, "city_locations.csv"), index=False, lineterminator="\n")
+
+    weather_path = os.path.join(out_dir, "Weather.csv")
+    weather = make_weather(seed, start, end, location_climate(locations, seed))
+    weather.to_csv(weather_path, sep=";", index=False, lineterminator="\n")
+    return {
+        "locations": n_locations,
+        "weather_rows": len(weather),
+        "weather_bytes": os.path.getsize(weather_path),
+        "weather_seconds": round(time.time() - start_time, 4),
+    }
+
+
+def generate(out_dir, n_rows, seed=42, start=DEFAULT_START, end=DEFAULT_END, n_locations=DEFAULT_LOCATIONS):
+    """Menulis Flight.csv, Weather.csv & city_locations.csv ke 'out_dir'. Mengembalikan statistik file."""
+    os.makedirs(out_dir, exist_ok=True)
+    stats = {"rows": n_rows, "seed": seed, "start": start, "end": end}
+
+    start_time = time.time()
+    flight_path = os.path.join(out_dir, "Flight.csv")
+    generate_flights(flight_path, n_rows, seed, start, end)
+    stats["flight_bytes"] = os.path.getsize(flight_path)
+    stats["flight_seconds"] = round(time.time() - start_time, 4)
+
+    stats.update(generate_weather(out_dir, seed, start, end, n_locations))
+    return stats
+
+
+def parse_rows(value):
+    """'100k', '1m', '10m', '50m' atau angka biasa -> jumlah baris"""
+    value = str(value).lower().replace("_", "")
+    if value in SCALES:
+        return SCALES[value]
+    if value[-1:] in ("k", "m"):
+        return int(float(value[:-1]) * (1_000 if value[-1] == "k" else 1_000_000))
+    return int(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generator Flight.csv & Weather.csv sintetis (seeded)")
+    parser.add_argument("--rows", default="100k", help="Jumlah baris Flight: 100k, 1m, 10m, 50m atau angka")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out-dir", default=".", help="Folder output Flight.csv & Weather.csv")
+    parser.add_argument("--start", default=DEFAULT_START, help="Tanggal awal (YYYY-MM-DD)")
+    parser.add_argument("--end", default=DEFAULT_END, help="Tanggal akhir (YYYY-MM-DD)")
+    parser.add_argument("--locations", type=int, default=DEFAULT_LOCATIONS,
+                        help="Jumlah lokasi cuaca (= kota di city_locations.csv), untuk top N > 10")
+    args = parser.parse_args()
+
+    n_rows = parse_rows(args.rows)
+    print(f"   -> Membuat {n_rows:,} baris Flight + Weather per jam (seed={args.seed}) di {args.out_dir}")
+    stats = generate(args.out_dir, n_rows, args.seed, args.start, args.end, args.locations)
+    print(f"      ✅ Flight.csv : {stats['rows']:,} baris, {stats['flight_bytes'] / 1024 / 1024:.2f} MB "
+          f"dalam {stats['flight_seconds']:.4f} seconds")
+    print(f"      ✅ Weather.csv: {stats['weather_rows']:,} baris ({stats['locations']} lokasi), "
+          f"{stats['weather_bytes'] / 1024 / 1024:.2f} MB "
+          f"dalam {stats['weather_seconds']:.4f} seconds")
+
+
+if __name__ == "__main__":
+    main()
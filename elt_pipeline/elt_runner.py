@@ -0,0 +1,696 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+try:
+    import psycopg2
+except ImportError as exc:
+    raise SystemExit(
+        "psycopg2 is required. Install with: pip install psycopg2-binary"
+    ) from exc
+
+# ---------------------------------------------------------
+# ELT runner: versi headless dari ELT.ipynb.
+# Semua tahap raw -> stg -> gold dijalankan di dalam database sebagai satu
+# statement set-based (CREATE TABLE AS / INSERT ... SELECT) per tahap, di dalam
+# transaksi yang di-commit per tahap. Tidak ada SELECT * yang ditarik ke client;
+# yang dilaporkan hanya durasi dan jumlah baris per tahap.
+# ---------------------------------------------------------
+
+
+def conn_args_from_env():
+    return {
+        "host": os.getenv("PGHOST", "localhost"),
+        "port": int(os.getenv("PGPORT", "5432")),
+        "dbname": os.getenv("PGDATABASE", "elt_dw"),
+        "user": os.getenv("PGUSER", "elt_user"),
+        "password": os.getenv("PGPASSWORD", "elt_pass"),
+    }
+
+
+# Urutan kota (top 10) -> location_id ke-N pada data cuaca (sama dengan notebook)
+CITY_ORDER = [
+    "Chicago, IL",
+    "Atlanta, GA",
+    "Dallas/Fort Worth, TX",
+    "Denver, CO",
+    "New York, NY",
+    "Charlotte, NC",
+    "Houston, TX",
+    "Los Angeles, CA",
+    "Washington, DC",
+    "Phoenix, AZ",
+]
+
+FLIGHT_COLUMNS = [
+    "fl_date", "airline", "airline_dot", "airline_code", "dot_code", "fl_number",
+    "origin", "origin_city", "dest", "dest_city", "crs_dep_time", "dep_time",
+    "dep_delay", "taxi_out", "wheels_off", "wheels_on", "taxi_in", "crs_arr_time",
+    "arr_time", "arr_delay", "cancelled", "cancellation_code", "diverted",
+    "crs_elapsed_time", "elapsed_time", "air_time", "distance",
+    "delay_due_carrier", "delay_due_weather", "delay_due_nas",
+    "delay_due_security", "delay_due_late_aircraft",
+]
+
+WEATHER_COLUMNS = [
+    "temperature_2m", "precipitation", "rain", "snowfall", "weather_code",
+    "surface_pressure", "cloud_cover", "cloud_cover_low", "wind_speed_10m",
+    "wind_speed_100m", "wind_direction_10m", "wind_direction_100m", "wind_gusts_10m",
+]
+
+FLIGHT_TEXT_COLUMNS = {
+    "airline", "airline_dot", "airline_code", "origin", "origin_city",
+    "dest", "dest_city", "cancellation_code",
+}
+
+DELAY_COLUMNS = [
+    "delay_due_carrier", "delay_due_weather", "delay_due_nas",
+    "delay_due_security", "delay_due_late_aircraft",
+]
+
+# Penerbangan tidak cancel yang salah satu kolom ini NULL dianggap tidak konsisten
+MISSING_TIME_COLUMNS = [
+    "dep_time", "dep_delay", "taxi_out", "wheels_off", "wheels_on",
+    "taxi_in", "arr_time", "arr_delay", "air_time", "elapsed_time",
+]
+
+# Kolom yang di-cast ke BIGINT pada tahap standarisasi
+FLOAT_COLS_TO_INT = [
+    "dep_time", "dep_delay", "taxi_out", "wheels_off", "wheels_on",
+    "taxi_in", "arr_time", "arr_delay", "cancelled", "diverted",
+    "crs_elapsed_time", "elapsed_time", "air_time", "distance",
+] + DELAY_COLUMNS
+
+# Range check (sama dengan bagian Validasi Data di notebook)
+RANGE_CONSTRAINTS = {
+    "origin_temperature_2m": (-35, 60),
+    "dest_temperature_2m": (-35, 60),
+    "origin_precipitation": (0, 500),
+    "dest_precipitation": (0, 500),
+    "origin_wind_speed_10m": (0, 200),
+    "dest_wind_speed_10m": (0, 200),
+    "origin_cloud_cover": (0, 100),
+    "dest_cloud_cover": (0, 100),
+    "origin_surface_pressure": (800, 1050),
+    "dest_surface_pressure": (800, 1050),
+}
+
+
+def _sniff_delimiter(path):
+    """Weather.csv (Open-Meteo) memakai ';', file lain ','"""
+    with open(path, "r", encoding="utf-8") as f:
+        header = f.readline()
+    return ";" if header.count(";") > header.count(",") else ","
+
+
+def _copy_csv(cur, path, target, columns=None):
+    """COPY file CSV (dengan header) ke tabel target. Mengembalikan jumlah baris."""
+    cols_sql = f" ({', '.join(columns)})" if columns else ""
+    delimiter = _sniff_delimiter(path)
+    with open(path, "r", encoding="utf-8") as f:
+        cur.copy_expert(
+            f"COPY {target}{cols_sql} FROM STDIN WITH (FORMAT csv, HEADER true, DELIMITER '{delimiter}')",
+            f,
+        )
+    return cur.rowcount
+
+
+# ---------------------------------------------------------
+# Tahap-tahap ELT. Setiap fungsi menerima cursor dan mengembalikan jumlah baris
+# hasil tahap tersebut (rowcount dari CREATE TABLE AS / INSERT).
+# ---------------------------------------------------------
+def stage_raw_schema(cur, paths):
+    """Schema raw/stg/gold + tabel raw"""
+    flight_cols_sql = ",\n".join(
+        f"    {c} {'DATE' if c == 'fl_date' else 'TEXT' if c in FLIGHT_TEXT_COLUMNS else 'NUMERIC'}"
+        for c in FLIGHT_COLUMNS
+    )
+    weather_cols_sql = ",\n".join(f"    {c} NUMERIC" for c in WEATHER_COLUMNS)
+    cur.execute(f"""
+        CREATE SCHEMA IF NOT EXISTS raw;
+        CREATE SCHEMA IF NOT EXISTS stg;
+        CREATE SCHEMA IF NOT EXISTS gold;
+        DROP TABLE IF EXISTS raw.weather_hourly_raw;
+        DROP TABLE IF EXISTS raw.weather_location_raw;
+        DROP TABLE IF EXISTS raw.flights_raw;
+        CREATE TABLE raw.flights_raw (
+{flight_cols_sql}
+        );
+        CREATE TABLE raw.weather_location_raw (
+            location_id            numeric PRIMARY KEY,
+            latitude               numeric,
+            longitude              numeric,
+            elevation              numeric,
+            utc_offset_seconds     numeric,
+            timezone               text,
+            timezone_abbreviation  text
+        );
+        CREATE TABLE raw.weather_hourly_raw (
+            location_id numeric NOT NULL,
+            time timestamp NOT NULL,
+{weather_cols_sql},
+            PRIMARY KEY (location_id, time),
+            FOREIGN KEY (location_id) REFERENCES raw.weather_location_raw(location_id)
+        );
+    """)
+    return 0
+
+
+def stage_raw_flights(cur, paths):
+    """COPY Flight.csv ke tabel stage UNLOGGED, lalu simpan hanya top 10 kota"""
+    if paths.get("ingest_workers", 1) > 1:
+        import raw_ingest
+        return raw_ingest.ingest_flights(cur, paths["flights"], paths["ingest_workers"])
+
+    cur.execute("DROP TABLE IF EXISTS raw.flights_raw_stage;")
+    cur.execute("CREATE UNLOGGED TABLE raw.flights_raw_stage (LIKE raw.flights_raw INCLUDING ALL);")
+    _copy_csv(cur, paths["flights"], "raw.flights_raw_stage")
+    cur.execute("""
+        WITH top_origin AS (
+            SELECT origin_city FROM raw.flights_raw_stage
+            GROUP BY origin_city ORDER BY COUNT(*) DESC LIMIT 10
+        ),
+        top_dest AS (
+            SELECT dest_city FROM raw.flights_raw_stage
+            GROUP BY dest_city ORDER BY COUNT(*) DESC LIMIT 10
+        )
+        INSERT INTO raw.flights_raw
+        SELECT * FROM raw.flights_raw_stage
+        WHERE origin_city IN (SELECT origin_city FROM top_origin)
+          AND dest_city IN (SELECT dest_city FROM top_dest);
+    """)
+    rows = cur.rowcount
+    cur.execute("DROP TABLE raw.flights_raw_stage;")
+    return rows
+
+
+def stage_raw_weather(cur, paths):
+    """COPY data cuaca (dan lokasi, jika ada) ke raw.weather_*_raw"""
+    if paths.get("weather_location"):
+        _copy_csv(cur, paths["weather_location"], "raw.weather_location_raw")
+
+    cur.execute("DROP TABLE IF EXISTS raw.weather_hourly_stage;")
+    cur.execute("CREATE UNLOGGED TABLE raw.weather_hourly_stage (LIKE raw.weather_hourly_raw);")
+    _copy_csv(cur, paths["weather"], "raw.weather_hourly_stage", ["location_id", "time"] + WEATHER_COLUMNS)
+
+    # Lokasi yang belum ada di weather_location_raw didaftarkan (hanya id) agar FK terpenuhi
+    cur.execute("""
+        INSERT INTO raw.weather_location_raw (location_id)
+        SELECT DISTINCT location_id FROM raw.weather_hourly_stage
+        ON CONFLICT (location_id) DO NOTHING;
+    """)
+    cur.execute("INSERT INTO raw.weather_hourly_raw SELECT * FROM raw.weather_hourly_stage;")
+    rows = cur.rowcount
+    cur.execute("DROP TABLE raw.weather_hourly_stage;")
+    return rows
+
+
+def stage_flights_cleaned(cur, paths):
+    """Cleaning flight: drop kolom, imputasi delay, buang baris tidak konsisten
+
+    Drop airline_dot & cancellation_code, imputasi kolom delay dengan 0, dan buang
+    penerbangan tidak cancel yang kolom waktunya NULL (satu CREATE TABLE AS).
+    """
+    select_cols = []
+    for c in FLIGHT_COLUMNS:
+        if c in ("airline_dot", "cancellation_code"):
+            continue
+        select_cols.append(f'COALESCE("{c}", 0) AS "{c}"' if c in DELAY_COLUMNS else f'"{c}"')
+    missing_predicates = " OR ".join(f'"{c}" IS NULL' for c in MISSING_TIME_COLUMNS)
+    cur.execute("DROP TABLE IF EXISTS stg.flights_cleaned;")
+    cur.execute(f"""
+        CREATE TABLE stg.flights_cleaned AS
+        SELECT {", ".join(select_cols)}
+        FROM raw.flights_raw
+        WHERE NOT (COALESCE(cancelled = 0, FALSE) AND ({missing_predicates}));
+    """)
+    return cur.rowcount
+
+
+def stage_weather_cleaned(cur, paths):
+    """Salinan data cuaca di layer stg"""
+    cur.execute("DROP TABLE IF EXISTS stg.weather_cleaned;")
+    cur.execute("CREATE TABLE stg.weather_cleaned AS SELECT * FROM raw.weather_hourly_raw;")
+    return cur.rowcount
+
+
+def _city_mapping_cte():
+    values = ",\n".join(
+        f"                ({_sql_literal(city)}, {i})" for i, city in enumerate(CITY_ORDER, start=1)
+    )
+    return f"""
+        city_order AS (
+            SELECT * FROM (VALUES
+{values}
+            ) AS v(city, ord)
+        ),
+        location_ids AS (
+            SELECT location_id, ROW_NUMBER() OVER (ORDER BY location_id) AS rn
+            FROM (SELECT DISTINCT location_id FROM stg.weather_cleaned WHERE location_id IS NOT NULL) t
+        ),
+        city_mapping AS (
+            SELECT c.city, l.location_id::bigint AS location_id
+            FROM city_order c
+            JOIN location_ids l ON l.rn = c.ord
+        )"""
+
+
+def _sql_literal(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def stage_flights_standardized(cur, paths):
+    """Standarisasi flight dalam satu pass (tanggal, encoding, tipe data, jam)
+
+    fl_date -> YYYYMMDD, label encoding (DENSE_RANK), kota -> location_id,
+    imputasi 0 untuk penerbangan cancel, cast ke BIGINT, dan pembulatan jam
+    jadwal untuk join cuaca.
+    """
+    int_cols = set(FLOAT_COLS_TO_INT)
+    select_cols = []
+    for c in FLIGHT_COLUMNS:
+        if c in ("airline_dot", "cancellation_code"):
+            continue
+        if c == "fl_date":
+            expr = "to_char(f.fl_date, 'YYYYMMDD')::bigint"
+        elif c in int_cols and c in MISSING_TIME_COLUMNS:
+            expr = f'(CASE WHEN f.cancelled = 1 THEN COALESCE(f."{c}", 0) ELSE f."{c}" END)::bigint'
+        elif c in int_cols:
+            expr = f'f."{c}"::bigint'
+        else:
+            expr = f'f."{c}"'
+        select_cols.append(f'{expr} AS "{c}"')
+
+    cur.execute("DROP TABLE IF EXISTS stg.flights_standardized;")
+    cur.execute(f"""
+        CREATE TABLE stg.flights_standardized AS
+        WITH {_city_mapping_cte().strip()}
+        SELECT
+            {", ".join(select_cols)},
+            (DENSE_RANK() OVER (ORDER BY f.airline) - 1)::bigint AS airlines_encode,
+            (DENSE_RANK() OVER (ORDER BY f.airline_code) - 1)::bigint AS airline_code_encode,
+            (DENSE_RANK() OVER (ORDER BY f.origin) - 1)::bigint AS origin_encode,
+            mo.location_id AS origin_cities_encode,
+            (DENSE_RANK() OVER (ORDER BY f.dest) - 1)::bigint AS dest_encode,
+            md.location_id AS dest_cities_encode,
+            (f.crs_dep_time::bigint / 100) * 100 AS crs_dep_time_rounded,
+            (f.crs_arr_time::bigint / 100) * 100 AS crs_arr_time_rounded
+        FROM stg.flights_cleaned f
+        LEFT JOIN city_mapping mo ON mo.city = f.origin_city
+        LEFT JOIN city_mapping md ON md.city = f.dest_city;
+    """)
+    return cur.rowcount
+
+
+def stage_weather_standardized(cur, paths):
+    """Tambah kolom date (YYYYMMDD) dan time_hour_minute (HHMI) untuk join"""
+    cur.execute("DROP TABLE IF EXISTS stg.weather_standardized;")
+    cur.execute("""
+        CREATE TABLE stg.weather_standardized AS
+        SELECT
+            w.*,
+            to_char(w."time", 'YYYYMMDD')::bigint AS "date",
+            to_char(w."time", 'HH24MI')::bigint AS "time_hour_minute"
+        FROM stg.weather_cleaned w;
+    """)
+    rows = cur.rowcount
+    cur.execute('CREATE INDEX ON stg.weather_standardized (location_id, "date", time_hour_minute);')
+    return rows
+
+
+def stage_flights_weather_merged(cur, paths):
+    """Join cuaca origin & destinasi + fitur selisih cuaca dalam satu CREATE TABLE AS"""
+    weather_cols = ["time"] + WEATHER_COLUMNS
+    origin_cols_sql = ", ".join(f'w_origin."{c}" AS "origin_{c}"' for c in weather_cols)
+    dest_cols_sql = ", ".join(f'w_dest."{c}" AS "dest_{c}"' for c in weather_cols)
+    cur.execute("DROP TABLE IF EXISTS stg.flights_weather_merged;")
+    cur.execute(f"""
+        CREATE TABLE stg.flights_weather_merged AS
+        SELECT
+            f.*,
+            {origin_cols_sql},
+            {dest_cols_sql},
+            (w_dest.temperature_2m - w_origin.temperature_2m)::double precision AS temp_2m_diff,
+            (w_dest.surface_pressure - w_origin.surface_pressure)::double precision AS surface_pressure_diff,
+            (w_dest.wind_speed_10m - w_origin.wind_speed_10m)::double precision AS wind_speed_10m_diff,
+            (w_dest.wind_speed_100m - w_origin.wind_speed_100m)::double precision AS wind_speed_100m_diff,
+            (w_dest.cloud_cover - w_dest.cloud_cover_low)::double precision AS dest_cloud_cover_diff
+        FROM stg.flights_standardized f
+        LEFT JOIN stg.weather_standardized w_origin
+          ON f.fl_date = w_origin.date
+         AND f.origin_cities_encode = w_origin.location_id::bigint
+         AND f.crs_dep_time_rounded = w_origin.time_hour_minute
+        LEFT JOIN stg.weather_standardized w_dest
+          ON f.fl_date = w_dest.date
+         AND f.dest_cities_encode = w_dest.location_id::bigint
+         AND f.crs_arr_time_rounded = w_dest.time_hour_minute;
+    """)
+    return cur.rowcount
+
+
+def stage_gold_final(cur, paths):
+    """Tabel gold.final_merged (hasil akhir ELT, satu baris per penerbangan)"""
+    cur.execute("DROP TABLE IF EXISTS gold.final_merged;")
+    cur.execute("CREATE TABLE gold.final_merged AS SELECT * FROM stg.flights_weather_merged;")
+    return cur.rowcount
+
+
+def stage_gold_star(cur, paths):
+    """Star schema gold_star (dim_date, dim_time, dim_airline, dim_airport, dim_weather, fact_flight)"""
+    weather_cols_sql = ", ".join(WEATHER_COLUMNS)
+    weather_ddl = ",\n".join(f"          {c} DOUBLE PRECISION" for c in WEATHER_COLUMNS)
+    cur.execute(f"""
+        CREATE SCHEMA IF NOT EXISTS gold_star;
+
+        DROP TABLE IF EXISTS gold_star.fact_flight CASCADE;
+        DROP TABLE IF EXISTS gold_star.dim_weather CASCADE;
+        DROP TABLE IF EXISTS gold_star.dim_airport CASCADE;
+        DROP TABLE IF EXISTS gold_star.dim_airline CASCADE;
+        DROP TABLE IF EXISTS gold_star.dim_time CASCADE;
+        DROP TABLE IF EXISTS gold_star.dim_date CASCADE;
+
+        CREATE TABLE gold_star.dim_date (
+          date_key BIGINT PRIMARY KEY,
+          date_value DATE,
+          year INT,
+          month INT,
+          day INT,
+          day_of_week INT
+        );
+        INSERT INTO gold_star.dim_date (date_key, date_value, year, month, day, day_of_week)
+        SELECT date_key, d, EXTRACT(YEAR FROM d)::int, EXTRACT(MONTH FROM d)::int,
+               EXTRACT(DAY FROM d)::int, EXTRACT(DOW FROM d)::int
+        FROM (
+          SELECT DISTINCT fl_date AS date_key, TO_DATE(fl_date::text, 'YYYYMMDD') AS d
+          FROM gold.final_merged
+          WHERE fl_date IS NOT NULL
+        ) t;
+
+        CREATE TABLE gold_star.dim_time (
+          time_key INT PRIMARY KEY,
+          hour INT,
+          minute INT
+        );
+        INSERT INTO gold_star.dim_time (time_key, hour, minute)
+        SELECT time_key, time_key / 100, time_key % 100
+        FROM (
+          SELECT crs_dep_time_rounded::int AS time_key FROM gold.final_merged
+          UNION
+          SELECT crs_arr_time_rounded::int FROM gold.final_merged
+        ) t
+        WHERE time_key IS NOT NULL;
+
+        CREATE TABLE gold_star.dim_airline (
+          airline_key BIGSERIAL PRIMARY KEY,
+          airline_code TEXT UNIQUE,
+          airline TEXT,
+          airlines_encode BIGINT,
+          airline_code_encode BIGINT
+        );
+        INSERT INTO gold_star.dim_airline (airline_code, airline, airlines_encode, airline_code_encode)
+        SELECT DISTINCT airline_code, airline, airlines_encode, airline_code_encode
+        FROM gold.final_merged;
+
+        CREATE TABLE gold_star.dim_airport (
+          airport_key BIGSERIAL PRIMARY KEY,
+          airport_code TEXT UNIQUE,
+          city_name TEXT,
+          city_location_id BIGINT
+        );
+        INSERT INTO gold_star.dim_airport (airport_code, city_name, city_location_id)
+        SELECT DISTINCT origin, origin_city, origin_cities_encode FROM gold.final_merged
+        UNION
+        SELECT DISTINCT dest, dest_city, dest_cities_encode FROM gold.final_merged;
+
+        CREATE TABLE gold_star.dim_weather (
+          weather_key BIGSERIAL PRIMARY KEY,
+          location_id BIGINT,
+          date_key BIGINT REFERENCES gold_star.dim_date(date_key),
+          time_key INT REFERENCES gold_star.dim_time(time_key),
+          obs_time TIMESTAMP,
+{weather_ddl}
+        );
+        INSERT INTO gold_star.dim_weather (location_id, date_key, time_key, obs_time, {weather_cols_sql})
+        SELECT DISTINCT ON (location_id, "date", time_hour_minute)
+          location_id, "date", time_hour_minute::int, "time", {weather_cols_sql}
+        FROM stg.weather_standardized w
+        WHERE EXISTS (SELECT 1 FROM gold_star.dim_date d WHERE d.date_key = w."date")
+          AND EXISTS (SELECT 1 FROM gold_star.dim_time t WHERE t.time_key = w.time_hour_minute)
+        ORDER BY location_id, "date", time_hour_minute, "time";
+        CREATE INDEX ON gold_star.dim_weather (location_id, date_key, time_key);
+
+        CREATE TABLE gold_star.fact_flight (
+          flight_key BIGSERIAL PRIMARY KEY,
+          date_key BIGINT REFERENCES gold_star.dim_date(date_key),
+          airline_key BIGINT REFERENCES gold_star.dim_airline(airline_key),
+          origin_airport_key BIGINT REFERENCES gold_star.dim_airport(airport_key),
+          dest_airport_key BIGINT REFERENCES gold_star.dim_airport(airport_key),
+          dep_time_key INT REFERENCES gold_star.dim_time(time_key),
+          arr_time_key INT REFERENCES gold_star.dim_time(time_key),
+          origin_weather_key BIGINT REFERENCES gold_star.dim_weather(weather_key),
+          dest_weather_key BIGINT REFERENCES gold_star.dim_weather(weather_key),
+          fl_number NUMERIC,
+          dot_code NUMERIC,
+          crs_dep_time NUMERIC,
+          crs_arr_time NUMERIC,
+          dep_time BIGINT,
+          dep_delay BIGINT,
+          taxi_out BIGINT,
+          wheels_off BIGINT,
+          wheels_on BIGINT,
+          taxi_in BIGINT,
+          arr_time BIGINT,
+          arr_delay BIGINT,
+          cancelled BIGINT,
+          diverted BIGINT,
+          crs_elapsed_time BIGINT,
+          elapsed_time BIGINT,
+          air_time BIGINT,
+          distance BIGINT,
+          delay_due_carrier BIGINT,
+          delay_due_weather BIGINT,
+          delay_due_nas BIGINT,
+          delay_due_security BIGINT,
+          delay_due_late_aircraft BIGINT,
+          temp_2m_diff DOUBLE PRECISION,
+          surface_pressure_diff DOUBLE PRECISION,
+          wind_speed_10m_diff DOUBLE PRECISION,
+          wind_speed_100m_diff DOUBLE PRECISION,
+          dest_cloud_cover_diff DOUBLE PRECISION
+        );
+    """)
+    cur.execute("""
+        INSERT INTO gold_star.fact_flight (
+          date_key, airline_key, origin_airport_key, dest_airport_key,
+          dep_time_key, arr_time_key, origin_weather_key, dest_weather_key,
+          fl_number, dot_code, crs_dep_time, crs_arr_time,
+          dep_time, dep_delay, taxi_out, wheels_off, wheels_on, taxi_in,
+          arr_time, arr_delay, cancelled, diverted,
+          crs_elapsed_time, elapsed_time, air_time, distance,
+          delay_due_carrier, delay_due_weather, delay_due_nas, delay_due_security, delay_due_late_aircraft,
+          temp_2m_diff, surface_pressure_diff, wind_speed_10m_diff, wind_speed_100m_diff, dest_cloud_cover_diff
+        )
+        SELECT
+          d.date_key, a.airline_key, ao.airport_key, ad.airport_key,
+          dt_dep.time_key, dt_arr.time_key, wo.weather_key, wd.weather_key,
+          f.fl_number, f.dot_code, f.crs_dep_time, f.crs_arr_time,
+          f.dep_time, f.dep_delay, f.taxi_out, f.wheels_off, f.wheels_on, f.taxi_in,
+          f.arr_time, f.arr_delay, f.cancelled, f.diverted,
+          f.crs_elapsed_time, f.elapsed_time, f.air_time, f.distance,
+          f.delay_due_carrier, f.delay_due_weather, f.delay_due_nas, f.delay_due_security, f.delay_due_late_aircraft,
+          f.temp_2m_diff, f.surface_pressure_diff, f.wind_speed_10m_diff, f.wind_speed_100m_diff, f.dest_cloud_cover_diff
+        FROM gold.final_merged f
+        LEFT JOIN gold_star.dim_date d ON d.date_key = f.fl_date
+        LEFT JOIN gold_star.dim_airline a ON a.airline_code = f.airline_code
+        LEFT JOIN gold_star.dim_airport ao ON ao.airport_code = f.origin
+        LEFT JOIN gold_star.dim_airport ad ON ad.airport_code = f.dest
+        LEFT JOIN gold_star.dim_time dt_dep ON dt_dep.time_key = f.crs_dep_time_rounded::int
+        LEFT JOIN gold_star.dim_time dt_arr ON dt_arr.time_key = f.crs_arr_time_rounded::int
+        LEFT JOIN gold_star.dim_weather wo
+          ON wo.location_id = f.origin_cities_encode
+         AND wo.date_key = f.fl_date
+         AND wo.time_key = f.crs_dep_time_rounded::int
+        LEFT JOIN gold_star.dim_weather wd
+          ON wd.location_id = f.dest_cities_encode
+         AND wd.date_key = f.fl_date
+         AND wd.time_key = f.crs_arr_time_rounded::int;
+    """)
+    rows = cur.rowcount
+    cur.execute("ANALYZE gold_star.fact_flight;")
+    return rows
+
+
+def stage_validate(cur, paths):
+    """Validasi (uniqueness, null, range) dengan satu query agregat
+
+    Hanya angka agregat yang dikembalikan ke client, bukan isi tabel.
+    """
+    null_exprs = [f'COUNT(*) FILTER (WHERE "origin_{c}" IS NULL OR "dest_{c}" IS NULL)' for c in WEATHER_COLUMNS]
+    range_exprs = [
+        f'COUNT(*) FILTER (WHERE "{c}" < {lo} OR "{c}" > {hi})' for c, (lo, hi) in RANGE_CONSTRAINTS.items()
+    ]
+    cur.execute(f"""
+        SELECT
+            (SELECT COUNT(*) FROM stg.flights_standardized),
+            COUNT(*),
+            GREATEST({", ".join(null_exprs)}),
+            {", ".join(range_exprs)}
+        FROM stg.flights_weather_merged;
+    """)
+    result = cur.fetchone()
+    rows_before, rows_after, max_missing = result[0], result[1], result[2]
+    range_fail = dict(zip(RANGE_CONSTRAINTS, result[3:]))
+
+    if rows_after == rows_before:
+        print(f"      PASS uniqueness: {rows_after:,} baris sebelum & sesudah merge")
+    else:
+        print(f"      WARNING uniqueness: {rows_before:,} baris sebelum merge, {rows_after:,} sesudah")
+    missing_pct = (max_missing / rows_after * 100) if rows_after else 0.0
+    status = "PASS" if missing_pct <= 5 else "WARNING"
+    print(f"      {status} null check: maks {missing_pct:.2f}% baris tanpa data cuaca")
+    for col, n_fail in range_fail.items():
+        if n_fail:
+            lo, hi = RANGE_CONSTRAINTS[col]
+            print(f"      FAIL range: {col} has {n_fail} values outside {lo}-{hi}")
+    if not any(range_fail.values()):
+        print("      PASS range check: semua kolom cuaca dalam batas wajar")
+    return rows_after
+
+
+STAGES = [
+    ("raw_schema", stage_raw_schema),
+    ("raw_flights", stage_raw_flights),
+    ("raw_weather", stage_raw_weather),
+    ("stg_flights_cleaned", stage_flights_cleaned),
+    ("stg_weather_cleaned", stage_weather_cleaned),
+    ("stg_flights_standardized", stage_flights_standardized),
+    ("stg_weather_standardized", stage_weather_standardized),
+    ("stg_flights_weather_merged", stage_flights_weather_merged),
+    ("validate", stage_validate),
+    ("gold_final_merged", stage_gold_final),
+    ("gold_star", stage_gold_star),
+]
+
+
+# Schema yang ditulis ulang oleh setiap tahap (validate hanya membaca)
+STAGE_SCHEMA = {
+    "raw_schema": "raw",
+    "raw_flights": "raw",
+    "raw_weather": "raw",
+    "stg_flights_cleaned": "stg",
+    "stg_weather_cleaned": "stg",
+    "stg_flights_standardized": "stg",
+    "stg_weather_standardized": "stg",
+    "stg_flights_weather_merged": "stg",
+    "gold_final_merged": "gold",
+    "gold_star": "gold_star",
+}
+
+
+def record_load_version(cur, schema, stage, rows):
+    """
+    Mencatat versi load di tabel <schema>.elt_load_log (satu baris per tahap yang selesai).
+    load_id terbaru dipakai sebagai 'load version' cache hasil query di analytics_runner.py;
+    statistik tabel tidak bisa dipakai karena tabel dibangun ulang dengan DROP + CREATE TABLE AS.
+    """
+    cur.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {schema}.elt_load_log (
+            load_id BIGSERIAL PRIMARY KEY,
+            loaded_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            stage TEXT NOT NULL,
+            rows BIGINT
+        );
+        """
+    )
+    cur.execute(
+        f"INSERT INTO {schema}.elt_load_log (stage, rows) VALUES (%s, %s) RETURNING load_id;",
+        (stage, int(rows))
+    )
+    return cur.fetchone()[0]
+
+
+def run_elt(paths, stages=None, conn_args=None):
+    """
+    Menjalankan tahap ELT secara berurutan memakai satu koneksi. Setiap tahap adalah
+    satu transaksi (commit jika sukses, rollback jika gagal lalu pipeline berhenti),
+    termasuk baris versi load di schema yang ditulis tahap tersebut.
+    Mengembalikan list laporan {stage, rows, seconds}.
+    """
+    selected = [(name, func) for name, func in STAGES if stages is None or name in stages]
+    report = []
+
+    conn = psycopg2.connect(**(conn_args or conn_args_from_env()))
+    try:
+        for i, (name, func) in enumerate(selected, start=1):
+            print(f"[{i}/{len(selected)}] {name}: {func.__doc__.strip().splitlines()[0]}")
+            start_time = time.time()
+            with conn:  # commit di akhir blok, rollback jika exception
+                with conn.cursor() as cur:
+                    rows = func(cur, paths)
+                    if name in STAGE_SCHEMA:
+                        record_load_version(cur, STAGE_SCHEMA[name], name, rows)
+            elapsed = time.time() - start_time
+            report.append({"stage": name, "rows": int(rows), "seconds": round(elapsed, 4)})
+            print(f"      ✅ {rows:,} baris dalam {elapsed:.4f} seconds")
+    finally:
+        conn.close()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ELT pipeline (raw -> stg -> gold) di dalam PostgreSQL")
+    parser.add_argument("--flights", default=os.getenv("FLIGHTS_CSV", "Flight.csv"), help="CSV penerbangan")
+    parser.add_argument("--weather", default=os.getenv("WEATHER_CSV", "Weather.csv"), help="CSV cuaca per jam")
+    parser.add_argument("--weather-location", default=os.getenv("WEATHER_LOCATION_CSV"),
+                        help="CSV metadata lokasi cuaca (opsional)")
+    parser.add_argument("--ingest-workers", type=int, default=4,
+                        help="Jumlah koneksi COPY paralel untuk Flight.csv (1 = COPY tunggal)")
+    parser.add_argument("--stages", nargs="+", choices=[name for name, _ in STAGES],
+                        help="Jalankan hanya tahap tertentu (default: semua)")
+    parser.add_argument("--report", help="Simpan laporan durasi & jumlah baris per tahap ke file JSON")
+    parser.add_argument("--profile", action="store_true",
+                        help="Profiling stg.flights_cleaned & stg.weather_cleaned setelah pipeline selesai")
+    parser.add_argument("--profile-sample", type=float, help="Profiling memakai TABLESAMPLE N persen")
+    args = parser.parse_args()
+
+    paths = {
+        "flights": args.flights,
+        "weather": args.weather,
+        "weather_location": args.weather_location,
+        "ingest_workers": args.ingest_workers,
+    }
+    needs_files = args.stages is None or {"raw_flights", "raw_weather"} & set(args.stages)
+    for key in ("flights", "weather"):
+        if needs_files and not os.path.exists(paths[key]):
+            print(f"[FAILED] File tidak ditemukan: {paths[key]}")
+            sys.exit(1)
+
+    print("==========================================")
+    print("      STARTING BIG DATA ELT PIPELINE      ")
+    print("==========================================\n")
+    start_time = time.time()
+    report = run_elt(paths, args.stages)
+
+    print("\n==========================================")
+    print("           PIPELINE COMPLETED             ")
+    print("==========================================")
+    print(f"\n{'stage':<30}{'rows':>12}{'seconds':>12}")
+    for r in report:
+        print(f"{r['stage']:<30}{r['rows']:>12,}{r['seconds']:>12.4f}")
+    print(f"{'TOTAL':<30}{'':>12}{time.time() - start_time:>12.4f}")
+
+    if args.profile:
+        import profiling
+        profiling.profile_tables(sample_pct=args.profile_sample, outliers=True)
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nLaporan disimpan ke {args.report}")
+
+
+if __name__ == "__main__":
+    main()
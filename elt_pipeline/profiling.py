@@ -0,0 +1,192 @@
+import argparse
+import time
+
+import pandas as pd
+import psycopg2
+
+from elt_runner import conn_args_from_env
+
+# ---------------------------------------------------------
+# Profiling layer staging ELT dengan satu query agregat per tabel.
+# Null count, min/max, dan percentile_cont (array) untuk semua kolom numerik
+# serta deteksi duplikat (hash per baris) dihitung dalam satu sequential scan,
+# menggantikan query per kolom + GROUP BY semua kolom di notebook.
+# ---------------------------------------------------------
+
+NUMERIC_TYPES = {"smallint", "integer", "bigint", "numeric", "real", "double precision"}
+ORDERED_TYPES = NUMERIC_TYPES | {"date", "timestamp without time zone", "timestamp with time zone"}
+DEFAULT_PERCENTILES = (0.25, 0.5, 0.75)
+DEFAULT_TABLES = ["stg.flights_cleaned", "stg.weather_cleaned"]
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def get_columns(cur, schema, table):
+    """Daftar (nama kolom, tipe data) sesuai urutan di tabel"""
+    cur.execute(
+        """
+        SELECT column_name, data_type
+        FROM information_schema.columns
+        WHERE table_schema = %s AND table_name = %s
+        ORDER BY ordinal_position;
+        """,
+        (schema, table),
+    )
+    return cur.fetchall()
+
+
+def _from_clause(schema, table, sample_pct=None, sample_method="SYSTEM", seed=42):
+    source = f"{_quote(schema)}.{_quote(table)} AS t"
+    if sample_pct:
+        source += f" TABLESAMPLE {sample_method} ({float(sample_pct)}) REPEATABLE ({int(seed)})"
+    return source
+
+
+def build_profile_query(schema, table, columns, percentiles=DEFAULT_PERCENTILES,
+                        sample_pct=None, sample_method="SYSTEM", duplicates=True):
+    """
+    Membuat satu SELECT agregat untuk seluruh kolom tabel:
+    - COUNT(*) total dan jumlah NULL per kolom
+    - MIN/MAX untuk kolom numerik & tanggal
+    - percentile_cont(ARRAY[...]) untuk kolom numerik
+    - jumlah baris duplikat = COUNT(*) - COUNT(DISTINCT hash baris)
+    Mengembalikan (sql, daftar alias) sesuai urutan kolom hasil.
+    """
+    pct_array = "ARRAY[" + ", ".join(str(float(p)) for p in percentiles) + "]::float8[]"
+    exprs = ["COUNT(*)"]
+    aliases = [("__table__", "row_count")]
+    for name, data_type in columns:
+        col = f"t.{_quote(name)}"
+        exprs.append(f"COUNT(*) - COUNT({col})")
+        aliases.append((name, "null_count"))
+        if data_type in ORDERED_TYPES:
+            exprs += [f"MIN({col})", f"MAX({col})"]
+            aliases += [(name, "min"), (name, "max")]
+        if data_type in NUMERIC_TYPES:
+            exprs.append(f"percentile_cont({pct_array}) WITHIN GROUP (ORDER BY {col})")
+            aliases.append((name, "percentiles"))
+    if duplicates:
+        # Hash 64-bit dari representasi teks seluruh baris (peluang tabrakan diabaikan)
+        exprs.append("COUNT(*) - COUNT(DISTINCT hashtextextended(t::text, 0))")
+        aliases.append(("__table__", "duplicate_rows"))
+
+    sql = "SELECT\n    " + ",\n    ".join(exprs) + "\nFROM " + _from_clause(schema, table, sample_pct, sample_method)
+    return sql, aliases
+
+
+def build_outlier_query(schema, table, bounds, sample_pct=None, sample_method="SYSTEM"):
+    """Hitung outlier IQR untuk semua kolom numerik sekaligus (satu scan tambahan)"""
+    exprs = [
+        f"COUNT(*) FILTER (WHERE t.{_quote(name)} < {lo!r} OR t.{_quote(name)} > {hi!r})"
+        for name, (lo, hi) in bounds.items()
+    ]
+    return "SELECT\n    " + ",\n    ".join(exprs) + "\nFROM " + _from_clause(schema, table, sample_pct, sample_method)
+
+
+def profile_table(cur, qualified_name, percentiles=DEFAULT_PERCENTILES, sample_pct=None,
+                  sample_method="SYSTEM", duplicates=True, outliers=False):
+    """
+    Profiling satu tabel (format 'schema.table'). Mengembalikan (summary dict, DataFrame
+    per kolom). 'sample_pct' mengaktifkan TABLESAMPLE; 'outliers' menambah satu scan
+    untuk menghitung outlier IQR dari kuartil hasil scan pertama.
+    """
+    schema, table = qualified_name.split(".", 1)
+    columns = get_columns(cur, schema, table)
+    if not columns:
+        raise ValueError(f"Tabel {qualified_name} tidak ditemukan")
+
+    start_time = time.time()
+    sql, aliases = build_profile_query(schema, table, columns, percentiles, sample_pct, sample_method, duplicates)
+    cur.execute(sql)
+    values = cur.fetchone()
+
+    summary = {"table": qualified_name, "sampled_pct": sample_pct, "scans": 1}
+    stats = {name: {"column": name, "data_type": data_type} for name, data_type in columns}
+    for (name, metric), value in zip(aliases, values):
+        if name == "__table__":
+            summary[metric] = int(value)
+        elif metric == "percentiles":
+            for p, v in zip(percentiles, value or [None] * len(percentiles)):
+                stats[name][f"p{int(round(p * 100))}"] = v
+        else:
+            stats[name][metric] = value
+
+    total = summary["row_count"]
+    for s in stats.values():
+        s["null_pct"] = round(s["null_count"] / total * 100, 4) if total else 0.0
+
+    if outliers and 0.25 in percentiles and 0.75 in percentiles:
+        bounds = {}
+        for name, s in stats.items():
+            q1, q3 = s.get("p25"), s.get("p75")
+            if q1 is not None and q3 is not None:
+                iqr = q3 - q1
+                bounds[name] = (q1 - 1.5 * iqr, q3 + 1.5 * iqr)
+        if bounds:
+            cur.execute(build_outlier_query(schema, table, bounds, sample_pct, sample_method))
+            for name, count in zip(bounds, cur.fetchone()):
+                stats[name]["outlier_count"] = int(count)
+            summary["scans"] += 1
+
+    summary["seconds"] = round(time.time() - start_time, 4)
+    return summary, pd.DataFrame(list(stats.values()))
+
+
+def profile_tables(tables=None, conn_args=None, **kwargs):
+    """Profiling beberapa tabel memakai satu koneksi read-only"""
+    results = {}
+    conn = psycopg2.connect(**(conn_args or conn_args_from_env()))
+    try:
+        conn.set_session(readonly=True, autocommit=True)
+        with conn.cursor() as cur:
+            for qualified_name in tables or DEFAULT_TABLES:
+                summary, frame = profile_table(cur, qualified_name, **kwargs)
+                results[qualified_name] = (summary, frame)
+                sample = f", sample {summary['sampled_pct']}%" if summary["sampled_pct"] else ""
+                print(f"\n--- Profil {qualified_name} ({summary['row_count']:,} baris{sample}, "
+                      f"{summary['scans']} scan, {summary['seconds']:.4f} seconds) ---")
+                if "duplicate_rows" in summary:
+                    print(f"Duplicate rows: {summary['duplicate_rows']}")
+                missing = frame[frame["null_count"] > 0]
+                if missing.empty:
+                    print("Missing values: tidak ada")
+                else:
+                    print("Missing values:")
+                    print(missing[["column", "null_count", "null_pct"]]
+                          .sort_values("null_count", ascending=False).to_string(index=False))
+                if "outlier_count" in frame.columns:
+                    flagged = frame[frame["outlier_count"].fillna(0) > 0]
+                    for _, row in flagged.iterrows():
+                        print(f"Column '{row['column']}': {int(row['outlier_count'])} outliers found.")
+    finally:
+        conn.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profiling tabel staging ELT (satu scan per tabel)")
+    parser.add_argument("tables", nargs="*", default=DEFAULT_TABLES, help="Tabel dalam format schema.table")
+    parser.add_argument("--sample", type=float, help="Profil TABLESAMPLE sebanyak N persen")
+    parser.add_argument("--sample-method", choices=["SYSTEM", "BERNOULLI"], default="SYSTEM")
+    parser.add_argument("--no-duplicates", action="store_true", help="Lewati deteksi duplikat")
+    parser.add_argument("--outliers", action="store_true", help="Hitung outlier IQR (satu scan tambahan)")
+    parser.add_argument("--output", help="Simpan statistik per kolom ke CSV")
+    args = parser.parse_args()
+
+    results = profile_tables(
+        args.tables,
+        sample_pct=args.sample,
+        sample_method=args.sample_method,
+        duplicates=not args.no_duplicates,
+        outliers=args.outliers,
+    )
+    if args.output:
+        frames = [frame.assign(table=name) for name, (_, frame) in results.items()]
+        pd.concat(frames, ignore_index=True).to_csv(args.output, index=False)
+        print(f"\nStatistik disimpan ke {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg2
+
+from elt_runner import conn_args_from_env, _sniff_delimiter
+
+# ---------------------------------------------------------
+# Ingestion paralel Flight.csv ke layer raw ELT.
+# File dipecah menjadi beberapa chunk yang batasnya selalu di akhir baris,
+# setiap chunk di-COPY lewat koneksi sendiri (paralel) ke tabel stage UNLOGGED,
+# lalu filter top 10 kota dibuat langsung sebagai tabel baru (CREATE TABLE AS)
+# sehingga tidak ada INSERT kedua ke tabel yang sudah dibuat sebelumnya.
+# Catatan: pemecahan berbasis newline mengasumsikan tidak ada field ber-quote
+# yang berisi newline (benar untuk data Flight BTS).
+# ---------------------------------------------------------
+
+STAGE_TABLE = "raw.flights_raw_stage"
+TARGET_TABLE = "raw.flights_raw"
+READ_BUFFER = 8 * 1024 * 1024
+
+
+def split_chunks(path, n_chunks):
+    """
+    Menghitung rentang byte [start, end) untuk tiap chunk. Chunk pertama dimulai
+    setelah baris header; setiap batas digeser ke karakter setelah newline berikutnya.
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        f.readline()  # header
+        data_start = f.tell()
+        if size <= data_start:
+            return []
+
+        step = max(1, (size - data_start) // max(1, n_chunks))
+        bounds = [data_start]
+        for i in range(1, n_chunks):
+            target = data_start + i * step
+            if target <= bounds[-1]:
+                continue
+            f.seek(target - 1)
+            f.readline()  # lanjut sampai akhir baris
+            pos = f.tell()
+            if pos >= size:
+                break
+            if pos > bounds[-1]:
+                bounds.append(pos)
+        bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+class _ChunkReader:
+    """File-like object yang hanya membaca rentang byte [start, end) dari file"""
+
+    def __init__(self, path, start, end):
+        self._f = open(path, "rb")
+        self._f.seek(start)
+        self._remaining = end - start
+
+    def read(self, size=-1):
+        if self._remaining <= 0:
+            return b""
+        if size is None or size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._f.read(min(size, READ_BUFFER))
+        self._remaining -= len(data)
+        return data
+
+    def close(self):
+        self._f.close()
+
+
+def _copy_chunk(path, start, end, delimiter, conn_args):
+    """COPY satu chunk ke tabel stage lewat koneksi tersendiri (commit per chunk)"""
+    conn = psycopg2.connect(**conn_args)
+    reader = _ChunkReader(path, start, end)
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.copy_expert(
+                    f"COPY {STAGE_TABLE} FROM STDIN WITH (FORMAT csv, HEADER false, DELIMITER '{delimiter}')",
+                    reader,
+                )
+                return cur.rowcount
+    finally:
+        reader.close()
+        conn.close()
+
+
+def parallel_copy(path, workers=4, conn_args=None):
+    """
+    Membuat ulang tabel stage UNLOGGED lalu COPY file secara paralel per chunk.
+    Mengembalikan statistik {rows, bytes, chunks, seconds}.
+    """
+    conn_args = conn_args or conn_args_from_env()
+    delimiter = _sniff_delimiter(path)
+    chunks = split_chunks(path, workers)
+
+    setup = psycopg2.connect(**conn_args)
+    try:
+        with setup:
+            with setup.cursor() as cur:
+                cur.execute(f"DROP TABLE IF EXISTS {STAGE_TABLE};")
+                cur.execute(f"CREATE UNLOGGED TABLE {STAGE_TABLE} (LIKE {TARGET_TABLE} INCLUDING ALL);")
+    finally:
+        setup.close()
+
+    start_time = time.time()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_copy_chunk, path, s, e, delimiter, conn_args) for s, e in chunks]
+        rows = sum(f.result() for f in futures)
+    elapsed = time.time() - start_time
+
+    n_bytes = sum(e - s for s, e in chunks)
+    return {"rows": rows, "bytes": n_bytes, "chunks": len(chunks), "seconds": elapsed}
+
+
+def filter_top_cities(cur, top_n=10):
+    """
+    Membuat raw.flights_raw langsung dari tabel stage (CREATE TABLE AS) dengan filter
+    top-N kota asal & tujuan, lalu menghapus tabel stage. Mengembalikan jumlah baris.
+    """
+    cur.execute(f"DROP TABLE IF EXISTS {TARGET_TABLE};")
+    cur.execute(f"""
+        CREATE TABLE {TARGET_TABLE} AS
+        WITH top_origin AS (
+            SELECT origin_city FROM {STAGE_TABLE}
+            GROUP BY origin_city ORDER BY COUNT(*) DESC LIMIT {int(top_n)}
+        ),
+        top_dest AS (
+            SELECT dest_city FROM {STAGE_TABLE}
+            GROUP BY dest_city ORDER BY COUNT(*) DESC LIMIT {int(top_n)}
+        )
+        SELECT s.* FROM {STAGE_TABLE} s
+        WHERE s.origin_city IN (SELECT origin_city FROM top_origin)
+          AND s.dest_city IN (SELECT dest_city FROM top_dest);
+    """)
+    rows = cur.rowcount
+    cur.execute(f"DROP TABLE {STAGE_TABLE};")
+    return rows
+
+
+def ingest_flights(cur, path, workers=4, conn_args=None):
+    """
+    Tahap raw flights versi paralel (dipakai elt_runner jika --ingest-workers > 1).
+    COPY paralel di-commit oleh masing-masing worker; filter kota berjalan di
+    transaksi milik 'cur'.
+    """
+    stats = parallel_copy(path, workers, conn_args)
+    mb = stats["bytes"] / 1024 / 1024
+    print(f"      -> COPY paralel: {stats['chunks']} chunk, {stats['rows']:,} baris, {mb:.2f} MB "
+          f"dalam {stats['seconds']:.4f} seconds "
+          f"({mb / max(stats['seconds'], 1e-9):.2f} MB/s, {stats['rows'] / max(stats['seconds'], 1e-9):,.0f} rows/s)")
+
+    start_time = time.time()
+    rows = filter_top_cities(cur)
+    print(f"      -> Filter top 10 kota (CREATE TABLE AS): {rows:,} baris dalam {time.time() - start_time:.4f} seconds")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingestion paralel Flight.csv ke raw.flights_raw")
+    parser.add_argument("path", nargs="?", default=os.getenv("FLIGHTS_CSV", "Flight.csv"))
+    parser.add_argument("--workers", type=int, default=4, help="Jumlah koneksi COPY paralel")
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**conn_args_from_env())
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT to_regclass(%s);", (TARGET_TABLE,))
+            exists = cur.fetchone()[0] is not None
+        conn.rollback()
+        if not exists:
+            raise SystemExit(f"{TARGET_TABLE} belum ada. Jalankan dulu: python elt_runner.py --stages raw_schema")
+
+        start_time = time.time()
+        with conn:
+            with conn.cursor() as cur:
+                ingest_flights(cur, args.path, args.workers)
+        print(f"Total: {time.time() - start_time:.4f} seconds")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
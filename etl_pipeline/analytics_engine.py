@@ -0,0 +1,462 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+import load_warehouse
+
+# ---------------------------------------------------------
+# Engine analitik in-memory: 8 metrik warehouse/sql_analitycs dihitung langsung
+# dari df_final (tanpa PostgreSQL). Group-by memakai np.bincount pada key yang
+# sudah di-encode (airline_key, band cuaca) atau np.unique (sorted-segment) untuk
+# key lain, sehingga tidak ada pandas groupby / objek Python per baris.
+# Semantik NULL mengikuti SQL: perbandingan dengan NaN = false, AVG/SUM
+# mengabaikan NaN, dan NULL diurutkan paling awal pada ORDER BY ... DESC.
+# ---------------------------------------------------------
+
+# Kolom fact yang dibutuhkan oleh 8 query (nama setelah normalize_col_names)
+REQUIRED_COLUMNS = [
+    "airline_key", "airline", "origin_city_key", "origin_city",
+    "dep_delay", "arr_delay", "taxi_out", "cancelled", "delay_due_weather",
+    "origin_precipitation_mm", "origin_wind_speed_10m_kmh", "origin_cloud_cover_percent",
+    "origin_snowfall_cm", "origin_temperature_2m_c", "origin_weather_code_wmo_code",
+    "dest_cloud_cover_percent",
+]
+
+# Mapping kolom encode dari transformation.py ke nama key (sama dengan build_star_schema)
+KEY_RENAME = {
+    "airline_encode": "airline_key",
+    "origin_cities_encode": "origin_city_key",
+    "dest_cities_encode": "dest_city_key",
+}
+
+
+def prepare_frame(df):
+    """
+    Proyeksi df_final ke array numpy float64 (kolom angka) dan nama dimensi.
+    Nama kolom dinormalisasi dengan aturan yang sama seperti loader warehouse,
+    tanpa menyalin seluruh DataFrame.
+    """
+    header = df.iloc[:0].rename(columns={k: v for k, v in KEY_RENAME.items() if k in df.columns})
+    normalized = load_warehouse.normalize_col_names(header).columns
+    source = dict(zip(normalized, df.columns))
+
+    missing = [c for c in REQUIRED_COLUMNS if c not in source]
+    if missing:
+        raise KeyError(f"Kolom tidak ditemukan di df_final: {missing}")
+
+    cols = {}
+    for col in REQUIRED_COLUMNS:
+        values = df[source[col]]
+        if col in ("airline", "origin_city"):
+            cols[col] = values.to_numpy(dtype=object)
+        else:
+            cols[col] = pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float64)
+    cols["n_rows"] = len(df)
+    return cols
+
+
+# ---------------------------------------------------------
+# Primitive group-by
+# ---------------------------------------------------------
+def _factorize(keys):
+    """
+    Mengubah key menjadi kode 0..n-1 beserta nilai unik-nya (terurut, NaN di akhir).
+    Key integer dengan rentang kecil langsung di-offset (siap untuk bincount);
+    selain itu memakai np.unique (sort + segment).
+    """
+    finite = ~np.isnan(keys) if keys.dtype.kind == "f" else np.ones(len(keys), dtype=bool)
+    if finite.all() and len(keys) and np.all(keys == np.floor(keys)):
+        lo, hi = keys.min(), keys.max()
+        if hi - lo < 1_000_000:
+            present = np.bincount((keys - lo).astype(np.int64)) > 0
+            uniques = np.flatnonzero(present) + lo
+            remap = np.cumsum(present) - 1
+            return remap[(keys - lo).astype(np.int64)], uniques.astype(keys.dtype)
+    uniques, codes = np.unique(keys, return_inverse=True)
+    return codes.ravel(), uniques
+
+
+def _segments(codes, n_groups, mask=None):
+    """Jumlah baris per grup (COUNT(*)), opsional hanya baris dengan mask=True"""
+    if mask is not None:
+        codes = codes[mask]
+    return np.bincount(codes, minlength=n_groups).astype(np.int64)
+
+
+def _sum_count(codes, n_groups, values, mask=None):
+    """SUM dan COUNT non-null per grup (NaN diabaikan seperti SQL)"""
+    valid = ~np.isnan(values)
+    if mask is not None:
+        valid &= mask
+    c = codes[valid]
+    sums = np.bincount(c, weights=values[valid], minlength=n_groups)
+    counts = np.bincount(c, minlength=n_groups).astype(np.int64)
+    return sums, counts
+
+
+def _avg(sums, counts):
+    """AVG ala SQL: NULL (NaN) jika tidak ada nilai non-null"""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+
+def _sum_or_null(sums, counts):
+    """SUM ala SQL: NULL (NaN) jika semua nilai NULL"""
+    return np.where(counts > 0, sums, np.nan)
+
+
+def _as_int(values):
+    """Kembalikan int64 jika semua nilai bulat & non-null (seperti BIGINT di SQL)"""
+    if len(values) and not np.isnan(values).any() and np.all(values == np.floor(values)):
+        return values.astype(np.int64)
+    return values
+
+
+def _round(values, decimals=2):
+    """ROUND numeric PostgreSQL (half away from zero)"""
+    factor = 10.0 ** decimals
+    return np.sign(values) * np.floor(np.abs(values) * factor + 0.5 + 1e-9) / factor
+
+
+def _band(conditions, labels, n_rows):
+    """CASE WHEN ... THEN <kode> END -> kode band (NaN jika tidak ada kondisi yang cocok)"""
+    codes = np.full(n_rows, np.nan)
+    for cond, code in reversed(list(zip(conditions, range(len(labels))))):
+        codes[cond] = code
+    return codes
+
+
+def _label(uniques, labels):
+    return [labels[int(u)] if not np.isnan(u) else None for u in uniques]
+
+
+def _order(frame, column, ascending):
+    """ORDER BY dengan aturan NULL PostgreSQL (NULLS LAST untuk ASC, NULLS FIRST untuk DESC)"""
+    return frame.sort_values(
+        column, ascending=ascending, na_position="last" if ascending else "first", kind="stable"
+    ).reset_index(drop=True)
+
+
+def _names(codes, uniques, names):
+    """Nama dimensi per grup (baris pertama dari tiap key, setara JOIN ke tabel dimensi)"""
+    first = np.full(len(uniques), -1, dtype=np.int64)
+    order = np.arange(len(codes))[::-1]
+    first[codes[order]] = order
+    return names[first]
+
+
+def _by_dimension(cols, key, name):
+    """Kode grup berdasarkan nama dimensi (GROUP BY da.airline / doc.origin_city)"""
+    key_codes, key_uniques = _factorize(cols[key])
+    key_names = _names(key_codes, key_uniques, cols[name])
+    name_uniques, name_of_key = np.unique(key_names.astype(str), return_inverse=True)
+    return name_of_key.ravel()[key_codes], name_uniques
+
+
+# ---------------------------------------------------------
+# 8 metrik (urutan & nama kolom sama dengan 1.sql - 8.sql)
+# ---------------------------------------------------------
+def storm_survival_rate(cols):
+    """1.sql - Survival rate (on-time) per maskapai saat badai"""
+    storm = (cols["origin_precipitation_mm"] > 3) | (cols["origin_wind_speed_10m_kmh"] > 35)
+    codes, names = _by_dimension(cols, "airline_key", "airline")
+    n = len(names)
+    total = _segments(codes, n, storm)
+    on_time = _segments(codes, n, storm & (cols["dep_delay"] <= 0))
+    keep = total > 50
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rate = _round(on_time / np.maximum(total, 1) * 100, 2)
+    out = pd.DataFrame({
+        "airline": names[keep],
+        "total_flights_saat_badai": total[keep],
+        "on_time_flights": on_time[keep],
+        "survival_rate_persen": rate[keep],
+    })
+    return _order(out, "survival_rate_persen", ascending=False)
+
+
+def hub_vs_small_airport(cols):
+    """2.sql - Gap delay saat hujan untuk hub (top 10% volume) vs bandara kecil"""
+    codes, names = _by_dimension(cols, "origin_city_key", "origin_city")
+    volume = _segments(codes, len(names))
+    present = volume > 0
+    threshold = np.percentile(volume[present], 90) if present.any() else np.nan
+    labels = np.array(["Major Hub (Top 10%)", "Small/Medium Airport"])
+    city_type = np.where(volume > threshold, 0, 1)
+
+    type_codes = city_type[codes]
+    all_sum, all_cnt = _sum_count(type_codes, 2, cols["dep_delay"])
+    rain_sum, rain_cnt = _sum_count(type_codes, 2, cols["dep_delay"], cols["origin_precipitation_mm"] > 0)
+    rows = _segments(type_codes, 2) > 0
+
+    avg_all = _avg(all_sum, all_cnt)
+    avg_rain = _avg(rain_sum, rain_cnt)
+    out = pd.DataFrame({
+        "tipe_bandara": labels[rows],
+        "avg_delay_all": avg_all[rows],
+        "avg_delay_hujan": avg_rain[rows],
+        "gap_dampak_cuaca": (avg_rain - avg_all)[rows],
+    })
+    return out
+
+
+def clear_weather_baseline(cols):
+    """3.sql - Baseline delay & taxi-out per maskapai saat cuaca cerah"""
+    clear = (
+        (cols["origin_precipitation_mm"] == 0)
+        & (cols["origin_wind_speed_10m_kmh"] < 10)
+        & (cols["origin_cloud_cover_percent"] < 20)
+        & (cols["origin_snowfall_cm"] == 0)
+    )
+    codes, names = _by_dimension(cols, "airline_key", "airline")
+    n = len(names)
+    total = _segments(codes, n, clear)
+    delay = _avg(*_sum_count(codes, n, cols["dep_delay"], clear))
+    taxi = _avg(*_sum_count(codes, n, cols["taxi_out"], clear))
+    keep = total > 100
+    out = pd.DataFrame({
+        "airline": names[keep],
+        "baseline_delay_cerah": delay[keep],
+        "baseline_taxi_cerah": taxi[keep],
+        "total_flight_sample": total[keep],
+    })
+    return _order(out, "baseline_delay_cerah", ascending=True)
+
+
+def _wmo_description(code):
+    if np.isnan(code):
+        return "Lainnya"
+    if code == 0:
+        return "Cerah"
+    if 1 <= code <= 3:
+        return "Berawan"
+    if 45 <= code <= 48:
+        return "Kabut (Fog)"
+    if 51 <= code <= 67:
+        return "Gerimis/Hujan Ringan"
+    if 71 <= code <= 77:
+        return "Salju"
+    if code >= 95:
+        return "Badai Petir (Thunderstorm)"
+    return "Lainnya"
+
+
+def delay_by_weather_code(cols):
+    """4.sql - Delay & pembatalan per kode cuaca WMO"""
+    codes, uniques = _factorize(cols["origin_weather_code_wmo_code"])
+    n = len(uniques)
+    delay = _avg(*_sum_count(codes, n, cols["dep_delay"]))
+    cancelled = _sum_or_null(*_sum_count(codes, n, cols["cancelled"]))
+    out = pd.DataFrame({
+        "origin_weather_code_wmo_code": _as_int(uniques),
+        "deskripsi_cuaca": [_wmo_description(u) for u in uniques],
+        "avg_delay": delay,
+        "total_batal": _as_int(cancelled),
+    })
+    return _order(out, "avg_delay", ascending=False)
+
+
+def _banded_average(cols, band_codes, labels, measures):
+    """Group-by untuk kolom CASE band (termasuk grup NULL), AVG untuk tiap measure"""
+    codes, uniques = _factorize(band_codes)
+    n = len(uniques)
+    out = {"_band": uniques}
+    for out_col, (src_col, scale) in measures.items():
+        out[out_col] = _avg(*_sum_count(codes, n, cols[src_col])) * scale
+    frame = pd.DataFrame(out)
+    frame.insert(0, "_label", _label(uniques, labels))
+    return frame, codes, n
+
+
+def cloud_cover_arrival_delay(cols):
+    """5.sql - Delay kedatangan per tutupan awan di kota tujuan"""
+    cloud = cols["dest_cloud_cover_percent"]
+    labels = ["Langit Bersih (0-25%)", "Berawan Sebagian (25-75%)", "Mendung Total (>75%)"]
+    band = _band([cloud < 25, (cloud >= 25) & (cloud <= 75), cloud > 75], labels, cols["n_rows"])
+    frame, _, _ = _banded_average(cols, band, labels, {"rata_rata_delay_kedatangan": ("arr_delay", 1)})
+    out = frame.rename(columns={"_label": "kondisi_langit_tujuan"}).drop(columns="_band")
+    return _order(out, "rata_rata_delay_kedatangan", ascending=False)
+
+
+def temperature_delay(cols):
+    """6.sql - Delay keberangkatan & kedatangan per kategori suhu"""
+    temp = cols["origin_temperature_2m_c"]
+    labels = ["Beku (< 0°C)", "Normal (0-30°C)", "Panas (> 30°C)"]
+    band = _band([temp < 0, (temp >= 0) & (temp <= 30), temp > 30], labels, cols["n_rows"])
+    frame, _, _ = _banded_average(cols, band, labels, {
+        "avg_departure_delay": ("dep_delay", 1),
+        "avg_arrival_delay": ("arr_delay", 1),
+    })
+    out = frame.rename(columns={"_label": "kategori_suhu"}).drop(columns="_band")
+    return _order(out, "avg_departure_delay", ascending=False)
+
+
+def snow_impact(cols):
+    """7.sql - Maskapai paling terdampak salju"""
+    snow = cols["origin_snowfall_cm"] > 0
+    codes, names = _by_dimension(cols, "airline_key", "airline")
+    n = len(names)
+    total = _segments(codes, n, snow)
+    delay = _avg(*_sum_count(codes, n, cols["dep_delay"], snow))
+    taxi = _avg(*_sum_count(codes, n, cols["taxi_out"], snow))
+    cancelled = _sum_or_null(*_sum_count(codes, n, cols["cancelled"], snow))
+    keep = total > 50
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pct = _round(cancelled / np.maximum(total, 1) * 100, 2)
+    out = pd.DataFrame({
+        "airline": names[keep],
+        "jumlah_penerbangan_salju": total[keep],
+        "rata_rata_delay_menit": _round(delay, 2)[keep],
+        "rata_rata_waktu_taxi_menit": _round(taxi, 2)[keep],
+        "jumlah_batal": _as_int(cancelled[keep]),
+        "persentase_pembatalan": pct[keep],
+    })
+    return _order(out, "rata_rata_delay_menit", ascending=False)
+
+
+def rain_delay(cols):
+    """8.sql - Rata-rata delay per kondisi hujan"""
+    precip = cols["origin_precipitation_mm"]
+    labels = ["1. Cerah/Berawan (0 mm)", "2. Hujan Ringan (0.1 - 5 mm)", "3. Hujan Lebat (> 5 mm)"]
+    band = _band([precip == 0, (precip >= 0.1) & (precip <= 5), precip > 5], labels, cols["n_rows"])
+    frame, codes, n = _banded_average(cols, band, labels, {
+        "rata_rata_total_delay": ("dep_delay", 1),
+        "rata_rata_delay_karena_cuaca": ("delay_due_weather", 1),
+        "rata_rata_waktu_taxi": ("taxi_out", 1),
+        "persentase_pembatalan": ("cancelled", 100),
+    })
+    out = frame.rename(columns={"_label": "kondisi_hujan"}).drop(columns="_band")
+    out.insert(1, "total_penerbangan", _segments(codes, n))
+    for col in out.columns[2:]:
+        out[col] = _round(out[col].to_numpy(), 2)
+    # ORDER BY 1 (label berawalan angka, NULL di akhir) = urutan kode band
+    return out
+
+
+# Nama file SQL -> fungsi engine
+METRICS = {
+    "1.sql": storm_survival_rate,
+    "2.sql": hub_vs_small_airport,
+    "3.sql": clear_weather_baseline,
+    "4.sql": delay_by_weather_code,
+    "5.sql": cloud_cover_arrival_delay,
+    "6.sql": temperature_delay,
+    "7.sql": snow_impact,
+    "8.sql": rain_delay,
+}
+
+
+def run_all(df):
+    """Menghitung semua metrik dari df_final. Mengembalikan dict {nama_query: DataFrame}"""
+    cols = prepare_frame(df)
+    return {name: func(cols) for name, func in METRICS.items()}
+
+
+# ---------------------------------------------------------
+# Benchmark vs PostgreSQL
+# ---------------------------------------------------------
+def _normalize_result(frame):
+    """Samakan tipe hasil SQL (Decimal/None) dan engine (float/NaN) untuk perbandingan"""
+    out = frame.copy()
+    for col in out.columns:
+        converted = pd.to_numeric(out[col], errors="coerce")
+        if converted.notna().sum() == out[col].notna().sum():
+            out[col] = converted.astype(np.float64)
+        else:
+            out[col] = out[col].astype(object).where(out[col].notna(), None)
+    return out.sort_values(list(out.columns), na_position="last").reset_index(drop=True)
+
+
+def results_match(engine_frame, sql_frame, rtol=1e-6):
+    """True jika hasil engine dan SQL sama (kolom, jumlah baris, dan nilai)"""
+    if list(engine_frame.columns) != list(sql_frame.columns) or len(engine_frame) != len(sql_frame):
+        return False
+    a, b = _normalize_result(engine_frame), _normalize_result(sql_frame)
+    for col in a.columns:
+        x, y = a[col].to_numpy(), b[col].to_numpy()
+        if x.dtype.kind == "f" and y.dtype.kind == "f":
+            if not np.allclose(x, y, rtol=rtol, atol=1e-9, equal_nan=True):
+                return False
+        elif list(x) != list(y):
+            return False
+    return True
+
+
+def benchmark(df, repeat=5, layout="public"):
+    """
+    Membandingkan latency engine in-memory dengan query PostgreSQL (analytics_runner)
+    dan memeriksa bahwa hasilnya identik. Waktu engine termasuk prepare_frame.
+    """
+    import analytics_runner
+
+    print(f"\n--- Benchmark engine in-memory vs PostgreSQL ({repeat}x) ---")
+    timings = {"prepare": []}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cols = prepare_frame(df)
+        timings["prepare"].append((time.perf_counter() - start) * 1000)
+
+    engine_results = {}
+    for name, func in METRICS.items():
+        timings[name] = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            engine_results[name] = func(cols)
+            timings[name].append((time.perf_counter() - start) * 1000)
+
+    sql_stats = {r["query"]: r for r in analytics_runner.benchmark_layout(layout, repeat=repeat)}
+    sql_results = {}
+    with analytics_runner._layout_conn(layout) as conn:
+        for q in analytics_runner.discover_queries():
+            if q["name"] in METRICS:
+                sql_results[q["name"]] = analytics_runner._execute(conn, q["sql"])
+
+    report = []
+    prepare_ms = float(np.median(timings["prepare"]))
+    print(f"\n   prepare_frame: {prepare_ms:.2f} ms (sekali untuk semua metrik)")
+    print(f"   {'query':<8}{'engine p50':>14}{'postgres p50':>16}{'speedup':>10}  hasil")
+    for name in METRICS:
+        engine_ms = float(np.median(timings[name]))
+        sql_ms = sql_stats.get(name, {}).get("p50_ms", np.nan)
+        match = name in sql_results and results_match(engine_results[name], sql_results[name])
+        report.append({"query": name, "engine_p50_ms": engine_ms, "postgres_p50_ms": sql_ms, "match": match})
+        print(f"   {name:<8}{engine_ms:>11.2f} ms{sql_ms:>13.2f} ms{sql_ms / engine_ms:>9.1f}x  "
+              f"{'✅ sama' if match else '❌ berbeda'}")
+    return report
+
+
+def _load_export(export_dir):
+    """Membaca fact_flights + nama dimensi dari hasil export_columnar (Parquet)"""
+    import pyarrow.parquet as pq
+
+    fact = pq.read_table(os.path.join(export_dir, "fact_flights")).to_pandas()
+    for dim, key, name in (("dim_airline", "airline_key", "airline"),
+                           ("dim_origin_city", "origin_city_key", "origin_city")):
+        lookup = pd.read_parquet(os.path.join(export_dir, f"{dim}.parquet"))
+        fact[name] = fact[key].map(lookup.set_index(key)[name])
+    return fact
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Engine analitik in-memory + benchmark vs PostgreSQL")
+    parser.add_argument("--source", default=os.getenv("STAR_EXPORT_DIR", "star_schema_parquet"),
+                        help="Folder export Parquet (export_columnar.py) sebagai pengganti df_final")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--layout", default="public", help="Schema PostgreSQL pembanding")
+    parser.add_argument("--no-db", action="store_true", help="Hanya cetak hasil engine, tanpa benchmark DB")
+    args = parser.parse_args()
+
+    df = _load_export(args.source)
+    if args.no_db:
+        for name, result in run_all(df).items():
+            print(f"\n--- {name} ---")
+            print(result)
+        return
+    benchmark(df, args.repeat, args.layout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+import load_warehouse
+
+# Lokasi default query analitik dan cache hasil query
+SQL_DIR = os.path.normpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "warehouse", "sql_analitycs")
+)
+CACHE_DIR = os.getenv("QUERY_CACHE_DIR", ".query_cache")
+PERCENTILES = (50, 90, 95, 99)
+
+
+def discover_queries(sql_dir=SQL_DIR):
+    """Mencari semua file *.sql (urut numerik: 1.sql, 2.sql, ..., 10.sql)"""
+    paths = glob.glob(os.path.join(sql_dir, "*.sql"))
+
+    def sort_key(path):
+        name = os.path.splitext(os.path.basename(path))[0]
+        return (0, int(name), name) if name.isdigit() else (1, 0, name)
+
+    queries = []
+    for path in sorted(paths, key=sort_key):
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read().strip().rstrip(";")
+        queries.append({"name": os.path.basename(path), "path": path, "sql": text})
+    return queries
+
+
+def _query_title(sql):
+    """Judul query diambil dari komentar pertama (-- Judul --)"""
+    match = re.match(r"\s*--\s*(.*?)\s*-*\s*$", sql.splitlines()[0]) if sql else None
+    return match.group(1) if match else ""
+
+
+# Tabel versi load per layout: ETL (load_warehouse.record_load_version) & ELT (elt_runner.record_load_version)
+LOAD_LOG_TABLES = ("etl_load_log", "elt_load_log")
+
+
+def get_load_version(conn, layout):
+    """
+    Versi load warehouse untuk sebuah layout (schema): load_id terbaru dari tabel log load
+    di schema tersebut, ditambah oid tabel log (log yang dibuat ulang memulai load_id dari 1).
+    None jika layout tidak punya log load; hasil query tidak di-cache karena statistik
+    tabel (pg_stat_user_tables) tidak berubah andal setelah reload.
+    """
+    with conn.cursor() as cur:
+        for table in LOAD_LOG_TABLES:
+            cur.execute("SELECT to_regclass(%s)::oid;", (f'"{layout}".{table}',))
+            oid = cur.fetchone()[0]
+            if oid is not None:
+                cur.execute(f'SELECT COALESCE(MAX(load_id), 0) FROM "{layout}".{table};')
+                return f"{table}-{oid}-load-{cur.fetchone()[0]}"
+    return None
+
+
+def get_database_id(conn):
+    """Nama + oid database: cache dari database lain (atau database yang dibuat ulang) tidak terpakai"""
+    with conn.cursor() as cur:
+        cur.execute("SELECT datname, oid FROM pg_database WHERE datname = current_database();")
+        name, oid = cur.fetchone()
+    return f"{name}-{oid}"
+
+
+@contextmanager
+def _layout_conn(layout):
+    """
+    Koneksi read-only (autocommit) dengan search_path HANYA schema 'layout' (tanpa fallback
+    ke public), agar tabel yang tidak ada di layout tidak diam-diam dibaca dari public.
+    """
+    conn = load_warehouse.get_conn()
+    try:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(f'SET search_path TO "{layout}";')
+        yield conn
+    finally:
+        conn.close()
+
+
+def referenced_tables(sql):
+    """Nama tabel di FROM/JOIN sebuah query (lowercase), tanpa nama CTE"""
+    sql = re.sub(r"--[^\n]*", " ", sql)
+    ctes = {m.lower() for m in re.findall(r"(?:\bWITH|,)\s*(\w+)\s+AS\s*\(", sql, flags=re.IGNORECASE)}
+    tables = re.findall(r"\b(?:FROM|JOIN)\s+([A-Za-z_][\w.]*)", sql, flags=re.IGNORECASE)
+    return {t.lower() for t in tables} - ctes
+
+
+def check_layout(conn, layout, queries):
+    """
+    Memastikan schema 'layout' memiliki semua tabel yang dipakai query; ValueError jika tidak
+    (misal schema tanpa agg_flights_weather / dim_airline).
+    """
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT c.relname FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = %s AND c.relkind IN ('r', 'p', 'v', 'm', 'f');
+            """,
+            (layout,)
+        )
+        available = {r[0].lower() for r in cur.fetchall()}
+    missing = {}
+    for q in queries:
+        for table in sorted(referenced_tables(q["sql"]) - available):
+            missing.setdefault(table, []).append(q["name"])
+    if missing:
+        detail = ", ".join(f"{t} ({', '.join(names)})" for t, names in sorted(missing.items()))
+        raise ValueError(f"Layout '{layout}' tidak memiliki tabel yang dipakai query: {detail}")
+
+
+def _cache_path(sql, layout, load_version, cache_dir, database):
+    key = hashlib.sha256(f"{database}\n{layout}\n{load_version}\n{sql}".encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, f"{key}.pkl")
+
+
+def _execute(conn, sql):
+    with conn.cursor() as cur:
+        cur.execute(sql)
+        rows = cur.fetchall()
+        columns = [d[0] for d in cur.description]
+    return pd.DataFrame(rows, columns=columns)
+
+
+def run_query(conn, sql, layout="public", load_version=None, cache_dir=CACHE_DIR, use_cache=True,
+              database=None):
+    """
+    Menjalankan satu query dengan cache hasil. Cache di-key oleh database + teks query +
+    layout + versi load, sehingga pembacaan berulang setelah load yang sama langsung dari disk.
+    Mengembalikan (DataFrame, cache_hit).
+    """
+    if use_cache and load_version is not None:
+        path = _cache_path(sql, layout, load_version, cache_dir, database or get_database_id(conn))
+        if os.path.exists(path):
+            return pd.read_pickle(path), True
+
+    result = _execute(conn, sql)
+
+    if use_cache and load_version is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        result.to_pickle(path)
+    return result, False
+
+
+def explain_query(conn, sql):
+    """Mengambil output EXPLAIN (ANALYZE, BUFFERS) dalam format teks"""
+    with conn.cursor() as cur:
+        cur.execute(f"EXPLAIN (ANALYZE, BUFFERS) {sql}")
+        return "\n".join(row[0] for row in cur.fetchall())
+
+
+def benchmark_layout(layout="public", sql_dir=SQL_DIR, repeat=5, warmup=1, explain=False, plan_dir=None):
+    """
+    Menjalankan semua query di 'sql_dir' terhadap satu layout (schema) sebanyak 'repeat'
+    kali (tanpa cache) dan mencatat persentil latency per query.
+    """
+    print(f"\n--- Benchmark layout '{layout}' ({repeat}x per query) ---")
+    results = []
+
+    queries = discover_queries(sql_dir)
+    with _layout_conn(layout) as conn:
+        check_layout(conn, layout, queries)
+
+        for q in queries:
+            entry = {"layout": layout, "query": q["name"], "title": _query_title(q["sql"])}
+            try:
+                for _ in range(warmup):
+                    _execute(conn, q["sql"])
+
+                latencies = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    result = _execute(conn, q["sql"])
+                    latencies.append((time.perf_counter() - start) * 1000)
+
+                entry["rows"] = int(len(result))
+                entry["runs"] = repeat
+                entry["mean_ms"] = float(np.mean(latencies))
+                for p in PERCENTILES:
+                    entry[f"p{p}_ms"] = float(np.percentile(latencies, p))
+
+                if explain:
+                    plan = explain_query(conn, q["sql"])
+                    entry["plan"] = plan
+                    if plan_dir:
+                        out_dir = os.path.join(plan_dir, layout)
+                        os.makedirs(out_dir, exist_ok=True)
+                        with open(os.path.join(out_dir, q["name"].replace(".sql", ".plan.txt")), "w", encoding="utf-8") as f:
+                            f.write(plan)
+
+                print(f"   ✅ {q['name']:<8} p50={entry['p50_ms']:9.2f} ms  p95={entry['p95_ms']:9.2f} ms  rows={entry['rows']}")
+            except Exception as e:
+                entry["error"] = str(e).strip()
+                print(f"   ❌ {q['name']:<8} FAIL: {entry['error'].splitlines()[0]}")
+            results.append(entry)
+    return results
+
+
+def compare_layouts(results, baseline, candidate):
+    """Membandingkan p50 per query antara dua layout (baseline vs kandidat)"""
+    df = pd.DataFrame([r for r in results if "error" not in r])
+    if df.empty:
+        return df
+    pivot = df.pivot_table(index="query", columns="layout", values="p50_ms")
+    if baseline not in pivot.columns or candidate not in pivot.columns:
+        return pivot
+    pivot["speedup"] = pivot[baseline] / pivot[candidate]
+    return pivot
+
+
+def read_queries(layout="public", sql_dir=SQL_DIR, cache_dir=CACHE_DIR, use_cache=True):
+    """
+    Mode dashboard: menjalankan semua query sekali dengan cache hasil.
+    Mengembalikan dict {nama_query: DataFrame}.
+    """
+    outputs = {}
+    queries = discover_queries(sql_dir)
+    with _layout_conn(layout) as conn:
+        check_layout(conn, layout, queries)
+        load_version = get_load_version(conn, layout)
+        if use_cache and load_version is None:
+            print(f"   ⚠️ Layout '{layout}' tidak punya log load ({', '.join(LOAD_LOG_TABLES)}): tanpa cache")
+        database = get_database_id(conn)
+        for q in queries:
+            start = time.perf_counter()
+            result, hit = run_query(conn, q["sql"], layout, load_version, cache_dir, use_cache, database)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"   {'[CACHE]' if hit else '[DB]   '} {q['name']:<8} {elapsed:9.2f} ms  rows={len(result)}")
+            outputs[q["name"]] = result
+    return outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runner & benchmark query analitik warehouse")
+    parser.add_argument("--sql-dir", default=SQL_DIR, help="Folder berisi file *.sql")
+    parser.add_argument("--layouts", nargs="+", default=["public"],
+                        help="Schema yang diuji di database warehouse ETL; setiap schema harus memiliki "
+                             "semua tabel yang dipakai query (agg_flights_weather, dim_*). Dua layout = mode komparasi")
+    parser.add_argument("--repeat", type=int, default=5, help="Jumlah eksekusi per query")
+    parser.add_argument("--warmup", type=int, default=1, help="Eksekusi pemanasan (tidak dihitung)")
+    parser.add_argument("--explain", action="store_true", help="Simpan EXPLAIN (ANALYZE, BUFFERS)")
+    parser.add_argument("--plan-dir", default="query_plans", help="Folder output EXPLAIN")
+    parser.add_argument("--output", help="Simpan laporan benchmark ke file JSON")
+    parser.add_argument("--read", action="store_true",
+                        help="Mode dashboard: jalankan sekali dengan cache hasil per load version")
+    parser.add_argument("--no-cache", action="store_true", help="Nonaktifkan cache hasil pada mode --read")
+    args = parser.parse_args()
+
+    # Semua layout dicek dulu sebelum benchmark dimulai
+    queries = discover_queries(args.sql_dir)
+    for layout in args.layouts:
+        with _layout_conn(layout) as conn:
+            try:
+                check_layout(conn, layout, queries)
+            except ValueError as e:
+                raise SystemExit(f"[FAILED] {e}")
+
+    if args.read:
+        for layout in args.layouts:
+            print(f"\n--- Membaca query layout '{layout}' ---")
+            read_queries(layout, args.sql_dir, use_cache=not args.no_cache)
+        return
+
+    results = []
+    for layout in args.layouts:
+        results.extend(benchmark_layout(layout, args.sql_dir, args.repeat, args.warmup,
+                                        args.explain, args.plan_dir if args.explain else None))
+
+    if len(args.layouts) >= 2:
+        print(f"\n--- Komparasi p50 (ms): {args.layouts[0]} vs {args.layouts[1]} ---")
+        print(compare_layouts(results, args.layouts[0], args.layouts[1]))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nLaporan disimpan ke {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# ---------------------------------------------------------
+# Kamus kota -> location_id Weather.csv (city_locations.csv: city, location_id, latitude, longitude).
+# Menggantikan daftar kategori OrdinalEncoder yang di-hardcode di standarisasi():
+# - filter_data memilih top N kota (N dapat diatur) hanya dari kota yang ada di kamus,
+#   sehingga setiap kota hasil filter pasti punya data cuaca
+# - origin/dest_cities_encode = location_id hasil lookup kamus (vektor, tanpa fit encoder)
+# Untuk 50-100 bandara cukup sediakan kamus & Weather.csv dengan location_id yang sama.
+# ---------------------------------------------------------
+
+DEFAULT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "city_locations.csv")
+LOCATIONS_FILE = os.getenv("ETL_CITY_LOCATIONS", DEFAULT_FILE)
+TOP_N = int(os.getenv("ETL_TOP_N", "10"))
+
+_cache = {}
+
+
+def configure(top_n=None, path=None):
+    """Mengubah N dan/atau file kamus (dipanggil dari argumen CLI main1.py)"""
+    global TOP_N, LOCATIONS_FILE
+    if top_n is not None:
+        if top_n < 1:
+            raise ValueError(f"top_n harus >= 1, bukan {top_n}")
+        TOP_N = int(top_n)
+    if path is not None:
+        LOCATIONS_FILE = path
+
+
+def load_locations(path=None):
+    """DataFrame kamus lokasi (di-cache per path); nama kota & location_id harus unik"""
+    path = path or LOCATIONS_FILE
+    if path not in _cache:
+        locations = pd.read_csv(path, dtype={"city": str, "location_id": "int64"})
+        for col in ("city", "location_id"):
+            duplicated = locations.loc[locations[col].duplicated(), col]
+            if not duplicated.empty:
+                raise ValueError(f"{path}: '{col}' duplikat: {duplicated.tolist()}")
+        _cache[path] = locations
+    return _cache[path]
+
+
+def location_lookup(path=None):
+    """Series location_id dengan index nama kota"""
+    locations = load_locations(path)
+    return pd.Series(locations["location_id"].to_numpy(), index=pd.Index(locations["city"]), name="location_id")
+
+
+def select_top_cities(counts, top_n=None, path=None):
+    """
+    Top N kota dari 'counts' (hasil value_counts, urut menurun) yang terdaftar di kamus.
+    Kota ramai yang tidak punya location_id dilewati dengan peringatan.
+    """
+    top_n = top_n or TOP_N
+    known = counts.index.isin(location_lookup(path).index)
+    cutoff = np.flatnonzero(known)[:top_n]
+    top = counts.index[cutoff].tolist()
+    if len(top) < top_n:
+        print(f"   ⚠️ Hanya {len(top)} kota di kamus lokasi yang ada di data (diminta top {top_n})")
+    skipped = counts.index[:cutoff[-1] + 1][~known[:cutoff[-1] + 1]].tolist() if len(cutoff) else []
+    if skipped:
+        print(f"   ⚠️ Kota tanpa location_id dilewati: {skipped}")
+    return top
+
+
+def encode_cities(cities, path=None):
+    """Nama kota -> location_id (int64) lewat lookup index; error jika ada kota di luar kamus"""
+    lookup = location_lookup(path)
+    positions = lookup.index.get_indexer(cities)
+    if (positions < 0).any():
+        unknown = pd.unique(np.asarray(cities, dtype=object)[positions < 0])
+        raise ValueError(f"Kota tidak ada di kamus lokasi: {unknown.tolist()[:10]}")
+    return lookup.to_numpy()[positions]
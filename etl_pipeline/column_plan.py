@@ -0,0 +1,117 @@
+import threading
+
+import pandas as pd
+
+# ---------------------------------------------------------
+# Rencana kebutuhan kolom (projection pushdown) untuk pipeline ETL.
+# Kebutuhan diturunkan dari konsumen di hilir:
+# - star schema: dimensi (key + atribut teks) dan fakta = semua kolom terbawa kecuali FACT_EXCLUDED
+# - kunci merge cuaca (fl_date, *_cities_encode, crs_*_time_rounded)
+# - aturan validasi & fitur enrichment (semua variabel cuaca WEATHER_MEASURES)
+# Kolom yang tidak dipakai konsumen mana pun tidak di-parse sama sekali (usecols di extractor),
+# kolom yang hanya dipakai sebagai kunci dibuang tepat setelah dipakai, sehingga tidak ikut
+# di-copy / di-join di fase berikutnya. Byte yang dihemat per fase dicatat (report()).
+# ---------------------------------------------------------
+
+# Flight.csv: tidak dipakai dimensi, fakta, validasi maupun enrichment (dulu dibuang clean_data)
+FLIGHT_UNUSED = ['AIRLINE_DOT', 'CANCELLATION_CODE']
+
+# Weather.csv: kunci (location_id, time -> date + time_hour_minute) + variabel cuaca di fakta
+WEATHER_KEYS = ['location_id', 'time']
+WEATHER_MEASURES = [
+    'temperature_2m (°C)', 'precipitation (mm)', 'rain (mm)', 'snowfall (cm)',
+    'weather_code (wmo code)', 'surface_pressure (hPa)', 'cloud_cover (%)', 'cloud_cover_low (%)',
+    'wind_speed_10m (km/h)', 'wind_speed_100m (km/h)', 'wind_direction_10m (°)',
+    'wind_direction_100m (°)', 'wind_gusts_10m (km/h)',
+]
+# Kolom mentah 'time' hanya dipakai untuk membentuk kunci merge, tidak ikut di-join
+WEATHER_KEY_ONLY = ['time']
+
+# Kunci merge hasil pembulatan jam; dibuang setelah merge (tidak masuk fakta)
+MERGE_KEY_ONLY = ['crs_dep_time_rounded', 'crs_arr_time_rounded']
+
+# Kolom dimensi (text) yang tidak perlu ada di tabel fakta karena sudah ada key-nya
+FACT_EXCLUDED = [
+    'airline', 'airline_code',
+    'origin', 'origin_city',
+    'dest', 'dest_city',
+] + MERGE_KEY_ONLY + ['origin_' + c for c in WEATHER_KEY_ONLY] + ['dest_' + c for c in WEATHER_KEY_ONLY]
+
+# Jumlah baris sampel untuk estimasi ukuran kolom yang tidak di-parse
+SAMPLE_ROWS = 10_000
+
+
+def flight_usecols(column):
+    """Filter usecols untuk pd.read_csv(Flight.csv)"""
+    return column not in FLIGHT_UNUSED
+
+
+def weather_usecols(column):
+    """Filter usecols untuk pd.read_csv(Weather.csv)"""
+    return column in WEATHER_KEYS or column in WEATHER_MEASURES
+
+
+# ---------------------------------------------------------
+# PENCATATAN BYTE YANG DIHEMAT
+# ---------------------------------------------------------
+_lock = threading.Lock()
+_row_bytes = {}
+_savings = {}
+
+
+def reset():
+    with _lock:
+        _row_bytes.clear()
+        _savings.clear()
+
+
+def measure(frame, columns, prefixes=("",)):
+    """Mencatat byte per baris kolom 'columns' (diukur dari frame sebelum dibuang)"""
+    rows = max(len(frame), 1)
+    with _lock:
+        for col in columns:
+            if col in frame.columns:
+                n_bytes = frame[col].memory_usage(deep=True, index=False) / rows
+                for prefix in prefixes:
+                    _row_bytes[prefix + col] = n_bytes
+
+
+def estimate_unparsed(path, columns, sep=','):
+    """Byte per baris kolom yang dilewati usecols, diestimasi dari SAMPLE_ROWS baris pertama"""
+    try:
+        sample = pd.read_csv(path, sep=sep, usecols=lambda c: c in columns, nrows=SAMPLE_ROWS)
+    except (OSError, ValueError):
+        return
+    measure(sample, sample.columns)
+
+
+def record(stage, frame, columns, rows=None):
+    """
+    Mencatat bahwa output fase 'stage' tidak membawa 'columns' (akumulatif, misal per partisi).
+    Hanya kolom yang memang tidak ada di 'frame' yang dihitung; 'rows' dipakai jika frame None.
+    """
+    rows = len(frame) if rows is None else rows
+    with _lock:
+        columns = [c for c in columns if c in _row_bytes and (frame is None or c not in frame.columns)]
+        if not columns:
+            return
+        entry = _savings.setdefault(stage, {"columns": [], "rows": 0, "bytes": 0})
+        entry["columns"] += [c for c in columns if c not in entry["columns"]]
+        entry["rows"] += int(rows)
+        entry["bytes"] += int(round(rows * sum(_row_bytes[c] for c in columns)))
+
+
+def report():
+    """Dict byte yang dihemat per fase (untuk instrumentation.add_section / JSON)"""
+    with _lock:
+        stages = [{"stage": stage, **entry} for stage, entry in _savings.items()]
+    return {"stages": stages, "total_bytes": sum(s["bytes"] for s in stages)}
+
+
+def print_report():
+    result = report()
+    print(f"\n{'fase':<18}{'baris':>12}{'MB dihemat':>12}  kolom tidak dibawa")
+    for s in result["stages"]:
+        print(f"{s['stage']:<18}{s['rows']:>12,}{s['bytes'] / 1024 / 1024:>12.2f}  {', '.join(s['columns'])}")
+    print(f"Total: {result['total_bytes'] / 1024 / 1024:.2f} MB tidak di-parse / di-copy / di-join")
+    return result
@@ -1,27 +1,209 @@
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 
-def validate_data(df1_filtered, final_merged_df, df_weather_std):
-    """
-    Fungsi untuk melakukan validasi data (Quality Assurance).
-    Struktur pengecekan disamakan dengan referensi:
-    1. Uniqueness Check
-    2. Null Check
-    3. Range Check
-    4. Data Type Check
-    5. Referential Integrity Check
-    6. Distribusi Data
-    """
-    print("--- Memulai Proses Filtering ---")
-    
-    # ---------------------------------------------------------
-    # 1. Uniqueness Check
-    # ---------------------------------------------------------
-    print("\n[1/6] Uniqueness Check")
-    rows_before = len(df1_filtered)
-    rows_after = len(final_merged_df)
+import instrumentation
+
+# ---------------------------------------------------------
+# Aturan validasi (dipakai validate_data & validate_partitions)
+# ---------------------------------------------------------
+# Batasan logis (Nama kolom disesuaikan dengan output transformation.py)
+RANGE_CONSTRAINTS = {
+    'origin_temperature_2m_c': (-50, 60),    # Suhu bumi ekstrem tapi valid
+    'dest_temperature_2m_c': (-50, 60),
+    'origin_precipitation_mm': (0, 2000),    # Hujan tidak negatif
+    'dest_precipitation_mm': (0, 2000),
+    'origin_wind_speed_10m_kmh': (0, 300),   # Angin (perhatikan suffix kmh)
+    'dest_wind_speed_10m_kmh': (0, 300),
+    'origin_cloud_cover_percent': (0, 100),
+    'dest_cloud_cover_percent': (0, 100),
+    'origin_surface_pressure_hpa': (800, 1100), # Tekanan udara (hpa lowercase)
+    'dest_surface_pressure_hpa': (800, 1100)
+}
+
+# Mapping tipe data yang diharapkan
+# (Disesuaikan dengan nama kolom hasil standarisasi transformation.py)
+EXPECTED_DTYPES = {
+    'fl_date': 'int64',
+    'airline': 'object',
+    'airline_code': 'object',
+    'dot_code': 'int64',
+    'fl_number': 'int64',
+    'origin': 'object',
+    'origin_city': 'object',
+    'dest': 'object',
+    'dest_city': 'object',
+    'crs_dep_time': 'int64',
+    'crs_dep_time_rounded': 'int64',
+    'dep_time': 'int64',
+    'dep_delay': 'int64',
+    'taxi_out': 'int64',
+    'wheels_off': 'int64',
+    'wheels_on': 'int64',
+    'taxi_in': 'int64',
+    'crs_arr_time': 'int64',
+    'crs_arr_time_rounded': 'int64',
+    'arr_time': 'int64',
+    'arr_delay': 'int64',
+    'cancelled': 'int64',
+    'diverted': 'int64',
+    'crs_elapsed_time': 'int64',
+    'elapsed_time': 'int64',
+    'air_time': 'int64',
+    'distance': 'int64',
+    'delay_due_carrier': 'int64',
+    'delay_due_weather': 'int64',
+    'delay_due_nas': 'int64',
+    'delay_due_security': 'int64',
+    'delay_due_late_aircraft': 'int64',
+    'airlines_encode': 'int64',
+    'airline_code_encode': 'int64',
+    'origin_encode': 'int64',
+    'origin_cities_encode': 'int64',
+    'dest_encode': 'int64',
+    'dest_cities_encode': 'int64',
+    'origin_time': 'object',
+    'origin_temperature_2m_c': 'float64',
+    'origin_precipitation_mm': 'float64',
+    'origin_rain_mm': 'float64',
+    'origin_snowfall_cm': 'float64',
+    'origin_weather_code_wmo_code': 'int64',
+    'origin_surface_pressure_hPa': 'float64',
+    'origin_cloud_cover_percent': 'int64',
+    'origin_cloud_cover_low_percent': 'int64',
+    'origin_wind_speed_10m_km/h': 'float64',
+    'origin_wind_speed_100m_km/h': 'float64',
+    'origin_wind_direction_10m_°': 'int64',
+    'origin_wind_direction_100m_°': 'int64',
+    'origin_wind_gusts_10m_km/h': 'float64',
+    'dest_time': 'object',
+    'dest_temperature_2m_c': 'float64',
+    'dest_precipitation_mm': 'float64',
+    'dest_rain_mm': 'float64',
+    'dest_snowfall_cm': 'float64',
+    'dest_weather_code_wmo_code': 'int64',
+    'dest_surface_pressure_hPa': 'float64',
+    'dest_cloud_cover_percent': 'int64',
+    'dest_cloud_cover_low_percent': 'int64',
+    'dest_wind_speed_10m_km/h': 'float64',
+    'dest_wind_speed_100m_km/h': 'float64',
+    'dest_wind_direction_10m_°': 'int64',
+    'dest_wind_direction_100m_°': 'int64',
+    'dest_wind_gusts_10m_km/h': 'float64',
+    'temp_2m_c_diff': 'float64',
+    'surface_pressure_hPa_diff': 'float64',
+    'wind_speed_10m_km_h_diff': 'float64',
+    'wind_speed_100m_km_h_diff': 'float64',
+    'dest_cloud_cover_diff': 'int64'
+}
+
+COLUMNS_TO_VISUALIZE = [
+    'dep_delay',
+    'arr_delay',
+    'origin_temperature_2m_c',
+    'origin_precipitation_mm',
+    'origin_rain_mm',
+    'origin_snowfall_cm',
+    'origin_weather_code_wmo_code',
+    'origin_surface_pressure_hPa',
+    'origin_cloud_cover_percent',
+    'origin_cloud_cover_low_percent',
+    'origin_wind_speed_10m_km/h',
+    'origin_wind_speed_100m_km/h',
+    'origin_wind_direction_10m_degree',
+    'origin_wind_direction_100m_degree',
+    'origin_wind_gusts_10m_km/h',
+    'dest_temperature_2m_c',
+    'dest_precipitation_mm',
+    'dest_rain_mm',
+    'dest_snowfall_cm',
+    'dest_weather_code_wmo_code',
+    'dest_surface_pressure_hPa',
+    'dest_cloud_cover_percent',
+    'dest_cloud_cover_low_percent',
+    'dest_wind_speed_10m_km/h',
+    'dest_wind_speed_100m_km/h',
+    'dest_wind_direction_10m_degree',
+    'dest_wind_direction_100m_degree',
+    'dest_wind_gusts_10m_km/h',
+    'temp_2m_c_diff',
+    'surface_pressure_hPa_diff',
+    'wind_speed_10m_km_h_diff',
+    'wind_speed_100m_km_h_diff',
+    'dest_cloud_cover_diff'
+]
+
+# Kolom non-cuaca yang kebetulan berawalan origin/dest (misal origin_city, dest_city)
+NON_WEATHER_COLUMNS = ['origin', 'dest', 'origin_city', 'dest_city', 'origin_cities_encode', 'dest_cities_encode']
+# Kolom object yang tidak dicek mixed types
+TEXT_COLUMNS = ['airline', 'origin', 'dest', 'origin_city', 'dest_city']
+
+# Jumlah baris sampel untuk plot distribusi pada validasi per partisi
+SAMPLE_ROWS = 50_000
+
+
+# ---------------------------------------------------------
+# STATISTIK VALIDASI (bisa digabung antar partisi)
+# ---------------------------------------------------------
+def _collect_stats(frame):
+    """Statistik yang dibutuhkan pengecekan [2/6] - [5/6] dari satu DataFrame"""
+    # Fokus pada kolom cuaca baru (yang berawalan 'origin_' dan 'dest_')
+    new_weather_cols = [col for col in frame.columns if col.startswith('origin_') or col.startswith('dest_')]
+    weather_cols_clean = [c for c in new_weather_cols if c not in NON_WEATHER_COLUMNS]
+
+    out_of_range = {}
+    for col, (min_val, max_val) in RANGE_CONSTRAINTS.items():
+        if col in frame.columns:
+            out_of_range[col] = int(((frame[col] < min_val) | (frame[col] > max_val)).sum())
+
+    object_types = {}
+    for col in frame.select_dtypes(include='object').columns:
+        if col not in TEXT_COLUMNS:
+            try:
+                object_types[col] = list(frame[col].dropna().map(type).unique())
+            except:
+                pass
+
+    # Indikator join cuaca: kolom temperature origin pertama
+    weather_cols_check = [c for c in frame.columns if 'temperature' in c and 'origin' in c]
+    integrity_col = weather_cols_check[0] if weather_cols_check else None
+
+    return {
+        'rows': len(frame),
+        'weather_cols': weather_cols_clean,
+        'null_counts': frame[weather_cols_clean].isnull().sum(),
+        'out_of_range': out_of_range,
+        'dtypes': {col: [str(dtype)] for col, dtype in frame.dtypes.items()},
+        'object_types': object_types,
+        'integrity_col': integrity_col,
+        'missing_integrity': int(frame[integrity_col].isnull().sum()) if integrity_col else 0,
+    }
+
+
+def _merge_stats(total, stats):
+    """Menggabungkan statistik satu partisi ke statistik kumulatif"""
+    if total is None:
+        return stats
+    total['rows'] += stats['rows']
+    total['weather_cols'] += [c for c in stats['weather_cols'] if c not in total['weather_cols']]
+    total['null_counts'] = total['null_counts'].add(stats['null_counts'], fill_value=0).astype('int64')
+    for col, n in stats['out_of_range'].items():
+        total['out_of_range'][col] = total['out_of_range'].get(col, 0) + n
+    for col, dtypes in stats['dtypes'].items():
+        known = total['dtypes'].setdefault(col, [])
+        known += [d for d in dtypes if d not in known]
+    for col, types in stats['object_types'].items():
+        known = total['object_types'].setdefault(col, [])
+        known += [t for t in types if t not in known]
+    if total['integrity_col'] is None:
+        total['integrity_col'] = stats['integrity_col']
+    total['missing_integrity'] += stats['missing_integrity']
+    return total
 
+
+# ---------------------------------------------------------
+# LAPORAN PER PENGECEKAN
+# ---------------------------------------------------------
+def _report_uniqueness(rows_before, rows_after, df_weather_std):
     print(f"   -> Rows Before Merge: {rows_before}")
     print(f"   -> Rows After Merge : {rows_after}")
 
@@ -34,7 +216,7 @@ def validate_data(df1_filtered, final_merged_df, df_weather_std):
              # Di sini kita pakai nama umum dari df_weather_std di main.py
              possible_keys = ['date', 'time_hour_minute', 'location_id'] # Sesuaikan dengan transformation.py standarisasi
              available_keys = [k for k in possible_keys if k in df_weather_std.columns]
-             
+
              if available_keys:
                  dupes = df_weather_std[df_weather_std.duplicated(subset=available_keys, keep=False)]
                  if not dupes.empty:
@@ -44,28 +226,19 @@ def validate_data(df1_filtered, final_merged_df, df_weather_std):
     else:
         print("   ✅ PASS: Jumlah baris konsisten (One-to-One / Many-to-One relationship aman).")
 
-    
-    # ---------------------------------------------------------
-    # 2. Null Check (Focus on Weather Data)
-    # ---------------------------------------------------------
-    print("\n[2/6] Null Check (Missing Weather Data)")
-    # Fokus pada kolom cuaca baru (yang berawalan 'origin_' dan 'dest_')
-    new_weather_cols = [col for col in final_merged_df.columns if col.startswith('origin_') or col.startswith('dest_')]
-    
-    # Hapus kolom non-cuaca yang mungkin kebetulan berawalan origin/dest (misal origin_city, dest_city)
-    weather_cols_clean = [c for c in new_weather_cols if c not in ['origin', 'dest', 'origin_city', 'dest_city', 'origin_cities_encode', 'dest_cities_encode']]
-
-    if weather_cols_clean:
-        null_counts = final_merged_df[weather_cols_clean].isnull().sum()
-        null_pct = (null_counts / len(final_merged_df)) * 100
-        
+
+def _report_nulls(stats):
+    if stats['weather_cols']:
+        null_counts = stats['null_counts'].reindex(stats['weather_cols'], fill_value=0)
+        null_pct = (null_counts / max(stats['rows'], 1)) * 100
+
         # Tampilkan jika ada missing value
         if null_counts.sum() > 0:
             print("   -> Detail Missing Values per Column:")
             # Tampilkan hanya yang > 0 agar terminal rapi
             missing_df = pd.DataFrame({'Missing Count': null_counts, 'Percentage (%)': null_pct})
             print(missing_df[missing_df['Missing Count'] > 0])
-        
+
         # Threshold warning (misal 5%)
         if null_pct.max() > 5:
             print("   ⚠️ WARNING: Lebih dari 5% data penerbangan tidak memiliki data cuaca.")
@@ -75,161 +248,47 @@ def validate_data(df1_filtered, final_merged_df, df_weather_std):
         print("   ⚠️ SKIP: Tidak ditemukan kolom cuaca hasil merge.")
 
 
-    # ---------------------------------------------------------
-    # 3. Range Check
-    # ---------------------------------------------------------
-    print("\n[3/6] Range Check (Business Logic)")
-
-    # Definisikan batasan logis (Nama kolom disesuaikan dengan output transformation.py)
-    constraints = {
-        'origin_temperature_2m_c': (-50, 60),    # Suhu bumi ekstrem tapi valid
-        'dest_temperature_2m_c': (-50, 60),
-        'origin_precipitation_mm': (0, 2000),    # Hujan tidak negatif
-        'dest_precipitation_mm': (0, 2000),
-        'origin_wind_speed_10m_kmh': (0, 300),   # Angin (perhatikan suffix kmh)
-        'dest_wind_speed_10m_kmh': (0, 300),
-        'origin_cloud_cover_percent': (0, 100),
-        'dest_cloud_cover_percent': (0, 100),
-        'origin_surface_pressure_hpa': (800, 1100), # Tekanan udara (hpa lowercase)
-        'dest_surface_pressure_hpa': (800, 1100)
-    }
-
+def _report_ranges(stats):
     range_issues = False
-    for col, (min_val, max_val) in constraints.items():
-        if col in final_merged_df.columns:
-            outliers = final_merged_df[(final_merged_df[col] < min_val) | (final_merged_df[col] > max_val)]
-            if not outliers.empty:
-                print(f"   ❌ FAIL: Kolom '{col}' memiliki {len(outliers)} nilai di luar range ({min_val} - {max_val}).")
-                range_issues = True
-    
+    for col, n_outliers in stats['out_of_range'].items():
+        if n_outliers:
+            min_val, max_val = RANGE_CONSTRAINTS[col]
+            print(f"   ❌ FAIL: Kolom '{col}' memiliki {n_outliers} nilai di luar range ({min_val} - {max_val}).")
+            range_issues = True
+
     if not range_issues:
         print("   ✅ PASS: Semua kolom parameter cuaca berada dalam range yang wajar.")
 
-    
-    # ---------------------------------------------------------
-    # 4. Data Type Check
-    # ---------------------------------------------------------
-    print("\n[4/6] Data Type Check")
-    
-    # Mapping tipe data yang diharapkan
-    # (Disesuaikan dengan nama kolom hasil standarisasi transformation.py)
-    expected_dtypes = {
-        'fl_date': 'int64',
-        'airline': 'object',
-        'airline_code': 'object',
-        'dot_code': 'int64',
-        'fl_number': 'int64',
-        'origin': 'object',
-        'origin_city': 'object',
-        'dest': 'object',
-        'dest_city': 'object',
-        'crs_dep_time': 'int64',
-        'crs_dep_time_rounded': 'int64',
-        'dep_time': 'int64',
-        'dep_delay': 'int64',
-        'taxi_out': 'int64',
-        'wheels_off': 'int64',
-        'wheels_on': 'int64',
-        'taxi_in': 'int64',
-        'crs_arr_time': 'int64',
-        'crs_arr_time_rounded': 'int64',
-        'arr_time': 'int64',
-        'arr_delay': 'int64',
-        'cancelled': 'int64',
-        'diverted': 'int64',
-        'crs_elapsed_time': 'int64',
-        'elapsed_time': 'int64',
-        'air_time': 'int64',
-        'distance': 'int64',
-        'delay_due_carrier': 'int64',
-        'delay_due_weather': 'int64',
-        'delay_due_nas': 'int64',
-        'delay_due_security': 'int64',
-        'delay_due_late_aircraft': 'int64',
-        'airlines_encode': 'int64',
-        'airline_code_encode': 'int64',
-        'origin_encode': 'int64',
-        'origin_cities_encode': 'int64',
-        'dest_encode': 'int64',
-        'dest_cities_encode': 'int64',
-        'origin_time': 'object',
-        'origin_temperature_2m_c': 'float64',
-        'origin_precipitation_mm': 'float64',
-        'origin_rain_mm': 'float64',
-        'origin_snowfall_cm': 'float64',
-        'origin_weather_code_wmo_code': 'int64',
-        'origin_surface_pressure_hPa': 'float64',
-        'origin_cloud_cover_percent': 'int64',
-        'origin_cloud_cover_low_percent': 'int64',
-        'origin_wind_speed_10m_km/h': 'float64',
-        'origin_wind_speed_100m_km/h': 'float64',
-        'origin_wind_direction_10m_°': 'int64',
-        'origin_wind_direction_100m_°': 'int64',
-        'origin_wind_gusts_10m_km/h': 'float64',
-        'dest_time': 'object',
-        'dest_temperature_2m_c': 'float64',
-        'dest_precipitation_mm': 'float64',
-        'dest_rain_mm': 'float64',
-        'dest_snowfall_cm': 'float64',
-        'dest_weather_code_wmo_code': 'int64',
-        'dest_surface_pressure_hPa': 'float64',
-        'dest_cloud_cover_percent': 'int64',
-        'dest_cloud_cover_low_percent': 'int64',
-        'dest_wind_speed_10m_km/h': 'float64',
-        'dest_wind_speed_100m_km/h': 'float64',
-        'dest_wind_direction_10m_°': 'int64',
-        'dest_wind_direction_100m_°': 'int64',
-        'dest_wind_gusts_10m_km/h': 'float64',
-        'temp_2m_c_diff': 'float64',
-        'surface_pressure_hPa_diff': 'float64',
-        'wind_speed_10m_km_h_diff': 'float64',
-        'wind_speed_100m_km_h_diff': 'float64',
-        'dest_cloud_cover_diff': 'int64'
-    }
-
 
+def _report_dtypes(stats):
     inconsistencies = False
-    for col, expected_str in expected_dtypes.items():
-        if col in final_merged_df.columns:
+    for col, expected_str in EXPECTED_DTYPES.items():
+        # Tidak print warning jika kolom tidak ada, agar tidak spam
+        for curr_type in stats['dtypes'].get(col, []):
             # Cek apakah tipe data mengandung string yang diharapkan (misal 'int' ada di 'int64')
-            curr_type = str(final_merged_df[col].dtype)
             if expected_str not in curr_type:
                 # Toleransi float vs int jika data bersih
                 if not (expected_str == 'int' and 'float' in curr_type) and not (expected_str == 'float' and 'int' in curr_type):
                     print(f"   ❌ FAIL: Kolom '{col}' tipe datanya '{curr_type}', diharapkan mengandung '{expected_str}'.")
                     inconsistencies = True
-        # Tidak print warning jika kolom tidak ada, agar tidak spam
-    
+
     if not inconsistencies:
         print("   ✅ PASS: Tipe data kolom kunci konsisten.")
 
     # Cek Mixed Types pada Object Columns
-    object_cols = final_merged_df.select_dtypes(include='object').columns
-    if not object_cols.empty:
+    if stats['object_types']:
         mixed_found = False
-        for col in object_cols:
-            if col not in ['airline', 'origin', 'dest', 'origin_city', 'dest_city']:
-                try:
-                    # Sample checking
-                    unique_types = final_merged_df[col].dropna().map(type).unique()
-                    if len(unique_types) > 1:
-                        print(f"   ⚠️ WARNING: Kolom '{col}' memiliki mixed types: {unique_types}")
-                        mixed_found = True
-                except:
-                    pass
+        for col, unique_types in stats['object_types'].items():
+            if len(unique_types) > 1:
+                print(f"   ⚠️ WARNING: Kolom '{col}' memiliki mixed types: {np.array(unique_types, dtype=object)}")
+                mixed_found = True
         if not mixed_found:
             print("   ✅ PASS: Tidak ada mixed types berbahaya pada kolom object.")
 
 
-    # ---------------------------------------------------------
-    # 5. Referential Integrity Check
-    # ---------------------------------------------------------
-    print("\n[5/6] Referential Integrity Check")
-    # Cek apakah ada baris yang gagal mendapat data cuaca (semua kolom cuaca Null)
-    weather_cols_check = [c for c in final_merged_df.columns if 'temperature' in c and 'origin' in c]
-    
-    if weather_cols_check:
-        missing_integrity = final_merged_df[weather_cols_check[0]].isnull().sum()
+def _report_integrity(stats):
+    if stats['integrity_col']:
+        missing_integrity = stats['missing_integrity']
         if missing_integrity == 0:
              print("   ✅ PASS: Integritas terjaga. Semua penerbangan sukses di-join dengan data cuaca.")
         else:
@@ -237,64 +296,29 @@ def validate_data(df1_filtered, final_merged_df, df_weather_std):
     else:
         print("   ⚠️ SKIP: Kolom indikator cuaca tidak ditemukan.")
 
-    
-    # ---------------------------------------------------------
-    # 6. Distribusi Data (Visualization)
-    # ---------------------------------------------------------
-    print("\n[6/6] Distribusi Data (Visualization)")
-    
-    columns_to_visualize = [
-        'dep_delay',
-        'arr_delay',
-        'origin_temperature_2m_c',
-        'origin_precipitation_mm',
-        'origin_rain_mm',
-        'origin_snowfall_cm',
-        'origin_weather_code_wmo_code',
-        'origin_surface_pressure_hPa',
-        'origin_cloud_cover_percent',
-        'origin_cloud_cover_low_percent',
-        'origin_wind_speed_10m_km/h',
-        'origin_wind_speed_100m_km/h',
-        'origin_wind_direction_10m_degree',
-        'origin_wind_direction_100m_degree',
-        'origin_wind_gusts_10m_km/h',
-        'dest_temperature_2m_c',
-        'dest_precipitation_mm',
-        'dest_rain_mm',
-        'dest_snowfall_cm',
-        'dest_weather_code_wmo_code',
-        'dest_surface_pressure_hPa',
-        'dest_cloud_cover_percent',
-        'dest_cloud_cover_low_percent',
-        'dest_wind_speed_10m_km/h',
-        'dest_wind_speed_100m_km/h',
-        'dest_wind_direction_10m_degree',
-        'dest_wind_direction_100m_degree',
-        'dest_wind_gusts_10m_km/h',
-        'temp_2m_c_diff',
-        'surface_pressure_hPa_diff',
-        'wind_speed_10m_km_h_diff',
-        'wind_speed_100m_km_h_diff',
-        'dest_cloud_cover_diff'
-    ]
+
+def _plot_distributions(frame):
     # Filter hanya yang ada
-    existing_plot_cols = [c for c in columns_to_visualize if c in final_merged_df.columns]
+    existing_plot_cols = [c for c in COLUMNS_TO_VISUALIZE if c in frame.columns]
 
     if existing_plot_cols:
         print(f"   -> Generating plots for: {existing_plot_cols}...")
         print("   -> (Jendela grafik akan muncul. Tutup untuk menyelesaikan program.)")
-        
+
         try:
+            # Diimport di sini: matplotlib/seaborn (~1 detik) hanya dimuat jika plot benar-benar dibuat
+            import matplotlib.pyplot as plt
+            import seaborn as sns
+
             n_cols = 3
             n_rows = (len(existing_plot_cols) + n_cols - 1) // n_cols
             plt.figure(figsize=(15, 4 * n_rows))
-            
+
             for i, col in enumerate(existing_plot_cols):
                 plt.subplot(n_rows, n_cols, i + 1)
-                sns.histplot(final_merged_df[col], kde=True, bins=30)
+                sns.histplot(frame[col], kde=True, bins=30)
                 plt.title(col)
-            
+
             plt.tight_layout()
             plt.show()
             print("   ✅ PASS: Visualisasi berhasil.")
@@ -303,4 +327,118 @@ def validate_data(df1_filtered, final_merged_df, df_weather_std):
     else:
         print("   ⚠️ SKIP: Tidak ada kolom numerik untuk divisualisasikan.")
 
-    print("--- Memulai Proses Filtering ---")
\ No newline at end of file
+
+def _report(stats, rows_before, df_weather_std, plot_frame):
+    """Mencetak hasil 6 pengecekan dari statistik (kumulatif) dan frame untuk plot (None = tanpa plot)"""
+    # ---------------------------------------------------------
+    # 1. Uniqueness Check
+    # ---------------------------------------------------------
+    with instrumentation.step("uniqueness_check"):
+        print("\n[1/6] Uniqueness Check")
+        _report_uniqueness(rows_before, stats['rows'], df_weather_std)
+
+    # ---------------------------------------------------------
+    # 2. Null Check (Focus on Weather Data)
+    # ---------------------------------------------------------
+    with instrumentation.step("null_check"):
+        print("\n[2/6] Null Check (Missing Weather Data)")
+        _report_nulls(stats)
+
+    # ---------------------------------------------------------
+    # 3. Range Check
+    # ---------------------------------------------------------
+    with instrumentation.step("range_check"):
+        print("\n[3/6] Range Check (Business Logic)")
+        _report_ranges(stats)
+
+    # ---------------------------------------------------------
+    # 4. Data Type Check
+    # ---------------------------------------------------------
+    with instrumentation.step("dtype_check"):
+        print("\n[4/6] Data Type Check")
+        _report_dtypes(stats)
+
+    # ---------------------------------------------------------
+    # 5. Referential Integrity Check
+    # ---------------------------------------------------------
+    with instrumentation.step("referential_integrity_check"):
+        print("\n[5/6] Referential Integrity Check")
+        # Cek apakah ada baris yang gagal mendapat data cuaca (semua kolom cuaca Null)
+        _report_integrity(stats)
+
+    # ---------------------------------------------------------
+    # 6. Distribusi Data (Visualization)
+    # ---------------------------------------------------------
+    if plot_frame is not None:
+        plot_distributions(plot_frame)
+
+
+def plot_distributions(frame):
+    """Pengecekan [6/6]; bisa dipanggil terpisah (main1 menjalankannya di thread utama)"""
+    with instrumentation.step("distribution_plot"):
+        print("\n[6/6] Distribusi Data (Visualization)")
+        _plot_distributions(frame)
+
+
+@instrumentation.instrument()
+def validate_data(df1_filtered, final_merged_df, df_weather_std, plot=True):
+    """
+    Fungsi untuk melakukan validasi data (Quality Assurance).
+    Struktur pengecekan disamakan dengan referensi:
+    1. Uniqueness Check
+    2. Null Check
+    3. Range Check
+    4. Data Type Check
+    5. Referential Integrity Check
+    6. Distribusi Data (plot=False: dilewati, panggil plot_distributions() terpisah)
+    """
+    print("--- Memulai Proses Filtering ---")
+
+    with instrumentation.step("collect_stats", final_merged_df):
+        stats = _collect_stats(final_merged_df)
+    _report(stats, len(df1_filtered), df_weather_std, final_merged_df if plot else None)
+
+    print("--- Memulai Proses Filtering ---")
+
+
+@instrumentation.instrument()
+def validate_partitions(partitions, rows_before, df_weather_std=None, sample_rows=SAMPLE_ROWS, seed=42):
+    """
+    Validasi yang sama dengan validate_data untuk mode out-of-core: 'partitions' adalah
+    iterable DataFrame hasil akhir per partisi yang dibaca satu per satu. Statistik
+    [1/6] - [5/6] digabung antar partisi; plot distribusi memakai sampel acak seragam
+    berukuran maksimal 'sample_rows' (bottom-k pada kunci acak), sehingga memori tetap
+    sebesar satu partisi + sampel. 'rows_before' = total baris sebelum merge.
+    """
+    print("--- Memulai Proses Validasi (per partisi) ---")
+    rng = np.random.default_rng(seed)
+    stats, sample, sample_keys, n_parts = None, None, None, 0
+
+    with instrumentation.step("collect_stats") as s:
+        for frame in partitions:
+            stats = _merge_stats(stats, _collect_stats(frame))
+            n_parts += 1
+
+            # Sampel seragam: simpan 'sample_rows' baris dengan kunci acak terkecil
+            keys = rng.random(len(frame))
+            if len(frame) > sample_rows:
+                keep = np.sort(np.argpartition(keys, sample_rows)[:sample_rows])
+                frame, keys = frame.iloc[keep], keys[keep]
+            if sample is None:
+                sample, sample_keys = frame.reset_index(drop=True), keys
+                continue
+            sample = pd.concat([sample, frame], ignore_index=True)
+            sample_keys = np.concatenate([sample_keys, keys])
+            if len(sample) > sample_rows:
+                keep = np.sort(np.argpartition(sample_keys, sample_rows)[:sample_rows])
+                sample, sample_keys = sample.iloc[keep].reset_index(drop=True), sample_keys[keep]
+        s["outputs"] = sample
+
+    if stats is None:
+        print("   ⚠️ SKIP: Tidak ada partisi untuk divalidasi.")
+        return
+    print(f"   -> {n_parts} partisi, {stats['rows']:,} baris; sampel plot {len(sample):,} baris")
+
+    _report(stats, rows_before, df_weather_std, sample)
+
+    print("--- Proses Validasi Selesai ---")
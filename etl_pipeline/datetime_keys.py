@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+# ---------------------------------------------------------
+# Kunci tanggal/jam bersama untuk Flight.csv, Weather.csv dan dim_date.
+# String ISO ('YYYY-MM-DD' / 'YYYY-MM-DDTHH:MM') diparse vektor dengan numpy datetime64;
+# nilai unik di-factorize dulu sehingga tiap tanggal/jam hanya diparse sekali
+# (ribuan tanggal unik untuk jutaan baris penerbangan, jam yang sama untuk semua lokasi cuaca).
+# Kunci integer yang dihasilkan:
+#   date_key      YYYYMMDD     (fl_date / date / dim_date.date_key)
+#   hour_key      HHMM         (time_hour_minute, sama dengan crs_*_time_rounded)
+#   date_hour_key YYYYMMDDHHMM (date_key + hour_key dalam satu kunci, untuk join cuaca)
+# ---------------------------------------------------------
+
+DAY_NAMES = np.array(['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'],
+                     dtype=object)
+
+
+def _parse(values, unit):
+    """Array datetime64[unit] dari string ISO; nilai kosong / tidak valid -> ValueError"""
+    codes, uniques = pd.factorize(pd.Series(values, copy=False), use_na_sentinel=True)
+    if (codes < 0).any():
+        raise ValueError(f"{int((codes < 0).sum())} nilai tanggal/waktu kosong")
+    parsed = np.asarray(np.asarray(uniques, dtype=object), dtype=f'datetime64[{unit}]')
+    if np.isnat(parsed).any():
+        raise ValueError("Nilai tanggal/waktu tidak valid (NaT)")
+    return parsed[codes]
+
+
+def parse_dates(values):
+    """'YYYY-MM-DD' -> datetime64[D]"""
+    return _parse(values, 'D')
+
+
+def parse_timestamps(values):
+    """'YYYY-MM-DDTHH:MM' -> datetime64[m]"""
+    return _parse(values, 'm')
+
+
+def _ymd(days):
+    """(year, month, day) int64 dari datetime64[D]"""
+    months = days.astype('datetime64[M]')
+    year = months.astype(np.int64) // 12 + 1970
+    month = months.astype(np.int64) % 12 + 1
+    day = (days - months).astype(np.int64) + 1
+    return year, month, day
+
+
+def date_key(dt):
+    """datetime64 -> int64 YYYYMMDD"""
+    year, month, day = _ymd(np.asarray(dt).astype('datetime64[D]'))
+    return year * 10000 + month * 100 + day
+
+
+def hour_key(dt):
+    """datetime64 -> int64 HHMM"""
+    dt = np.asarray(dt).astype('datetime64[m]')
+    minutes = (dt - dt.astype('datetime64[D]')).astype(np.int64)
+    return minutes // 60 * 100 + minutes % 60
+
+
+def date_hour_key(date_keys, hour_keys):
+    """int YYYYMMDD + int HHMM -> int64 YYYYMMDDHHMM (kunci join cuaca, lihat transformation.weather_key)"""
+    return np.asarray(date_keys, dtype=np.int64) * 10000 + np.asarray(hour_keys, dtype=np.int64)
+
+
+def key_to_date(keys):
+    """int YYYYMMDD -> datetime64[D] (tanpa konversi ke string)"""
+    keys = np.asarray(keys, dtype=np.int64)
+    months = ((keys // 10000 - 1970) * 12 + keys // 100 % 100 - 1).astype('datetime64[M]')
+    return months.astype('datetime64[D]') + (keys % 100 - 1).astype('timedelta64[D]')
+
+
+def dim_date(start_key, end_key):
+    """
+    Tabel dim_date untuk setiap hari di kalender [start_key, end_key] (int YYYYMMDD),
+    kolom: date_key, year, month, day, day_of_week (0=Monday), day_name, quarter.
+    """
+    days = np.arange(key_to_date(start_key), key_to_date(end_key) + np.timedelta64(1, 'D'))
+    year, month, day = _ymd(days)
+    day_of_week = ((days.astype(np.int64) + 3) % 7).astype(np.int32)  # 1970-01-01 = Kamis
+    return pd.DataFrame({
+        'date_key': year * 10000 + month * 100 + day,
+        'year': year,
+        'month': month,
+        'day': day,
+        'day_of_week': day_of_week,
+        'day_name': pd.Series(DAY_NAMES[day_of_week], dtype='str'),
+        'quarter': ((month - 1) // 3 + 1).astype(np.int32),
+    })
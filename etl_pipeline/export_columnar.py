@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+import load_warehouse
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError as exc:
+    raise SystemExit(
+        "pyarrow is required for columnar export. Install with: pip install pyarrow"
+    ) from exc
+
+# Folder output export (bisa di-override lewat environment variable)
+EXPORT_DIR = os.getenv("STAR_EXPORT_DIR", "star_schema_parquet")
+MANIFEST_FILE = "_manifest.json"
+
+
+def _fingerprint(frame):
+    """Hash isi DataFrame (kolom, dtype, dan nilai) untuk deteksi perubahan partisi"""
+    h = hashlib.sha1()
+    h.update(repr([(c, str(t)) for c, t in frame.dtypes.items()]).encode())
+    h.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _write_parquet(frame, path):
+    """
+    Menulis satu file Parquet: kompresi zstd, statistik min/max per row group
+    (untuk predicate pushdown), dan dictionary encoding (kolom string ikut ter-encode).
+    File ditulis ke .tmp lalu di-rename agar pembaca tidak melihat file setengah jadi.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    tmp_path = path + ".tmp"
+    pq.write_table(
+        table,
+        tmp_path,
+        compression="zstd",
+        use_dictionary=True,
+        write_statistics=True,
+    )
+    os.replace(tmp_path, path)
+    return os.path.getsize(path)
+
+
+def _load_manifest(out_dir):
+    manifest_path = os.path.join(out_dir, MANIFEST_FILE)
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+
+def _save_manifest(out_dir, manifest):
+    manifest_path = os.path.join(out_dir, MANIFEST_FILE)
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+def _split_partitions(tables):
+    """
+    Memecah star schema menjadi unit export:
+    - tabel dimensi -> satu file per tabel
+    - fact_flights  -> satu file per partisi year=YYYY/month=MM (Hive-style)
+    """
+    partitions = {}
+    for table_name, spec in tables.items():
+        frame = spec["frame"]
+        if table_name == "fact_flights" and "date_key" in frame.columns:
+            year = frame["date_key"] // 10000
+            month = frame["date_key"] // 100 % 100
+            for (y, m), part in frame.groupby([year, month], sort=True):
+                key = f"fact_flights/year={int(y)}/month={int(m):02d}"
+                partitions[key] = part.reset_index(drop=True)
+        else:
+            partitions[table_name] = frame
+    return partitions
+
+
+def _partition_file(out_dir, key):
+    if key.startswith("fact_flights/"):
+        return os.path.join(out_dir, key, "part-0.parquet")
+    return os.path.join(out_dir, f"{key}.parquet")
+
+
+def export_star_schema(df, out_dir=EXPORT_DIR, max_workers=4, tables=None):
+    """
+    Export star schema (dimensi + fact_flights) ke file Parquet.
+    Fact dipartisi per year/month dan ditulis paralel per partisi. Export bersifat
+    inkremental: hanya partisi yang isinya berubah sejak export terakhir (berdasarkan
+    fingerprint di _manifest.json) yang ditulis ulang; partisi yang sudah tidak ada dihapus.
+    'tables' = hasil build_star_schema(df) jika sudah dibangun (tidak dibangun ulang).
+    """
+    print("\n==========================================")
+    print("   STARTING COLUMNAR EXPORT (PARQUET)     ")
+    print("==========================================\n")
+    start_time = time.time()
+
+    os.makedirs(out_dir, exist_ok=True)
+    partitions = _split_partitions(tables if tables is not None else load_warehouse.build_star_schema(df))
+    manifest = _load_manifest(out_dir)
+
+    # 1. Fingerprint semua partisi (paralel)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        fingerprints = dict(zip(partitions, pool.map(_fingerprint, partitions.values())))
+
+    changed = [
+        key for key in partitions
+        if manifest.get(key, {}).get("fingerprint") != fingerprints[key]
+        or not os.path.exists(_partition_file(out_dir, key))
+    ]
+    removed = [key for key in manifest if key not in partitions]
+    print(f"   -> {len(partitions)} partisi, {len(changed)} berubah, "
+          f"{len(partitions) - len(changed)} dilewati, {len(removed)} dihapus")
+
+    # 2. Tulis ulang partisi yang berubah (paralel per partisi)
+    def write_one(key):
+        return key, _write_parquet(partitions[key], _partition_file(out_dir, key))
+
+    bytes_written = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for key, size in pool.map(write_one, changed):
+            bytes_written += size
+            manifest[key] = {
+                "fingerprint": fingerprints[key],
+                "rows": int(len(partitions[key])),
+                "bytes": int(size),
+                "exported_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            }
+            print(f"      ✅ Exported {len(partitions[key]):,} rows -> {key}")
+
+    # 3. Hapus partisi yang sudah tidak ada di data terbaru
+    for key in removed:
+        path = _partition_file(out_dir, key)
+        target = os.path.dirname(path) if key.startswith("fact_flights/") else path
+        if os.path.isdir(target):
+            shutil.rmtree(target)
+        elif os.path.exists(target):
+            os.remove(target)
+        manifest.pop(key, None)
+
+    _save_manifest(out_dir, manifest)
+
+    elapsed = time.time() - start_time
+    print(f"\n   -> Export selesai: {len(changed)} partisi ditulis "
+          f"({bytes_written / 1024 / 1024:.2f} MB) dalam {elapsed:.4f} seconds")
+    print(f"   -> Lokasi: {os.path.abspath(out_dir)}")
+
+    return {
+        "partitions": len(partitions),
+        "written": len(changed),
+        "skipped": len(partitions) - len(changed),
+        "removed": len(removed),
+        "bytes_written": bytes_written,
+        "elapsed_seconds": elapsed,
+    }
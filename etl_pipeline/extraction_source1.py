@@ -1,8 +1,37 @@
 import pandas as pd
-import gdown
 import os
 import time
 
+import column_plan
+import instrumentation
+
+# ---------------------------------------------------------
+# KONFIGURASI GOOGLE DRIVE
+# ---------------------------------------------------------
+FILE_ID = '11aQ3Y7Nk44eZjUdlLkEP_UoXC7RgITLM'
+OUTPUT_FILE = 'Flight.csv'
+
+
+def ensure_etl_source1():
+    """
+    Memastikan Flight.csv tersedia di lokal (unduh via gdown jika belum ada) tanpa
+    membacanya ke memori. Mengembalikan path file, atau None jika gagal.
+    """
+    # URL format gdown
+    url = f'https://drive.google.com/uc?id={FILE_ID}'
+    output_file = OUTPUT_FILE
+
+    # 1. Cek apakah file perlu didownload
+    if not os.path.exists(output_file):
+        print(f"   [GDOWN] Mengunduh {output_file}...")
+        import gdown  # hanya dimuat jika file perlu diunduh
+        gdown.download(url, output_file, quiet=False)
+    else:
+        print(f"   [INFO] File {output_file} sudah ada di lokal.")
+    return output_file if os.path.exists(output_file) else None
+
+
+@instrumentation.instrument()
 def extract_etl_source1():
     """
     Mengunduh Flight.csv dari Google Drive menggunakan gdown 
@@ -10,28 +39,18 @@ def extract_etl_source1():
     """
     print("   [EXTRACT] Memulai proses unduh Data Flight (Source 1)...")
 
-    # ---------------------------------------------------------
-    # KONFIGURASI GOOGLE DRIVE
-    # ---------------------------------------------------------
-    file_id = '11aQ3Y7Nk44eZjUdlLkEP_UoXC7RgITLM' 
-    
-    # URL format gdown
-    url = f'https://drive.google.com/uc?id={file_id}'
-    output_file = 'Flight.csv'
-    
+    output_file = OUTPUT_FILE
     start_time = time.time()
 
     try:
-        # 1. Cek apakah file perlu didownload
-        if not os.path.exists(output_file):
-            print(f"   [GDOWN] Mengunduh {output_file}...")
-            gdown.download(url, output_file, quiet=False)
-        else:
-            print(f"   [INFO] File {output_file} sudah ada di lokal.")
+        ensure_etl_source1()
 
         # 2. Baca file ke dalam DataFrame (Lakukan ini SEBELUM mengakses variabel df)
+        # Kolom yang tidak dipakai di hilir (column_plan) tidak di-parse sama sekali
         if os.path.exists(output_file):
-            df = pd.read_csv(output_file)
+            column_plan.estimate_unparsed(output_file, column_plan.FLIGHT_UNUSED)
+            df = pd.read_csv(output_file, usecols=column_plan.flight_usecols)
+            column_plan.record("extract_flight", df, column_plan.FLIGHT_UNUSED)
             
             # 3. Hitung Statistik & Waktu
             end_time = time.time()
@@ -1,9 +1,34 @@
 import pandas as pd
-import gdown
 import os
 import time
 
-def extract_etl_source2():
+import column_plan
+import instrumentation
+
+# Sumber data cuaca: "csv" = snapshot Weather.csv (Google Drive), "api" = Open-Meteo API (weather_api.py)
+WEATHER_SOURCES = ("csv", "api")
+WEATHER_SOURCE = os.getenv("WEATHER_SOURCE", "csv")
+
+
+def configure(source=None):
+    """Mengubah sumber data cuaca (dipanggil dari argumen CLI main1.py)"""
+    global WEATHER_SOURCE
+    if source is not None:
+        if source not in WEATHER_SOURCES:
+            raise ValueError(f"Sumber cuaca harus salah satu dari {WEATHER_SOURCES}, bukan '{source}'")
+        WEATHER_SOURCE = source
+
+
+@instrumentation.instrument()
+def extract_etl_source2(source=None):
+    """Data Weather dari sumber yang dipilih (WEATHER_SOURCE atau argumen 'source')"""
+    if (source or WEATHER_SOURCE) == "api":
+        import weather_api
+        return weather_api.extract_weather_api()
+    return extract_weather_csv()
+
+
+def extract_weather_csv():
     """
     Mengunduh Flight.csv dari Google Drive menggunakan gdown 
     dan mengembalikannya sebagai DataFrame.
@@ -29,13 +54,14 @@ def extract_etl_source2():
         # Jika ingin selalu download ulang (fresh), hapus blok 'if' ini.
         if not os.path.exists(output_file):
             print(f"   [GDOWN] Mengunduh {output_file}...")
+            import gdown  # hanya dimuat jika file perlu diunduh
             gdown.download(url, output_file, quiet=False)
         else:
             print(f"   [INFO] File {output_file} sudah ada. Menggunakan file lokal.")
 
         # Membaca CSV ke Pandas DataFrame
         if os.path.exists(output_file):
-            df = pd.read_csv(output_file, sep=';')
+            df = pd.read_csv(output_file, sep=';', usecols=column_plan.weather_usecols)
             print(f"   [SUCCESS] Data Flight berhasil dimuat: {df.shape[0]} baris, {df.shape[1]} kolom.")
             
             end_time = time.time()
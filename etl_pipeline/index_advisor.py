@@ -0,0 +1,434 @@
+import argparse
+import hashlib
+import json
+import re
+import time
+
+import analytics_runner
+import rollup_warehouse
+
+# ---------------------------------------------------------
+# Index advisor berbasis workload (tahap setelah load warehouse).
+# 1. Query di warehouse/sql_analitycs + query refresh rollup diurai (tabel, alias, join,
+#    predikat WHERE, kolom yang dipakai) dengan regex, dicocokkan dengan katalog PostgreSQL.
+# 2. Kandidat index:
+#    - BRIN pada date_key untuk predikat tanggal (refresh rollup: date_key = ANY(...))
+#    - partial index untuk predikat filter satu tabel (is_storm / is_snow / is_clear),
+#      key = kolom join, INCLUDE = kolom lain yang dibaca (index-only scan)
+#    - covering btree untuk join ke tabel dimensi (sisi fakta/rollup dan sisi dimensi)
+# 3. Setiap kandidat dibuat sendiri-sendiri, query yang memakai tabelnya di-benchmark
+#    (waktu terbaik dari beberapa eksekusi) dengan & tanpa index; index hanya dipertahankan jika
+#    dipakai planner dan mempercepat minimal MIN_GAIN tanpa memperlambat query lain.
+# 4. Index yang lolos dicatat di ADVICE_TABLE dan dibuat ulang oleh loader setelah setiap
+#    load (tabel fakta & dimensi di-DROP ... CASCADE saat load), lihat apply_advised_indexes().
+# ---------------------------------------------------------
+
+ADVICE_TABLE = "etl_index_advice"
+INDEX_PREFIX = "adv_"
+REPEAT = 7
+WARMUP = 2
+MIN_GAIN = 0.10        # percepatan relatif minimal (10%)
+MIN_GAIN_MS = 0.5      # percepatan absolut minimal per eksekusi
+REFRESH_SAMPLE_DAYS = 31  # refresh rollup inkremental: ~1 bulan tanggal terakhir
+
+_KEYWORDS = {"on", "where", "join", "left", "right", "inner", "full", "cross", "group", "order",
+             "having", "limit", "using", "natural", "union", "select", "as"}
+_TABLE_REF = re.compile(r"\b(?:FROM|JOIN)\s+([A-Za-z_][\w.]*)(?:\s+(?:AS\s+)?([A-Za-z_]\w*))?", re.I)
+_CTE = re.compile(r"\b([A-Za-z_]\w*)\s+AS\s*\(", re.I)
+_JOIN_EQ = re.compile(r"\bON\s+([A-Za-z_]\w*)\.([A-Za-z_]\w*)\s*=\s*([A-Za-z_]\w*)\.([A-Za-z_]\w*)", re.I)
+_WHERE = re.compile(r"\bWHERE\s+(.*?)(?=\bGROUP\s+BY\b|\bHAVING\b|\bORDER\s+BY\b|\bLIMIT\b|\bUNION\b|$)", re.I | re.S)
+_QUALIFIED = re.compile(r"\b([A-Za-z_]\w*)\.([A-Za-z_]\w*)\b")
+_IDENT = re.compile(r"\b([A-Za-z_]\w*)\b")
+
+
+# ---------------------------------------------------------
+# 1. WORKLOAD & PARSING
+# ---------------------------------------------------------
+def _strip_comments(sql):
+    return re.sub(r"--[^\n]*", " ", sql)
+
+
+def _split_and(expr):
+    """Memecah predikat WHERE pada AND level teratas (di luar tanda kurung)"""
+    parts, depth, start, between = [], 0, 0, False
+    for m in re.finditer(r"\(|\)|\bAND\b|\bBETWEEN\b", expr, re.I):
+        token = m.group(0).upper()
+        if token == "(":
+            depth += 1
+        elif token == ")":
+            depth -= 1
+        elif depth:
+            continue
+        elif token == "BETWEEN":
+            between = True
+        elif between:
+            between = False  # AND milik BETWEEN bukan pemisah
+        else:
+            parts.append(expr[start:m.start()])
+            start = m.end()
+    parts.append(expr[start:])
+    return [p.strip() for p in parts if p.strip()]
+
+
+def load_workload(sql_dir=analytics_runner.SQL_DIR, conn=None):
+    """
+    Query analitik (sql_dir) + SELECT refresh rollup. Parameter refresh diisi dengan
+    REFRESH_SAMPLE_DAYS date_key terakhir di dim_date (pola load inkremental).
+    """
+    workload = [{"name": q["name"], "sql": q["sql"]} for q in analytics_runner.discover_queries(sql_dir)]
+    refresh_sql = rollup_warehouse.ROLLUP_INSERT[rollup_warehouse.ROLLUP_INSERT.upper().index("SELECT"):]
+    if conn is not None:
+        with conn.cursor() as cur:
+            cur.execute("SELECT to_regclass('public.dim_date');")
+            if cur.fetchone()[0] is not None:
+                cur.execute("SELECT date_key FROM public.dim_date ORDER BY date_key DESC LIMIT %s;",
+                            (REFRESH_SAMPLE_DAYS,))
+                date_keys = [r[0] for r in cur.fetchall()]
+                workload.append({"name": "rollup_refresh",
+                                 "sql": cur.mogrify(refresh_sql.strip().rstrip(";"), (date_keys,)).decode()})
+    return workload
+
+
+def table_columns(conn, tables):
+    """{tabel: [kolom]} dari information_schema untuk tabel yang ada di schema public"""
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT table_name, column_name FROM information_schema.columns
+            WHERE table_schema = 'public' AND table_name = ANY(%s)
+            ORDER BY table_name, ordinal_position;
+            """,
+            (sorted(tables),)
+        )
+        columns = {}
+        for table, column in cur.fetchall():
+            columns.setdefault(table, []).append(column)
+    return columns
+
+
+def parse_query(sql, catalog):
+    """
+    Mengurai satu query: {'tables': {alias: tabel}, 'joins': [(tabel, kolom, tabel, kolom)],
+    'predicates': [(tabel, predikat tanpa alias)], 'columns': {tabel: set(kolom)}}.
+    Hanya tabel yang ada di 'catalog' ({tabel: [kolom]}) yang dihitung (CTE diabaikan).
+    """
+    text = " ".join(_strip_comments(sql).split())
+    ctes = {m.group(1).lower() for m in _CTE.finditer(text)}
+
+    tables = {}
+    for m in _TABLE_REF.finditer(text):
+        table = m.group(1).split(".")[-1].lower()
+        if table in ctes or table not in catalog:
+            continue
+        alias = m.group(2).lower() if m.group(2) and m.group(2).lower() not in _KEYWORDS else table
+        tables[alias] = table
+        tables.setdefault(table, table)
+
+    def resolve(column, alias=None):
+        """Tabel pemilik kolom: lewat alias, atau satu-satunya tabel di query yang punya kolom tsb"""
+        if alias is not None:
+            return tables.get(alias.lower())
+        owners = {t for t in tables.values() if column in catalog[t]}
+        return owners.pop() if len(owners) == 1 else None
+
+    columns = {t: set() for t in tables.values()}
+    for m in _QUALIFIED.finditer(text):
+        table = resolve(m.group(2).lower(), m.group(1))
+        if table and m.group(2).lower() in catalog[table]:
+            columns[table].add(m.group(2).lower())
+    unqualified = _QUALIFIED.sub(" ", text)
+    for m in _IDENT.finditer(unqualified):
+        table = resolve(m.group(1).lower())
+        if table:
+            columns[table].add(m.group(1).lower())
+
+    joins = []
+    for m in _JOIN_EQ.finditer(text):
+        left, right = tables.get(m.group(1).lower()), tables.get(m.group(3).lower())
+        if left and right and (left, m.group(2).lower(), right, m.group(4).lower()) not in joins:
+            joins.append((left, m.group(2).lower(), right, m.group(4).lower()))
+
+    predicates = []
+    for m in _WHERE.finditer(text):
+        for conjunct in _split_and(m.group(1)):
+            owners = {resolve(c.group(2).lower(), c.group(1)) for c in _QUALIFIED.finditer(conjunct)}
+            bare = _QUALIFIED.sub(" ", conjunct)
+            owners |= {resolve(c.group(1).lower()) for c in _IDENT.finditer(bare) if resolve(c.group(1).lower())}
+            owners.discard(None)
+            if len(owners) == 1:
+                table = owners.pop()
+                aliases = [a for a, t in tables.items() if t == table]
+                predicate = re.sub(r"\b(?:%s)\.(?=[A-Za-z_])" % "|".join(map(re.escape, aliases)), "",
+                                   conjunct, flags=re.I)
+                predicates.append((table, predicate.strip()))
+    return {"tables": tables, "joins": joins, "predicates": predicates, "columns": columns}
+
+
+# ---------------------------------------------------------
+# 2. KANDIDAT INDEX
+# ---------------------------------------------------------
+def _index_name(table, ddl_body):
+    return f"{INDEX_PREFIX}{table}_{hashlib.sha1(ddl_body.encode()).hexdigest()[:8]}"
+
+
+def _candidate(kind, table, keys, include=(), where=None, method="btree"):
+    include = [c for c in sorted(include) if c not in keys]
+    body = f'public."{table}" USING {method} ({", ".join(keys)})'
+    if include:
+        body += f' INCLUDE ({", ".join(include)})'
+    if where:
+        body += f" WHERE {where}"
+    name = _index_name(table, body)
+    return {"name": name, "kind": kind, "table": table,
+            "ddl": f'CREATE INDEX IF NOT EXISTS "{name}" ON {body};'}
+
+
+def generate_candidates(parsed):
+    """Kandidat dari hasil parse_query semua query: {nama_index: kandidat + daftar query}"""
+    candidates = {}
+
+    def add(candidate, query):
+        entry = candidates.setdefault(candidate["name"], {**candidate, "queries": []})
+        if query not in entry["queries"]:
+            entry["queries"].append(query)
+
+    for query, p in parsed.items():
+        join_keys = {}
+        for lt, lc, rt, rc in p["joins"]:
+            join_keys.setdefault(lt, []).append(lc)
+            join_keys.setdefault(rt, []).append(rc)
+
+        # BRIN untuk predikat tanggal (kolom date_key)
+        for table in p["columns"]:
+            if any("date_key" in pred for t, pred in p["predicates"] if t == table):
+                add(_candidate("brin", table, ["date_key"], method="brin"), query)
+                # BRIN hanya efektif jika urutan fisik berkorelasi dengan date_key; btree sebagai pembanding
+                add(_candidate("btree", table, ["date_key"]), query)
+
+        # Partial index untuk predikat filter satu tabel (misal is_storm, is_snow, is_clear)
+        for table, predicate in p["predicates"]:
+            if "date_key" in predicate:
+                continue
+            keys = sorted(set(join_keys.get(table, []))) or sorted(p["columns"][table])[:1]
+            predicate_cols = {c.group(1).lower() for c in _IDENT.finditer(predicate)}
+            include = p["columns"][table] - set(keys) - predicate_cols
+            add(_candidate("partial", table, keys, include, where=predicate), query)
+
+        # Covering btree untuk join ke dimensi (tanpa predikat: partial index sudah mencakupnya)
+        filtered = {t for t, _ in p["predicates"]}
+        for lt, lc, rt, rc in p["joins"]:
+            for table, col in ((lt, lc), (rt, rc)):
+                if table.startswith("dim_"):
+                    add(_candidate("covering", table, [col], p["columns"][table] - {col}), query)
+                elif table not in filtered:
+                    add(_candidate("covering", table, [col], p["columns"][table] - {col}), query)
+    return candidates
+
+
+# ---------------------------------------------------------
+# 3. BENCHMARK
+# ---------------------------------------------------------
+def _best_ms(cur, sql, repeat, warmup):
+    """Waktu terbaik dari 'repeat' eksekusi (paling tahan noise scheduler untuk perbandingan)"""
+    for _ in range(warmup):
+        cur.execute(sql)
+        cur.fetchall()
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cur.execute(sql)
+        cur.fetchall()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return min(latencies)
+
+
+def _uses_index(cur, sql, index_name):
+    cur.execute(f"EXPLAIN (FORMAT JSON) {sql}")
+    return f'"{index_name}"' in json.dumps(cur.fetchone()[0])
+
+
+def _drop_advisor_indexes(cur):
+    cur.execute("SELECT indexname FROM pg_indexes WHERE schemaname = 'public' AND indexname LIKE %s;",
+                (INDEX_PREFIX + "%",))
+    for (name,) in cur.fetchall():
+        cur.execute(f'DROP INDEX IF EXISTS public."{name}";')
+
+
+def _date_key_correlation(cur, table):
+    cur.execute("SELECT correlation FROM pg_stats WHERE schemaname = 'public' AND tablename = %s "
+                "AND attname = 'date_key';", (table,))
+    row = cur.fetchone()
+    return None if row is None or row[0] is None else round(float(row[0]), 4)
+
+
+def advise(conn_func, sql_dir=analytics_runner.SQL_DIR, repeat=REPEAT, warmup=WARMUP,
+           min_gain=MIN_GAIN, min_gain_ms=MIN_GAIN_MS, apply=True):
+    """
+    Menjalankan advisor pada warehouse yang sudah dimuat. Index yang lolos dibuat (apply=True)
+    dan dicatat di ADVICE_TABLE. Mengembalikan laporan (dict) per kandidat & per query.
+    """
+    print(f"   -> Index advisor: workload {sql_dir} + refresh rollup ({repeat}x per query)...")
+    start_time = time.time()
+    with conn_func() as conn:
+        conn.commit()
+        conn.autocommit = True  # VACUUM & CREATE INDEX di luar transaksi
+        try:
+            report = _advise(conn, sql_dir, repeat, warmup, min_gain, min_gain_ms, apply)
+        finally:
+            conn.autocommit = False
+    report["seconds"] = round(time.time() - start_time, 4)
+    return report
+
+
+def _advise(conn, sql_dir, repeat, warmup, min_gain, min_gain_ms, apply):
+    with conn.cursor() as cur:
+        cur.execute("SET search_path TO public;")
+        _drop_advisor_indexes(cur)
+
+        workload = load_workload(sql_dir, conn)
+        names = {m.group(1).split(".")[-1].lower()
+                 for q in workload for m in _TABLE_REF.finditer(_strip_comments(q["sql"]))}
+        catalog = table_columns(conn, names)
+        parsed = {}
+        for q in workload:
+            parsed[q["name"]] = {**parse_query(q["sql"], catalog), "sql": q["sql"]}
+        candidates = generate_candidates(parsed)
+        sql_by_query = {q["name"]: q["sql"] for q in workload}
+        print(f"      {len(workload)} query, {len(catalog)} tabel, {len(candidates)} kandidat index")
+
+        for table in catalog:
+            cur.execute(f'VACUUM (ANALYZE) public."{table}";')
+
+        # Baseline tanpa index advisor
+        baseline = {name: _best_ms(cur, sql, repeat, warmup) for name, sql in sql_by_query.items()}
+
+        results = []
+        for cand in candidates.values():
+            build_start = time.perf_counter()
+            cur.execute(cand["ddl"])
+            build_ms = (time.perf_counter() - build_start) * 1000
+            cur.execute(f'ANALYZE public."{cand["table"]}";')
+            cur.execute("SELECT pg_relation_size(%s::regclass);", (f'public."{cand["name"]}"',))
+            size_bytes = cur.fetchone()[0]
+
+            # Semua query yang membaca tabel ini dicek (regresi), bukan hanya asal kandidat. Query yang
+            # plannya tidak memakai index tidak berubah; yang memakai diukur berpasangan dengan/tanpa index
+            affected = [n for n, p in parsed.items() if cand["table"] in p["tables"].values()]
+            used = [n for n in affected if _uses_index(cur, sql_by_query[n], cand["name"])]
+            per_query = {n: {"used": n in used} for n in affected}
+            for name in used:
+                per_query[name]["with_ms"] = round(_best_ms(cur, sql_by_query[name], repeat, warmup), 3)
+            cur.execute(f'DROP INDEX public."{cand["name"]}";')
+            for name in used:
+                per_query[name]["baseline_ms"] = round(_best_ms(cur, sql_by_query[name], repeat, warmup), 3)
+
+            gains = [(q["baseline_ms"] - q["with_ms"], q["baseline_ms"]) for q in per_query.values() if q["used"]]
+            best = max(gains, default=(0.0, 1.0), key=lambda g: g[0])
+            regressed = [n for n in used if per_query[n]["with_ms"] > per_query[n]["baseline_ms"] * (1 + min_gain)
+                         and per_query[n]["with_ms"] - per_query[n]["baseline_ms"] > min_gain_ms]
+            keep = bool(gains) and best[0] >= min_gain_ms and best[0] / best[1] >= min_gain and not regressed
+            reason = ("dipakai & lebih cepat" if keep else
+                      "tidak dipakai planner" if not gains else
+                      f"memperlambat {regressed}" if regressed else "percepatan di bawah ambang")
+            result = {**{k: cand[k] for k in ("name", "kind", "table", "ddl", "queries")},
+                      "build_ms": round(build_ms, 3), "size_bytes": int(size_bytes),
+                      "gain_ms": round(best[0], 3), "gain_pct": round(100 * best[0] / best[1], 1),
+                      "keep": keep, "reason": reason, "per_query": per_query}
+            if cand["kind"] in ("brin", "btree"):
+                result["date_key_correlation"] = _date_key_correlation(cur, cand["table"])
+            results.append(result)
+            flag = "✅" if keep else "  "
+            print(f"      {flag} {cand['kind']:<8} {cand['table']:<20} gain {result['gain_ms']:8.2f} ms "
+                  f"({result['gain_pct']:5.1f}%)  {size_bytes / 1024:8.0f} KB  {reason}")
+
+        kept = [r for r in results if r["keep"]]
+        final = {}
+        if apply:
+            for r in kept:
+                cur.execute(r["ddl"])
+            for table in {r["table"] for r in kept}:
+                cur.execute(f'ANALYZE public."{table}";')
+            final = {name: round(_best_ms(cur, sql, repeat, warmup), 3) for name, sql in sql_by_query.items()}
+            _save_advice(cur, kept)
+
+    queries = [{"query": name, "baseline_ms": round(baseline[name], 3), "final_ms": final.get(name)}
+               for name in sql_by_query]
+    return {"candidates": results, "kept": [r["name"] for r in kept], "queries": queries}
+
+
+# ---------------------------------------------------------
+# 4. SIMPAN & TERAPKAN ULANG SETELAH LOAD
+# ---------------------------------------------------------
+ADVICE_DDL = f"""
+CREATE TABLE IF NOT EXISTS public."{ADVICE_TABLE}" (
+    index_name TEXT PRIMARY KEY,
+    table_name TEXT NOT NULL,
+    ddl TEXT NOT NULL,
+    gain_ms DOUBLE PRECISION,
+    size_bytes BIGINT,
+    advised_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+"""
+
+
+def _save_advice(cur, kept):
+    cur.execute(ADVICE_DDL)
+    cur.execute(f'DELETE FROM public."{ADVICE_TABLE}";')
+    for r in kept:
+        cur.execute(
+            f'INSERT INTO public."{ADVICE_TABLE}" (index_name, table_name, ddl, gain_ms, size_bytes) '
+            "VALUES (%s, %s, %s, %s, %s);",
+            (r["name"], r["table"], r["ddl"], r["gain_ms"], r["size_bytes"])
+        )
+
+
+def apply_advised_indexes(conn_func):
+    """Membuat ulang index hasil advisor (dipanggil loader setelah tabel di-replace)"""
+    with conn_func() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT to_regclass(%s);", (f'public."{ADVICE_TABLE}"',))
+            if cur.fetchone()[0] is None:
+                return 0
+            cur.execute(f'SELECT table_name, ddl FROM public."{ADVICE_TABLE}" ORDER BY index_name;')
+            applied = 0
+            for table, ddl in cur.fetchall():
+                cur.execute("SELECT to_regclass(%s);", (f'public."{table}"',))
+                if cur.fetchone()[0] is not None:
+                    cur.execute(ddl)
+                    applied += 1
+    if applied:
+        print(f"   -> {applied} index hasil advisor dibuat ulang")
+    return applied
+
+
+def print_report(report):
+    print(f"\n{'query':<16}{'baseline ms':>13}{'final ms':>11}")
+    for q in report["queries"]:
+        final = f"{q['final_ms']:11.2f}" if q["final_ms"] is not None else f"{'-':>11}"
+        print(f"{q['query']:<16}{q['baseline_ms']:13.2f}{final}")
+    print(f"Index dipertahankan: {report['kept'] or '-'}")
+
+
+def main():
+    import load_warehouse
+
+    parser = argparse.ArgumentParser(description="Index & BRIN advisor berbasis workload query analitik")
+    parser.add_argument("--sql-dir", default=analytics_runner.SQL_DIR, help="Folder berisi file *.sql")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="Jumlah eksekusi per query")
+    parser.add_argument("--min-gain", type=float, default=MIN_GAIN, help="Percepatan relatif minimal (0.1 = 10%%)")
+    parser.add_argument("--dry-run", action="store_true", help="Hanya benchmark, index tidak dibuat / dicatat")
+    parser.add_argument("--output", help="Simpan laporan advisor ke file JSON")
+    args = parser.parse_args()
+
+    with load_warehouse.LoadSession() as session:
+        report = advise(session.connection, args.sql_dir, args.repeat, min_gain=args.min_gain,
+                        apply=not args.dry_run)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nLaporan disimpan ke {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,477 @@
+import argparse
+import collections
+import contextlib
+import glob
+import json
+import os
+import queue
+import signal
+import threading
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+import city_locations
+import column_plan
+import extraction_source1
+import extraction_source2
+import instrumentation
+import load_warehouse
+import out_of_core
+import rollup_warehouse
+import transformation
+
+# ---------------------------------------------------------
+# Service ingest micro-batch (jangka panjang).
+# Saat start, data cuaca + lookup merge ber-index, kamus encoder, dan pool koneksi dimuat SEKALI.
+# Setelah itu batch penerbangan kecil (file CSV di drop directory atau DataFrame lewat submit())
+# masuk ke queue berukuran tetap (backpressure: produser menunggu jika queue penuh) dan diproses
+# satu per satu oleh worker: filter -> clean -> standarisasi -> merge cuaca -> enrichment
+# -> append ke fact_flights. Rollup di-refresh per interval, bukan per batch.
+#
+#   ingest_drop/*.csv        batch baru (tulis ke .tmp lalu rename, lihat write_batch)
+#   ingest_drop/processing/  batch yang sedang diproses (dilanjutkan setelah restart)
+#   ingest_drop/failed/      batch gagal + file .err berisi pesan error
+# ---------------------------------------------------------
+
+DROP_DIR = os.getenv("INGEST_DROP_DIR", "ingest_drop")
+POLL_SECONDS = float(os.getenv("INGEST_POLL_SECONDS", "0.2"))
+# Jumlah batch maksimal yang menunggu di queue sebelum produser ditahan
+QUEUE_BATCHES = int(os.getenv("INGEST_QUEUE_BATCHES", "8"))
+ROLLUP_SECONDS = float(os.getenv("INGEST_ROLLUP_SECONDS", "60"))
+BATCH_LOG = os.getenv("INGEST_BATCH_LOG", "ingest_batches.jsonl")
+METRICS_FILE = os.getenv("INGEST_METRICS", "ingest_metrics.prom")
+# Jumlah batch terakhir untuk persentil latensi
+LATENCY_WINDOW = 1000
+ENCODE_COLUMNS = out_of_core.ENCODE_COLUMNS
+METRIC_PREFIX = "ingest"
+
+_STOP = object()
+
+
+# ---------------------------------------------------------
+# REFERENSI (top N kota + kamus encoder dari data load penuh)
+# ---------------------------------------------------------
+def load_reference(manifest=None, flight_path=None, top_n=None):
+    """
+    (encoders, top_cities) yang sama dengan load penuh terakhir, agar kode label_encode
+    dan kota yang lolos filter tidak berubah antar batch:
+    - manifest: _manifest.json hasil main1.py --out-of-core
+    - flight_path: Flight.csv yang dimuat main1.py (filter + clean seperti load penuh)
+    Kamus tidak bisa diambil dari tabel dimensi: dim_origin_city hanya menyimpan satu bandara per kota.
+    """
+    if manifest:
+        with open(manifest, encoding="utf-8") as f:
+            data = json.load(f)
+        top_cities = tuple(list(c) for c in data["top_cities"])
+        return data["encoders"], top_cities
+
+    df = pd.read_csv(flight_path, usecols=column_plan.flight_usecols)
+    top_cities = (
+        city_locations.select_top_cities(df['ORIGIN_CITY'].value_counts(), top_n),
+        city_locations.select_top_cities(df['DEST_CITY'].value_counts(), top_n),
+    )
+    with _quiet(verbose=False):
+        df = transformation.clean_data(transformation.filter_data(df, top_cities))
+    # Urutan kelas sama dengan label_encode tanpa kamus (nilai unik terurut)
+    encoders = {col.lower(): sorted(df[col].dropna().unique()) for col in ENCODE_COLUMNS}
+    return encoders, top_cities
+
+
+def write_batch(frame, drop_dir=DROP_DIR, batch_id=None):
+    """Menulis satu batch ke drop directory (.tmp lalu rename, service tidak membaca file setengah jadi)"""
+    os.makedirs(drop_dir, exist_ok=True)
+    batch_id = batch_id or f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    path = os.path.join(drop_dir, f"{batch_id}.csv")
+    frame.to_csv(path + ".tmp", index=False)
+    os.replace(path + ".tmp", path)
+    return path
+
+
+@contextlib.contextmanager
+def _quiet(verbose):
+    """Print per fungsi transformation dibuang kecuali verbose"""
+    if verbose:
+        yield
+        return
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def _percentile(values, q):
+    return round(float(np.percentile(values, q)), 3) if values else None
+
+
+# ---------------------------------------------------------
+# SERVICE
+# ---------------------------------------------------------
+class IngestService:
+    """
+    Service ingest micro-batch dengan state resident (cuaca, encoder, pool koneksi).
+
+    Pemakaian:
+        with IngestService(flight_path="Flight.csv") as service:
+            service.submit(batch_df)          # blocking jika queue penuh
+            service.watch("ingest_drop")      # atau pantau drop directory
+    """
+
+    def __init__(self, manifest=None, flight_path=None, top_n=None, queue_batches=QUEUE_BATCHES,
+                 rollup_seconds=ROLLUP_SECONDS, batch_log=BATCH_LOG, metrics_file=METRICS_FILE,
+                 verbose=False):
+        self.manifest = manifest
+        self.flight_path = flight_path
+        self.top_n = top_n
+        self.rollup_seconds = rollup_seconds
+        self.batch_log = batch_log
+        self.metrics_file = metrics_file
+        self.verbose = verbose
+        self.queue = queue.Queue(maxsize=queue_batches)
+        self.stop_event = threading.Event()
+
+        self.session = None
+        self._worker = None
+        self._log = None
+        self._pending_dates = set()
+        self._pending_rows = 0
+        self._last_rollup = time.monotonic()
+        self._latency_ms = collections.deque(maxlen=LATENCY_WINDOW)
+        self._e2e_ms = collections.deque(maxlen=LATENCY_WINDOW)
+        self._totals = collections.Counter()
+        self._blocked_seconds = 0.0
+        self._last_batch_at = None
+
+    # -----------------------------------------------------
+    # Startup: state yang dipakai ulang oleh semua batch
+    # -----------------------------------------------------
+    def start(self):
+        print(">>> INGEST SERVICE: STARTUP")
+        start_time = time.time()
+
+        with _quiet(self.verbose):
+            weather_df = extraction_source2.extract_etl_source2()
+        if weather_df is None:
+            raise RuntimeError("Gagal memuat Data Weather")
+        with _quiet(self.verbose):
+            self.weather_std, lookup = out_of_core.prepare_weather(weather_df)
+        self.weather_lookup = transformation.index_weather_lookup(lookup)
+        print(f"   -> Index cuaca: {len(self.weather_std):,} baris")
+
+        self.encoders, self.top_cities = load_reference(self.manifest, self.flight_path, self.top_n)
+        self._known = {col: pd.Index(self.encoders[col.lower()]) for col in ENCODE_COLUMNS}
+        print(f"   -> Referensi: {len(self.top_cities[0])} origin / {len(self.top_cities[1])} dest kota, "
+              + ", ".join(f"{len(v)} {k}" for k, v in self.encoders.items()))
+
+        self.session = load_warehouse.LoadSession()
+        self.fact_columns = load_warehouse.prepare_fact_append(self.session.connection)
+        if self.batch_log:
+            self._log = open(self.batch_log, "a", encoding="utf-8", buffering=1)
+
+        instrumentation.drain_records()
+        self._worker = threading.Thread(target=self._run, name="ingest-worker", daemon=True)
+        self._worker.start()
+        print(f"      ✅ Service siap ({time.time() - start_time:.2f} seconds)")
+        return self
+
+    def stop(self):
+        """Menyelesaikan batch yang sudah di queue, refresh rollup terakhir, lalu menutup pool"""
+        self.stop_event.set()
+        if self._worker is not None and self._worker.is_alive():
+            self.queue.put(_STOP)
+            self._worker.join()
+        if self.session is not None:
+            self._refresh_rollups(force=True)
+            self.session.close()
+            self.session = None
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+        summary = self.summary()
+        self._write_metrics()
+        print(f"\n>>> INGEST SERVICE: STOPPED ({summary['batches']} batch, {summary['rows_loaded']:,} baris)")
+        if summary["latency_ms"]["p50"] is not None:
+            lat = summary["latency_ms"]
+            print(f"   -> Latensi per batch: p50 {lat['p50']:.1f} ms, p95 {lat['p95']:.1f} ms, "
+                  f"max {lat['max']:.1f} ms (antri + proses p95 {summary['end_to_end_ms']['p95']:.1f} ms)")
+        if summary["backpressure_seconds"]:
+            print(f"   ⚠️ Produser tertahan (queue penuh) selama {summary['backpressure_seconds']:.2f} s")
+        return summary
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    # -----------------------------------------------------
+    # Produser
+    # -----------------------------------------------------
+    def submit(self, frame, batch_id=None, source="queue", on_done=None, timeout=None):
+        """
+        Memasukkan satu batch (DataFrame kolom Flight.csv) ke queue. Blocking jika queue penuh
+        (backpressure); queue.Full jika 'timeout' habis. 'on_done(record)' dipanggil worker
+        setelah batch selesai. batch_id yang sama tidak dimuat dua kali.
+        """
+        if self._worker is None or not self._worker.is_alive():
+            raise RuntimeError("Service belum berjalan (panggil start())")
+        batch_id = batch_id or uuid.uuid4().hex
+        item = (batch_id, source, frame, on_done, time.perf_counter())
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            blocked = time.perf_counter()
+            self.queue.put(item, timeout=timeout)
+            self._blocked_seconds += time.perf_counter() - blocked
+        return batch_id
+
+    def watch(self, drop_dir=DROP_DIR, poll_seconds=POLL_SECONDS, once=False):
+        """
+        Memantau drop_dir: setiap *.csv dipindah ke processing/ lalu masuk queue. File yang
+        berhasil dihapus, yang gagal dipindah ke failed/. Berhenti saat stop_event di-set,
+        atau setelah semua file yang ada diproses jika once=True.
+        """
+        processing, failed = (os.path.join(drop_dir, d) for d in ("processing", "failed"))
+        for d in (drop_dir, processing, failed):
+            os.makedirs(d, exist_ok=True)
+        print(f"   -> Memantau {os.path.abspath(drop_dir)} (poll {poll_seconds} s)")
+
+        def done(record, path):
+            if record["status"] == "failed":
+                target = os.path.join(failed, os.path.basename(path))
+                os.replace(path, target)
+                with open(target + ".err", "w", encoding="utf-8") as f:
+                    f.write(record["error"] + "\n")
+            else:
+                os.remove(path)
+
+        # Batch yang tertinggal di processing/ (service berhenti di tengah) diproses ulang;
+        # yang sudah sempat ter-commit dilewati lewat etl_ingest_log
+        claimed = sorted(glob.glob(os.path.join(processing, "*.csv")))
+        while not self.stop_event.is_set():
+            for path in sorted(glob.glob(os.path.join(drop_dir, "*.csv"))):
+                target = os.path.join(processing, os.path.basename(path))
+                os.replace(path, target)
+                claimed.append(target)
+            for path in claimed:
+                batch_id = os.path.splitext(os.path.basename(path))[0]
+                self.submit(path, batch_id, source=os.path.basename(path),
+                            on_done=lambda record, path=path: done(record, path))
+            if once:
+                break
+            if not claimed:
+                self.stop_event.wait(poll_seconds)
+            claimed = []
+
+    # -----------------------------------------------------
+    # Worker
+    # -----------------------------------------------------
+    def _run(self):
+        while True:
+            try:
+                item = self.queue.get(timeout=min(1.0, self.rollup_seconds))
+            except queue.Empty:
+                self._refresh_rollups()
+                continue
+            if item is _STOP:
+                break
+            batch_id, source, frame, on_done, queued_at = item
+            record = self._process(batch_id, source, frame, queued_at)
+            if on_done is not None:
+                on_done(record)
+            self._refresh_rollups()
+
+    def _reject_unknown(self, df):
+        """Baris dengan maskapai/bandara di luar kamus encoder dibuang (kode encoder tidak ada)"""
+        known = np.ones(len(df), dtype=bool)
+        for col, classes in self._known.items():
+            known &= df[col].isin(classes).to_numpy()
+        return df[known], int((~known).sum())
+
+    def _process(self, batch_id, source, frame, queued_at):
+        """Satu micro-batch dari CSV/DataFrame sampai commit ke fact_flights; mengembalikan record batch"""
+        started = time.perf_counter()
+        record = {"batch_id": batch_id, "source": source, "status": "loaded",
+                  "queue_wait_ms": round((started - queued_at) * 1000, 3)}
+        instrumentation.drain_records()
+        try:
+            with _quiet(self.verbose):
+                with instrumentation.step("read"):
+                    df = frame if isinstance(frame, pd.DataFrame) else pd.read_csv(
+                        frame, usecols=column_plan.flight_usecols)
+                    df = df[[c for c in df.columns if column_plan.flight_usecols(c)]]
+                record["rows_in"] = len(df)
+                df = transformation.filter_data(df, self.top_cities)
+                record["rows_filtered"] = record["rows_in"] - len(df)
+                df = transformation.clean_data(df)
+                with instrumentation.step("reject_unknown"):
+                    df, record["rows_rejected"] = self._reject_unknown(df)
+                n, date_keys = 0, []
+                if df.empty:
+                    # Tidak ada yang dimuat; batch_id tidak dicatat di etl_ingest_log
+                    record["status"] = "empty"
+                else:
+                    df, _ = transformation.standarisasi(df, self.weather_std, self.encoders)
+                    df = transformation.merge_data(df, self.weather_std, self.weather_lookup)
+                    df = transformation.data_enrichment(df)
+                    with instrumentation.step("append"):
+                        n, date_keys = load_warehouse.append_fact_batch(
+                            df, self.session.connection, self.fact_columns, batch_id, source)
+                    if n == 0:
+                        record["status"] = "duplicate"
+            record["rows_loaded"] = n
+            self._pending_dates.update(date_keys)
+            self._pending_rows += n
+        except Exception as exc:
+            record["status"] = "failed"
+            record["error"] = f"{type(exc).__name__}: {exc}"
+
+        total = time.perf_counter() - started
+        record["phases_ms"] = {r["step"]: round(r["wall_seconds"] * 1000, 3)
+                               for r in instrumentation.drain_records() if r["depth"] == 0}
+        record["latency_ms"] = round(total * 1000, 3)
+        rows_in = record.get("rows_in") or 0
+        record["ms_per_1k"] = round(total * 1000 / rows_in * 1000, 3) if rows_in else None
+        self._account(record)
+        return record
+
+    def _account(self, record):
+        status = record["status"]
+        self._totals[f"batches_{status}"] += 1
+        for key in ("rows_in", "rows_filtered", "rows_rejected", "rows_loaded"):
+            self._totals[key] += record.get(key) or 0
+        if status == "loaded":
+            self._latency_ms.append(record["latency_ms"])
+            self._e2e_ms.append(record["latency_ms"] + record["queue_wait_ms"])
+        self._last_batch_at = time.time()
+        if self._log is not None:
+            self._log.write(json.dumps(record) + "\n")
+
+        if status == "failed":
+            print(f"   ⚠️ [{record['batch_id']}] GAGAL: {record['error']}")
+        else:
+            per_1k = f" ({record['ms_per_1k']:.1f} ms/1k)" if record["ms_per_1k"] is not None else ""
+            rejected = f", {record['rows_rejected']:,} ditolak (di luar kamus encoder)" if record["rows_rejected"] else ""
+            print(f"   -> [{record['batch_id']}] {record.get('rows_in', 0):,} baris -> "
+                  f"{record['rows_loaded']:,} dimuat{rejected}{' (duplikat, dilewati)' if status == 'duplicate' else ''} | "
+                  f"{record['latency_ms']:.1f} ms{per_1k}, antri {record['queue_wait_ms']:.1f} ms")
+        self._write_metrics()
+
+    def _refresh_rollups(self, force=False):
+        """Rollup + versi load untuk tanggal yang terdampak sejak refresh terakhir (per interval)"""
+        if not self._pending_dates:
+            return
+        if not force and time.monotonic() - self._last_rollup < self.rollup_seconds:
+            return
+        with _quiet(self.verbose):
+            rollup_warehouse.refresh_rollups(self.session.connection, self._pending_dates)
+            load_warehouse.record_load_version(self.session.connection, self._pending_rows)
+        instrumentation.drain_records()
+        print(f"   -> Rollup di-refresh: {len(self._pending_dates)} tanggal, {self._pending_rows:,} baris baru")
+        self._pending_dates = set()
+        self._pending_rows = 0
+        self._last_rollup = time.monotonic()
+
+    # -----------------------------------------------------
+    # Ringkasan & metrik
+    # -----------------------------------------------------
+    def summary(self):
+        latency, e2e = list(self._latency_ms), list(self._e2e_ms)
+        return {
+            "batches": sum(v for k, v in self._totals.items() if k.startswith("batches_")),
+            "batches_by_status": {k[len("batches_"):]: v for k, v in self._totals.items()
+                                  if k.startswith("batches_")},
+            "rows_in": self._totals["rows_in"],
+            "rows_filtered": self._totals["rows_filtered"],
+            "rows_rejected": self._totals["rows_rejected"],
+            "rows_loaded": self._totals["rows_loaded"],
+            "latency_ms": {"p50": _percentile(latency, 50), "p95": _percentile(latency, 95),
+                           "max": max(latency) if latency else None},
+            "end_to_end_ms": {"p50": _percentile(e2e, 50), "p95": _percentile(e2e, 95)},
+            "backpressure_seconds": round(self._blocked_seconds, 3),
+            "queue_depth": self.queue.qsize(),
+        }
+
+    def _write_metrics(self):
+        """File metrik Prometheus (textfile collector), ditulis ulang setiap batch"""
+        if not self.metrics_file:
+            return
+        s, p = self.summary(), METRIC_PREFIX
+        lines = [f"# TYPE {p}_batches_total counter"]
+        lines += [f'{p}_batches_total{{status="{k}"}} {v}' for k, v in sorted(s["batches_by_status"].items())]
+        lines.append(f"# TYPE {p}_rows_total counter")
+        lines += [f'{p}_rows_total{{kind="{k}"}} {s["rows_" + k]}'
+                  for k in ("in", "filtered", "rejected", "loaded")]
+        lines.append(f"# TYPE {p}_batch_latency_ms gauge")
+        lines += [f'{p}_batch_latency_ms{{quantile="{q}"}} {s["latency_ms"][k]}'
+                  for q, k in (("0.5", "p50"), ("0.95", "p95")) if s["latency_ms"][k] is not None]
+        lines.append(f"# TYPE {p}_backpressure_seconds_total counter")
+        lines.append(f"{p}_backpressure_seconds_total {s['backpressure_seconds']}")
+        lines.append(f"# TYPE {p}_queue_depth gauge")
+        lines.append(f"{p}_queue_depth {s['queue_depth']}")
+        if self._last_batch_at is not None:
+            lines.append(f"# TYPE {p}_last_batch_timestamp_seconds gauge")
+            lines.append(f"{p}_last_batch_timestamp_seconds {self._last_batch_at:.3f}")
+        instrumentation._atomic_write(self.metrics_file, "\n".join(lines) + "\n")
+
+
+# ---------------------------------------------------------
+# CLI
+# ---------------------------------------------------------
+def replay(service, path, batch_rows):
+    """Load generator: CSV dipotong per 'batch_rows' baris lalu dikirim lewat queue lokal"""
+    name = os.path.splitext(os.path.basename(path))[0]
+    reader = pd.read_csv(path, usecols=column_plan.flight_usecols, chunksize=batch_rows)
+    for i, chunk in enumerate(reader):
+        if service.stop_event.is_set():
+            break
+        service.submit(chunk, batch_id=f"{name}-{batch_rows}-{i:06d}", source=os.path.basename(path))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Service ingest micro-batch penerbangan ke warehouse")
+    parser.add_argument("--drop-dir", default=DROP_DIR, help="Direktori batch CSV yang dipantau")
+    parser.add_argument("--once", action="store_true",
+                        help="Proses file yang ada di drop directory lalu berhenti")
+    parser.add_argument("--replay", metavar="CSV",
+                        help="Kirim CSV ini per --batch-rows baris lewat queue lokal (load generator) lalu berhenti")
+    parser.add_argument("--batch-rows", type=int, default=1000, help="Ukuran batch untuk --replay")
+    parser.add_argument("--manifest", help="_manifest.json dari main1.py --out-of-core (kamus encoder + top kota)")
+    parser.add_argument("--flight-csv", default=extraction_source1.OUTPUT_FILE,
+                        help="Flight.csv load penuh terakhir, dipakai jika --manifest tidak diberikan")
+    parser.add_argument("--top-n", type=int, default=city_locations.TOP_N,
+                        help="Jumlah kota teratas (default 10, env ETL_TOP_N)")
+    parser.add_argument("--city-locations", default=city_locations.LOCATIONS_FILE,
+                        help="CSV kamus kota -> location_id (city,location_id,latitude,longitude)")
+    parser.add_argument("--weather-source", choices=extraction_source2.WEATHER_SOURCES,
+                        default=extraction_source2.WEATHER_SOURCE,
+                        help="Sumber data cuaca: snapshot Weather.csv atau Open-Meteo API")
+    parser.add_argument("--queue-batches", type=int, default=QUEUE_BATCHES,
+                        help="Batas batch di queue sebelum produser ditahan (backpressure)")
+    parser.add_argument("--rollup-seconds", type=float, default=ROLLUP_SECONDS,
+                        help="Interval refresh rollup agg_flights_weather")
+    parser.add_argument("--batch-log", default=BATCH_LOG, help="File JSONL latensi per batch")
+    parser.add_argument("--metrics", default=METRICS_FILE, help="File metrik Prometheus")
+    parser.add_argument("--verbose", action="store_true", help="Tampilkan log transformation per batch")
+    args = parser.parse_args(argv)
+
+    instrumentation.set_quiet(True)
+    city_locations.configure(top_n=args.top_n, path=args.city_locations)
+    extraction_source2.configure(source=args.weather_source)
+
+    service = IngestService(manifest=args.manifest, flight_path=args.flight_csv, top_n=args.top_n,
+                            queue_batches=args.queue_batches, rollup_seconds=args.rollup_seconds,
+                            batch_log=args.batch_log, metrics_file=args.metrics, verbose=args.verbose)
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: service.stop_event.set())
+
+    with service:
+        if args.replay:
+            replay(service, args.replay, args.batch_rows)
+        else:
+            service.watch(args.drop_dir, once=args.once)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+import datetime
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# ---------------------------------------------------------
+# Instrumentasi per fase / sub-step pipeline ETL.
+# - step(name): context manager, instrument(): decorator untuk fungsi
+# - per step dicatat wall & CPU time, RSS (delta & peak delta), rows & bytes in/out
+# - write_report(): laporan JSON + file metrik format teks Prometheus
+# - preview(): pengganti print(df.head()) yang dilewati pada quiet mode
+# - aman dipakai dari beberapa thread (stack step per thread, lihat phase_scheduler.py);
+#   cpu_seconds adalah CPU proses, jadi step yang berjalan bersamaan saling beririsan
+# ---------------------------------------------------------
+
+QUIET = os.getenv("ETL_QUIET", "0").lower() in ("1", "true", "yes")
+SAMPLE_INTERVAL = 0.02
+METRIC_PREFIX = "etl"
+
+_records = []
+_active = []  # step yang sedang berjalan di semua thread (untuk sampler RSS)
+_local = threading.local()
+_run = {}
+_sections = {}
+_sampler = None
+_lock = threading.Lock()
+
+
+def set_quiet(quiet=True):
+    """Quiet mode: preview DataFrame (head/info) tidak dicetak"""
+    global QUIET
+    QUIET = bool(quiet)
+
+
+def preview(df, columns=None, n=5, title=None, end="\n\n"):
+    """Mencetak df.head(n) (opsional hanya 'columns', diawali 'title'); dilewati pada quiet mode"""
+    if QUIET or df is None:
+        return
+    if title:
+        print(title)
+    frame = df[columns] if columns is not None else df
+    print(frame.head(n), end=end)
+
+
+# ---------------------------------------------------------
+# PENGUKURAN
+# ---------------------------------------------------------
+def _rss_bytes():
+    """RSS proses saat ini. Linux: /proc/self/statm, fallback: ru_maxrss (high-water mark)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        if resource is None:
+            return 0
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _frame_stats(values):
+    """(rows, bytes) dari DataFrame/Series atau tuple/list berisi DataFrame; None jika tidak ada"""
+    frames = [v for v in (values if isinstance(values, (tuple, list)) else [values])
+              if isinstance(v, (pd.DataFrame, pd.Series))]
+    if not frames:
+        return None, None
+    rows = sum(len(f) for f in frames)
+    # deep=False: kolom object dihitung sebagai pointer (deep=True terlalu mahal untuk data besar)
+    n_bytes = sum(int(f.memory_usage(index=True, deep=False).sum()) if isinstance(f, pd.DataFrame)
+                  else int(f.memory_usage(index=True, deep=False)) for f in frames)
+    return rows, n_bytes
+
+
+def _stack():
+    """Stack step milik thread saat ini (step di thread lain tidak menjadi parent)"""
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+class _RssSampler(threading.Thread):
+    """Thread pembaca RSS periodik; memperbarui peak setiap step yang sedang aktif"""
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        super().__init__(daemon=True, name="rss-sampler")
+        self.interval = interval
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            rss = _rss_bytes()
+            with _lock:
+                for frame in _active:
+                    if rss > frame["_peak"]:
+                        frame["_peak"] = rss
+
+
+def _ensure_sampler():
+    global _sampler
+    if _sampler is None:
+        _sampler = _RssSampler()
+        _sampler.start()
+
+
+# ---------------------------------------------------------
+# STEP & DECORATOR
+# ---------------------------------------------------------
+@contextmanager
+def step(name, inputs=None, **labels):
+    """
+    Mengukur satu fase / sub-step. 'inputs' (DataFrame atau tuple DataFrame) dipakai untuk
+    rows_in/bytes_in; isi info['outputs'] = DataFrame hasil untuk rows_out/bytes_out.
+    Label tambahan (misal table='dim_date') ikut ke laporan JSON & Prometheus.
+    """
+    if not _run:
+        start_run()
+    _ensure_sampler()
+
+    rows_in, bytes_in = _frame_stats(inputs)
+    rss_before = _rss_bytes()
+    frame = {"_peak": rss_before}
+    info = {"outputs": None}
+    stack = _stack()
+    path = ".".join([f["name"] for f in stack] + [name])
+    frame["name"] = name
+    with _lock:
+        stack.append(frame)
+        _active.append(frame)
+
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    status = "ok"
+    try:
+        yield info
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+        rss_after = _rss_bytes()
+        with _lock:
+            stack.pop()
+            _active[:] = [f for f in _active if f is not frame]
+            peak = max(frame["_peak"], rss_after)
+            for parent in stack:
+                parent["_peak"] = max(parent["_peak"], peak)
+        rows_out, bytes_out = _frame_stats(info["outputs"])
+        with _lock:
+            _records.append({
+                "step": path,
+                "depth": path.count("."),
+                "labels": {k: str(v) for k, v in labels.items()},
+                "status": status,
+                "started_at": round(wall_start - _run["_perf_start"], 4),
+                "wall_seconds": round(wall, 6),
+                "cpu_seconds": round(cpu, 6),
+                "rss_before_bytes": rss_before,
+                "rss_after_bytes": rss_after,
+                "rss_delta_bytes": rss_after - rss_before,
+                "peak_rss_delta_bytes": peak - rss_before,
+                "rows_in": rows_in,
+                "rows_out": rows_out,
+                "bytes_in": bytes_in,
+                "bytes_out": bytes_out,
+            })
+
+
+def instrument(name=None):
+    """
+    Decorator: membungkus fungsi dengan step(). Argumen DataFrame menjadi input,
+    nilai kembalian (DataFrame / tuple DataFrame) menjadi output.
+    """
+    def decorator(func):
+        step_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            inputs = [a for a in list(args) + list(kwargs.values()) if isinstance(a, (pd.DataFrame, pd.Series))]
+            with step(step_name, inputs) as info:
+                result = func(*args, **kwargs)
+                info["outputs"] = result
+            return result
+        return wrapper
+    return decorator
+
+
+# ---------------------------------------------------------
+# RUN & LAPORAN
+# ---------------------------------------------------------
+def start_run(pipeline="etl"):
+    """Memulai run baru (mengosongkan catatan step sebelumnya)"""
+    _records.clear()
+    _sections.clear()
+    _run.clear()
+    _run.update({
+        "run_id": uuid.uuid4().hex[:12],
+        "pipeline": pipeline,
+        "started_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "_perf_start": time.perf_counter(),
+        "_cpu_start": time.process_time(),
+        "_unix_start": time.time(),
+    })
+    return _run["run_id"]
+
+
+def add_section(name, value):
+    """Menambahkan bagian tambahan ke laporan JSON (misal jadwal fase dari phase_scheduler)"""
+    _sections[name] = value
+
+
+def get_records():
+    """Salinan catatan step (urut selesai)"""
+    return list(_records)
+
+
+def drain_records():
+    """Mengambil lalu mengosongkan catatan step (proses jangka panjang, misal ingest_service.py)"""
+    with _lock:
+        records = list(_records)
+        _records.clear()
+    return records
+
+
+def build_report():
+    """Laporan run dalam bentuk dict (siap di-dump ke JSON)"""
+    return {
+        "run_id": _run.get("run_id"),
+        "pipeline": _run.get("pipeline"),
+        "started_at": _run.get("started_at"),
+        "finished_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "wall_seconds": round(time.perf_counter() - _run.get("_perf_start", time.perf_counter()), 4),
+        "cpu_seconds": round(time.process_time() - _run.get("_cpu_start", time.process_time()), 4),
+        "steps": sorted(_records, key=lambda r: (r["started_at"], r["depth"])),
+        **_sections,
+    }
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(record):
+    labels = {"step": record["step"], **record["labels"]}
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def prometheus_text(report):
+    """Metrik format teks Prometheus (untuk node_exporter textfile collector / pushgateway)"""
+    p = METRIC_PREFIX
+    run_labels = f'{{pipeline="{_escape(report["pipeline"])}"}}'
+    lines = [
+        f"# HELP {p}_run_wall_seconds Durasi total run pipeline",
+        f"# TYPE {p}_run_wall_seconds gauge",
+        f"{p}_run_wall_seconds{run_labels} {report['wall_seconds']}",
+        f"# HELP {p}_run_cpu_seconds CPU time total run pipeline",
+        f"# TYPE {p}_run_cpu_seconds gauge",
+        f"{p}_run_cpu_seconds{run_labels} {report['cpu_seconds']}",
+        f"# HELP {p}_run_last_timestamp_seconds Waktu mulai run terakhir (unix)",
+        f"# TYPE {p}_run_last_timestamp_seconds gauge",
+        f"{p}_run_last_timestamp_seconds{run_labels} {round(_run.get('_unix_start', time.time()), 3)}",
+    ]
+    metrics = [
+        ("step_wall_seconds", "wall_seconds", "Durasi wall-clock per step"),
+        ("step_cpu_seconds", "cpu_seconds", "CPU time per step"),
+        ("step_rss_delta_bytes", "rss_delta_bytes", "Perubahan RSS setelah step"),
+        ("step_peak_rss_delta_bytes", "peak_rss_delta_bytes", "Peak RSS selama step dikurangi RSS awal"),
+        ("step_rows_in", "rows_in", "Jumlah baris input step"),
+        ("step_rows_out", "rows_out", "Jumlah baris output step"),
+        ("step_bytes_in", "bytes_in", "Ukuran memori DataFrame input step"),
+        ("step_bytes_out", "bytes_out", "Ukuran memori DataFrame output step"),
+    ]
+    for metric, key, help_text in metrics:
+        lines.append(f"# HELP {p}_{metric} {help_text}")
+        lines.append(f"# TYPE {p}_{metric} gauge")
+        seen = set()
+        for r in report["steps"]:
+            label = _labels(r)
+            if r[key] is None or label in seen:  # step berulang: nilai pertama yang dipakai
+                continue
+            seen.add(label)
+            lines.append(f"{p}_{metric}{label} {r[key]}")
+    lines.append(f"# HELP {p}_step_success 1 jika step selesai tanpa error")
+    lines.append(f"# TYPE {p}_step_success gauge")
+    seen = set()
+    for r in report["steps"]:
+        label = _labels(r)
+        if label not in seen:
+            seen.add(label)
+            lines.append(f"{p}_step_success{label} {1 if r['status'] == 'ok' else 0}")
+    return "\n".join(lines) + "\n"
+
+
+def _atomic_write(path, text):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)  # scraper tidak pernah membaca file setengah jadi
+
+
+def write_report(json_path=None, prom_path=None):
+    """Menulis laporan JSON dan/atau file metrik Prometheus. Mengembalikan dict laporan."""
+    report = build_report()
+    if json_path:
+        _atomic_write(json_path, json.dumps(report, indent=2))
+        print(f"   -> Laporan run disimpan ke {json_path}")
+    if prom_path:
+        _atomic_write(prom_path, prometheus_text(report))
+        print(f"   -> Metrik Prometheus disimpan ke {prom_path}")
+    return report
+
+
+def print_summary(report, max_depth=1):
+    """Tabel ringkas per step (default: fase & sub-step level pertama)"""
+    mb = 1024 * 1024
+    print(f"\n{'step':<52}{'rows_out':>12}{'wall (s)':>11}{'cpu (s)':>10}{'peak ΔMB':>10}")
+    for r in report["steps"]:
+        if r["depth"] > max_depth:
+            continue
+        name = "  " * r["depth"] + r["step"].split(".")[-1]
+        if r["labels"]:
+            name += " [" + ",".join(r["labels"].values()) + "]"
+        rows = f"{r['rows_out']:,}" if r["rows_out"] is not None else "-"
+        flag = "" if r["status"] == "ok" else "  ❌"
+        print(f"{name:<52}{rows:>12}{r['wall_seconds']:>11.3f}{r['cpu_seconds']:>10.3f}"
+              f"{r['peak_rss_delta_bytes'] / mb:>10.1f}{flag}")
+    print(f"{'TOTAL':<52}{'':>12}{report['wall_seconds']:>11.3f}{report['cpu_seconds']:>10.3f}")
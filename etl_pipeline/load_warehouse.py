@@ -1,34 +1,103 @@
 import pandas as pd
+import numpy as np
 import io
 import os
 import sys
+from contextlib import contextmanager
 
-# Konfigurasi Database (Diambil dari notebook Anda)
-DB_USER = "postgres"
-DB_PASS = "12345"
-DB_HOST = "localhost"
-DB_PORT = "5432"
-DB_NAME = "flight_weather"
+import column_plan
+import datetime_keys
+import instrumentation
+import rollup_warehouse
+
+# Konfigurasi Database (default dari notebook, bisa di-override lewat environment variable)
+DB_USER = os.getenv("PGUSER", "postgres")
+DB_PASS = os.getenv("PGPASSWORD", "12345")
+DB_HOST = os.getenv("PGHOST", "localhost")
+DB_PORT = os.getenv("PGPORT", "5432")
+DB_NAME = os.getenv("PGDATABASE", "flight_weather")
 
 try:
     import psycopg2
+    import psycopg2.pool
     from psycopg2.extras import RealDictCursor
 except ImportError as exc:
     raise SystemExit(
         "psycopg2 is required. Install with: pip install psycopg2-binary"
     ) from exc
 
+def conn_args_from_env():
+    """Parameter koneksi PostgreSQL dari environment (PGHOST, PGPORT, dst.)"""
+    return {
+        "host": os.getenv("PGHOST", DB_HOST),
+        "port": os.getenv("PGPORT", DB_PORT),
+        "dbname": os.getenv("PGDATABASE", DB_NAME),
+        "user": os.getenv("PGUSER", DB_USER),
+        "password": os.getenv("PGPASSWORD", DB_PASS),
+        "sslmode": os.getenv("PGSSLMODE", "disable"),
+        "connect_timeout": int(os.getenv("PGCONNECT_TIMEOUT", "10")),
+    }
+
 def get_conn():
     """Membuat koneksi ke database PostgreSQL"""
-    return psycopg2.connect(
-        host=DB_HOST,
-        port=DB_PORT,
-        dbname=DB_NAME,
-        user=DB_USER,
-        password=DB_PASS,
-        sslmode="disable",
-        connect_timeout=10
-    )
+    return psycopg2.connect(**conn_args_from_env())
+
+class LoadSession:
+    """
+    Sesi load ke warehouse yang memakai ulang koneksi dari pool untuk semua tabel.
+
+    - single_transaction=False: tiap tabel di-commit sendiri, koneksi dipinjam dari pool.
+    - single_transaction=True : semua dimensi + fakta dimuat dalam SATU transaksi
+      (atomic publish), di-commit saat sesi selesai tanpa error, rollback jika gagal.
+
+    Pemakaian:
+        with LoadSession(single_transaction=True) as session:
+            load_data_to_postgres(df, "dim_x", session.connection)
+    """
+
+    def __init__(self, single_transaction=False, minconn=1, maxconn=4):
+        self.single_transaction = single_transaction
+        self.pool = psycopg2.pool.ThreadedConnectionPool(minconn, maxconn, **conn_args_from_env())
+        self._shared_conn = None
+
+    @contextmanager
+    def connection(self):
+        """Context manager koneksi, dipakai sebagai 'conn_func' oleh load_data_to_postgres"""
+        if self.single_transaction:
+            if self._shared_conn is None:
+                self._shared_conn = self.pool.getconn()
+            # Commit/rollback ditunda sampai sesi selesai
+            yield self._shared_conn
+            return
+
+        conn = self.pool.getconn()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.pool.putconn(conn)
+
+    def close(self, commit=True):
+        if self.pool.closed:
+            return
+        if self._shared_conn is not None:
+            if commit:
+                self._shared_conn.commit()
+            else:
+                self._shared_conn.rollback()
+            self.pool.putconn(self._shared_conn)
+            self._shared_conn = None
+        self.pool.closeall()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(commit=exc_type is None)
+        return False
 
 def normalize_col_names(df):
     """Membersihkan nama kolom agar sesuai standar database (lowercase, no space)"""
@@ -51,10 +120,174 @@ def normalize_col_names(df):
     )
     return df
 
-def load_data_to_postgres(df, table_name, conn_func, if_exists='replace', primary_key_cols=None, foreign_key_definitions=None):
+def _type_stats(series):
+    """
+    Ringkasan nilai kolom yang dibutuhkan untuk memilih tipe PostgreSQL. Ringkasan dari
+    beberapa partisi bisa digabung dengan _merge_type_stats (mode out-of-core) dan
+    menghasilkan tipe yang sama dengan infer_pg_type pada kolom utuh.
+    """
+    dt = str(series.dtype).lower()
+    values = series.dropna()
+
+    if dt.startswith("bool"):
+        return {"kind": "bool"}
+
+    if dt.startswith("int") or dt.startswith("uint"):
+        if values.empty:
+            return {"kind": "int", "empty": True}
+        return {"kind": "int", "empty": False, "min": int(values.min()), "max": int(values.max())}
+
+    if dt.startswith("float"):
+        stats = {"kind": "float", "empty": values.empty, "finite": True, "max_abs": 0.0, "decimals": 0}
+        if values.empty:
+            return stats
+        arr = values.to_numpy(dtype="float64")
+        if not np.isfinite(arr).all():
+            stats["finite"] = False
+            return stats
+        stats["max_abs"] = float(np.abs(arr).max())
+        # Jumlah digit desimal terkecil (0-4) yang membuat semua nilai bulat; None jika > 4
+        stats["decimals"] = None
+        for decimals in range(0, 5):
+            scaled = arr * (10 ** decimals)
+            if np.all(np.abs(scaled - np.round(scaled)) < 1e-6):
+                stats["decimals"] = decimals
+                break
+        return stats
+
+    if "datetime" in dt:
+        # midnight: semua nilai jatuh tepat di tengah malam (tanpa komponen jam)
+        return {"kind": "datetime", "empty": values.empty,
+                "midnight": bool((values.dt.normalize() == values).all())}
+
+    return {"kind": "text"}
+
+def _merge_type_stats(a, b):
+    """Menggabungkan dua ringkasan _type_stats (int + float dilebarkan menjadi float)"""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    if a["kind"] != b["kind"]:
+        if {a["kind"], b["kind"]} != {"int", "float"}:
+            return {"kind": "text"}
+        if a["kind"] == "int":
+            a = {"kind": "float", "empty": a["empty"], "finite": True, "decimals": 0,
+                 "max_abs": 0.0 if a["empty"] else float(max(abs(a["min"]), abs(a["max"])))}
+        else:
+            b = {"kind": "float", "empty": b["empty"], "finite": True, "decimals": 0,
+                 "max_abs": 0.0 if b["empty"] else float(max(abs(b["min"]), abs(b["max"])))}
+
+    kind = a["kind"]
+    if kind in ("bool", "text"):
+        return a
+    if a["empty"]:
+        return b
+    if b["empty"]:
+        return a
+    if kind == "int":
+        return {"kind": "int", "empty": False, "min": min(a["min"], b["min"]), "max": max(a["max"], b["max"])}
+    if kind == "float":
+        decimals = None if a["decimals"] is None or b["decimals"] is None else max(a["decimals"], b["decimals"])
+        return {"kind": "float", "empty": False, "finite": a["finite"] and b["finite"],
+                "max_abs": max(a["max_abs"], b["max_abs"]), "decimals": decimals}
+    return {"kind": "datetime", "empty": False, "midnight": a["midnight"] and b["midnight"]}
+
+def _pg_type_from_stats(stats):
+    """Tipe PostgreSQL tersempit yang aman berdasarkan ringkasan _type_stats"""
+    kind = stats["kind"]
+
+    if kind == "bool":
+        return "BOOLEAN"
+
+    if kind == "int":
+        # Flag 0/1 (cancelled, diverted) tetap integer (SMALLINT) karena query analitik
+        # memakai SUM()/AVG() pada kolom tersebut, yang tidak berlaku untuk BOOLEAN.
+        if stats["empty"]:
+            return "SMALLINT"
+        min_val, max_val = stats["min"], stats["max"]
+        if min_val >= -32768 and max_val <= 32767:
+            return "SMALLINT"
+        if min_val >= -2147483648 and max_val <= 2147483647:
+            return "INTEGER"
+        return "BIGINT"
+
+    if kind == "float":
+        # REAL (float32) hanya aman jika semua nilai punya <= 6 digit signifikan,
+        # sehingga nilai yang tersimpan dan hasil perbandingan di SQL tidak berubah.
+        if stats["empty"]:
+            return "REAL"
+        if not stats["finite"] or stats["decimals"] is None:
+            return "DOUBLE PRECISION"
+        max_abs = stats["max_abs"]
+        int_digits = len(str(int(max_abs))) if max_abs >= 1 else 0
+        if int_digits + stats["decimals"] <= 6:
+            return "REAL"
+        return "DOUBLE PRECISION"
+
+    if kind == "datetime":
+        # DATE jika semua nilai jatuh tepat di tengah malam (tanpa komponen jam)
+        if not stats["empty"] and stats["midnight"]:
+            return "DATE"
+        return "TIMESTAMP"
+
+    return "TEXT"
+
+def infer_pg_type(series, override=None):
+    """
+    Menentukan tipe data PostgreSQL tersempit yang aman untuk sebuah kolom,
+    berdasarkan dtype, nilai min/max aktual, dan ada/tidaknya nilai null.
+    Jika 'override' diisi (misal 'BIGINT'), tipe tersebut yang dipakai.
+    """
+    if override:
+        return override
+    return _pg_type_from_stats(_type_stats(series))
+
+def _create_table(cur, table_name, column_types, primary_key_cols=None, foreign_key_definitions=None, if_exists='replace'):
+    """CREATE TABLE dari {kolom: tipe PostgreSQL} beserta Primary Key & Foreign Key"""
+    cols_ddl_list = [f'"{c}" {pg_type}' for c, pg_type in column_types.items()]
+
+    # Add Primary Key constraint
+    if primary_key_cols:
+        cols_ddl_list.append(f'PRIMARY KEY ({", ".join([f"{col}" for col in primary_key_cols])})')
+
+    # Add Foreign Key constraints
+    if foreign_key_definitions:
+        for fk_def in foreign_key_definitions:
+            local_col = fk_def['local_col']
+            ref_table = fk_def['ref_table']
+            ref_col = fk_def['ref_col']
+            cols_ddl_list.append(f'FOREIGN KEY ("{local_col}") REFERENCES public."{ref_table}" ("{ref_col}")')
+
+    cols_ddl_sql = ",\n  ".join(cols_ddl_list)
+    create_table_sql = f'CREATE TABLE public."{table_name}" (\n  {cols_ddl_sql}\n);'
+
+    if if_exists == 'replace':
+        cur.execute(f'DROP TABLE IF EXISTS public."{table_name}" CASCADE;')
+    cur.execute(create_table_sql)
+
+def _copy_frame(cur, df, table_name):
+    """COPY DataFrame (nama kolom sudah dinormalisasi) ke tabel; mengembalikan jumlah baris"""
+    buf = io.StringIO()
+    df.to_csv(buf, index=False, header=False)
+    buf.seek(0)
+
+    cols_list = ", ".join([f'"{col}"' for col in df.columns])
+    cur.copy_expert(
+        f'COPY public."{table_name}" ({cols_list}) FROM STDIN WITH (FORMAT CSV)',
+        buf
+    )
+    # Jumlah baris diambil dari status COPY, tanpa SELECT COUNT(*) (full scan) ulang
+    return cur.rowcount
+
+def load_data_to_postgres(df, table_name, conn_func, if_exists='replace', primary_key_cols=None, foreign_key_definitions=None, type_overrides=None):
     """
     Fungsi generik untuk memuat DataFrame ke PostgreSQL dengan performa tinggi (COPY command).
     Mendukung pembuatan Primary Key dan Foreign Key secara otomatis.
+    Tipe kolom dipilih oleh infer_pg_type(); gunakan 'type_overrides' ({kolom: tipe})
+    untuk memaksa tipe tertentu.
+    'conn_func' dipanggil sebagai context manager (get_conn atau LoadSession.connection)
+    yang bertanggung jawab atas commit. Mengembalikan jumlah baris hasil COPY.
     """
     df_copy = df.copy()
     df_copy = normalize_col_names(df_copy)
@@ -65,70 +298,71 @@ def load_data_to_postgres(df, table_name, conn_func, if_exists='replace', primar
         with conn.cursor() as cur:
             cur.execute("SET search_path TO public;")
 
-            # 1. Infer PostgreSQL data types
-            cols_ddl_list = []
-            for c in df_copy.columns:
-                dt = df_copy[c].dtype
-                pg_type = ""
-                if str(dt).startswith("int"): 
-                    pg_type = "BIGINT"
-                elif str(dt).startswith("float"): 
-                    pg_type = "DOUBLE PRECISION"
-                elif str(dt).startswith("bool"): 
-                    pg_type = "BOOLEAN"
-                elif "datetime" in str(dt):
-                    pg_type = "TIMESTAMP"
-                else:
-                    pg_type = "TEXT"
-                cols_ddl_list.append(f'"{c}" {pg_type}')
-
-            # 2. Add Primary Key constraint
-            if primary_key_cols:
-                cols_ddl_list.append(f'PRIMARY KEY ({", ".join([f"{col}" for col in primary_key_cols])})')
-
-            # 3. Add Foreign Key constraints
-            if foreign_key_definitions:
-                for fk_def in foreign_key_definitions:
-                    local_col = fk_def['local_col']
-                    ref_table = fk_def['ref_table']
-                    ref_col = fk_def['ref_col']
-                    cols_ddl_list.append(f'FOREIGN KEY ("{local_col}") REFERENCES public."{ref_table}" ("{ref_col}")')
-
-            create_table_sql = f'CREATE TABLE public."{table_name}" (\n  {",\n  ".join(cols_ddl_list)}\n);'
-
-            # 4. Drop and create table
-            if if_exists == 'replace':
-                cur.execute(f'DROP TABLE IF EXISTS public."{table_name}" CASCADE;')
-            cur.execute(create_table_sql)
+            # 1. Infer PostgreSQL data types (berdasarkan range nilai aktual tiap kolom)
+            column_types = {
+                c: infer_pg_type(df_copy[c], (type_overrides or {}).get(c)) for c in df_copy.columns
+            }
+
+            # 2-4. Drop and create table (PK & FK ikut di DDL)
+            _create_table(cur, table_name, column_types, primary_key_cols, foreign_key_definitions, if_exists)
 
             # 5. Fast load via COPY (In-memory buffer)
-            buf = io.StringIO()
-            df_copy.to_csv(buf, index=False, header=False)
-            buf.seek(0)
-
-            cols_list = ", ".join([f'"{col}"' for col in df_copy.columns])
-            cur.copy_expert(
-                f'COPY public."{table_name}" ({cols_list}) FROM STDIN WITH (FORMAT CSV)',
-                buf
-            )
-        conn.commit()
+            n = _copy_frame(cur, df_copy, table_name)
 
-        with conn.cursor() as cur:
-            cur.execute(f'SELECT COUNT(*) FROM public."{table_name}";')
-            n = cur.fetchone()[0]
-        print(f"      ✅ Loaded {n:,} rows into public.{table_name}")
+    print(f"      ✅ Loaded {n:,} rows into public.{table_name}")
+    return n
 
-def load_star_schema_to_dw(df):
+def load_star_schema_to_dw(df, type_overrides=None, single_transaction=False):
     """
     Fungsi utama (Orchestrator) untuk memecah df_final menjadi tabel Dimensi & Fakta.
+    'type_overrides' ({kolom: tipe PostgreSQL}) diteruskan ke setiap tabel yang dimuat.
+    Semua tabel dimuat lewat satu LoadSession (koneksi di-pool); jika
+    'single_transaction=True' dimensi, fakta, dan rollup di-publish secara atomik.
     """
+    with LoadSession(single_transaction=single_transaction) as session:
+        _load_star_schema(df, session.connection, type_overrides)
+
     print("\n==========================================")
-    print("   STARTING STAR SCHEMA LOAD (COPY MODE)  ")
+    print("       WAREHOUSE LOAD COMPLETED           ")
     print("==========================================\n")
 
+def record_load_version(conn_func, fact_rows):
+    """
+    Mencatat versi load warehouse di tabel public.etl_load_log. Nomor load_id terbaru
+    dipakai sebagai 'load version' (misal untuk cache hasil query di analytics_runner.py).
+    """
+    with conn_func() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS public.etl_load_log (
+                    load_id BIGSERIAL PRIMARY KEY,
+                    loaded_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                    fact_rows BIGINT
+                );
+                """
+            )
+            cur.execute(
+                "INSERT INTO public.etl_load_log (fact_rows) VALUES (%s) RETURNING load_id;",
+                (int(fact_rows),)
+            )
+            load_id = cur.fetchone()[0]
+    print(f"   -> Load version: {load_id}")
+    return load_id
+
+def build_star_schema(df):
+    """
+    Memecah df_final menjadi tabel Dimensi & Fakta (tanpa menyentuh database).
+    Mengembalikan dict {nama_tabel: {'frame', 'primary_key_cols', 'foreign_key_definitions'}}
+    dengan urutan dimensi lebih dulu, lalu fact_flights. Dipakai oleh loader PostgreSQL
+    maupun export columnar (export_columnar.py).
+    """
+    tables = {}
+
     # 1. Rename encoded columns to represent keys
     # Sesuaikan mapping ini dengan output dari transformation.py Anda
     df_star = df.copy()
+    column_plan.record("build_star_schema", df, column_plan.MERGE_KEY_ONLY + ['origin_time', 'dest_time'])
     
     # Mapping nama kolom dari transformation.py ke nama key database
     rename_mapping = {
@@ -146,65 +380,40 @@ def load_star_schema_to_dw(df):
     # ---------------------------------------------------------
     # 2. Create Dimension Tables
     # ---------------------------------------------------------
-    print("\n[1/2] Creating Dimension Tables...")
-
     # A. Dim Airline
     if 'airline_key' in df_star.columns:
         dim_airline = df_star[['airline_key', 'airline', 'airline_code']].drop_duplicates(subset=['airline_key']).sort_values('airline_key').reset_index(drop=True)
-        load_data_to_postgres(dim_airline, "dim_airline", get_conn, primary_key_cols=['airline_key'])
+        tables['dim_airline'] = {'frame': dim_airline, 'primary_key_cols': ['airline_key'], 'foreign_key_definitions': None}
     else:
         print("   ⚠️ Skip Dim Airline: 'airline_key' not found.")
 
     # B. Dim Origin City
     if 'origin_city_key' in df_star.columns:
         dim_origin_city = df_star[['origin_city_key', 'origin_city', 'origin']].drop_duplicates(subset=['origin_city_key']).sort_values('origin_city_key').reset_index(drop=True)
-        load_data_to_postgres(dim_origin_city, "dim_origin_city", get_conn, primary_key_cols=['origin_city_key'])
+        tables['dim_origin_city'] = {'frame': dim_origin_city, 'primary_key_cols': ['origin_city_key'], 'foreign_key_definitions': None}
     else:
         print("   ⚠️ Skip Dim Origin City: 'origin_city_key' not found.")
 
     # C. Dim Destination City
     if 'dest_city_key' in df_star.columns:
         dim_dest_city = df_star[['dest_city_key', 'dest_city', 'dest']].drop_duplicates(subset=['dest_city_key']).sort_values('dest_city_key').reset_index(drop=True)
-        load_data_to_postgres(dim_dest_city, "dim_dest_city", get_conn, primary_key_cols=['dest_city_key'])
+        tables['dim_dest_city'] = {'frame': dim_dest_city, 'primary_key_cols': ['dest_city_key'], 'foreign_key_definitions': None}
     else:
         print("   ⚠️ Skip Dim Dest City: 'dest_city_key' not found.")
 
     # D. Dim Date
     if 'fl_date' in df_star.columns:
-        dim_date = df_star[['fl_date']].drop_duplicates().copy()
-        dim_date['date_key'] = dim_date['fl_date'] # Use fl_date as date_key (Int format YYYYMMDD)
-        
-        # Parsing tanggal (fl_date formatnya int YYYYMMDD, perlu di-cast ke string dulu untuk parsing)
-        dim_date['temp_date_str'] = dim_date['fl_date'].astype(str)
-        dim_date['year'] = dim_date['temp_date_str'].str[:4].astype(int)
-        dim_date['month'] = dim_date['temp_date_str'].str[4:6].astype(int)
-        dim_date['day'] = dim_date['temp_date_str'].str[6:8].astype(int)
-        
-        # Konversi ke datetime object untuk fitur advanced (day name, quarter)
-        dim_date['dt_obj'] = pd.to_datetime(dim_date['temp_date_str'], format='%Y%m%d', errors='coerce')
-        dim_date['day_of_week'] = dim_date['dt_obj'].dt.dayofweek # 0=Monday
-        dim_date['day_name'] = dim_date['dt_obj'].dt.day_name()
-        dim_date['quarter'] = dim_date['dt_obj'].dt.quarter
-        
-        # Select final columns
-        dim_date = dim_date[['date_key', 'year', 'month', 'day', 'day_of_week', 'day_name', 'quarter']].sort_values('date_key').reset_index(drop=True)
-        load_data_to_postgres(dim_date, "dim_date", get_conn, primary_key_cols=['date_key'])
+        # Setiap hari di kalender min..max fl_date (Int format YYYYMMDD), termasuk hari tanpa penerbangan
+        dim_date = datetime_keys.dim_date(df_star['fl_date'].min(), df_star['fl_date'].max())
+        tables['dim_date'] = {'frame': dim_date, 'primary_key_cols': ['date_key'], 'foreign_key_definitions': None}
     else:
         print("   ⚠️ Skip Dim Date: 'fl_date' not found.")
 
     # ---------------------------------------------------------
     # 3. Create Fact Table
     # ---------------------------------------------------------
-    print("\n[2/2] Creating Fact Table...")
-    
-    # Kolom dimensi (text) yang tidak perlu ada di tabel fakta karena sudah ada key-nya
-    dim_cols_to_exclude = [
-        'airline', 'airline_code', 
-        'origin', 'origin_city', 
-        'dest', 'dest_city',
-        'temp_date_str', 'dt_obj', # kolom temporary
-        'crs_dep_time_rounded', 'crs_arr_time_rounded', 'origin_time', 'dest_time'
-    ]
+    # Kolom dimensi (text) & kunci merge yang tidak perlu ada di tabel fakta (column_plan)
+    dim_cols_to_exclude = column_plan.FACT_EXCLUDED
     
     # Ambil semua kolom kecuali kolom dimensi text
     fact_cols = [col for col in df_star.columns if col not in dim_cols_to_exclude]
@@ -225,9 +434,234 @@ def load_star_schema_to_dw(df):
 
     # Filter FK definition jika tabel dimensi terkait tidak berhasil dibuat (opsional, tapi aman)
     # Disini kita asumsikan semua dimensi berhasil dibuat.
-    
-    load_data_to_postgres(fact_flights, "fact_flights", get_conn, foreign_key_definitions=foreign_keys_for_fact)
+    tables['fact_flights'] = {'frame': fact_flights, 'primary_key_cols': None, 'foreign_key_definitions': foreign_keys_for_fact}
+
+    return tables
+
+def _load_table(table_name, spec, conn_func, type_overrides=None):
+    with instrumentation.step("load_table", spec['frame'], table=table_name) as s:
+        load_data_to_postgres(
+            spec['frame'], table_name, conn_func,
+            primary_key_cols=spec['primary_key_cols'],
+            foreign_key_definitions=spec['foreign_key_definitions'],
+            type_overrides=type_overrides
+        )
+        s["outputs"] = spec['frame']
+
+def load_dimension_tables(tables, conn_func, type_overrides=None):
+    """Memuat semua tabel dimensi hasil build_star_schema() (hanya butuh key, bukan validasi fakta)"""
+    print("\n[1/3] Creating Dimension Tables...")
+    for table_name, spec in tables.items():
+        if table_name != 'fact_flights':
+            _load_table(table_name, spec, conn_func, type_overrides)
+
+def load_fact_table(tables, conn_func, type_overrides=None):
+    """Memuat fact_flights (FK ke dimensi, jadi dimensi harus sudah dimuat)"""
+    print("\n[2/3] Creating Fact Table...")
+    _load_table('fact_flights', tables['fact_flights'], conn_func, type_overrides)
+    reset_ingest_log(conn_func)
+
+# ---------------------------------------------------------
+# Append micro-batch (ingest_service.py): fact_flights yang sudah ada ditambah, bukan di-replace
+# ---------------------------------------------------------
+INGEST_LOG_DDL = """
+CREATE TABLE IF NOT EXISTS public.etl_ingest_log (
+    batch_id TEXT PRIMARY KEY,
+    source TEXT,
+    fact_rows BIGINT,
+    ingested_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+"""
+
+def reset_ingest_log(conn_func):
+    """fact_flights baru di-replace: batch yang pernah di-append ikut hilang, jadi boleh dimuat ulang"""
+    with conn_func() as conn:
+        with conn.cursor() as cur:
+            cur.execute("DROP TABLE IF EXISTS public.etl_ingest_log;")
+
+def prepare_fact_append(conn_func):
+    """Membuat etl_ingest_log jika belum ada; mengembalikan {kolom: tipe} fact_flights (urut ordinal)"""
+    with conn_func() as conn:
+        with conn.cursor() as cur:
+            cur.execute(INGEST_LOG_DDL)
+            cur.execute(
+                """
+                SELECT column_name, data_type FROM information_schema.columns
+                WHERE table_schema = 'public' AND table_name = 'fact_flights'
+                ORDER BY ordinal_position;
+                """
+            )
+            columns = dict(cur.fetchall())
+    if not columns:
+        raise RuntimeError("public.fact_flights belum ada: jalankan load penuh (main1.py) terlebih dahulu")
+    return columns
+
+def append_fact_batch(df, conn_func, columns, batch_id, source=None):
+    """
+    Menambahkan satu micro-batch (df hasil data_enrichment) ke fact_flights tanpa DROP/CREATE.
+    Tanggal baru ditambahkan ke dim_date, dan batch_id dicatat di etl_ingest_log dalam transaksi
+    yang sama sehingga batch yang sama tidak dimuat dua kali (misal setelah restart).
+    'columns' = hasil prepare_fact_append. Mengembalikan (jumlah baris, date_key unik);
+    (0, []) jika batch_id sudah pernah dimuat.
+    """
+    tables = build_star_schema(df)
+    fact = tables['fact_flights']['frame']
+    missing = [c for c in columns if c not in fact.columns]
+    if missing:
+        raise ValueError(f"Kolom fact_flights tidak ada di batch: {missing}")
+    fact = fact[list(columns)]
+    # Cuaca yang tidak match (NaN) membuat kolom integer menjadi float di batch ini ("3.0" ditolak COPY)
+    for c, pg_type in columns.items():
+        if pg_type in ("smallint", "integer", "bigint") and pd.api.types.is_float_dtype(fact[c]):
+            fact[c] = fact[c].astype("Int64")
+
+    with conn_func() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "INSERT INTO public.etl_ingest_log (batch_id, source, fact_rows) VALUES (%s, %s, %s) "
+                "ON CONFLICT (batch_id) DO NOTHING RETURNING batch_id;",
+                (batch_id, source, len(fact))
+            )
+            if cur.fetchone() is None:
+                return 0, []
+            if fact.empty:
+                return 0, []
+            dim_date = tables['dim_date']['frame']
+            arrays = ", ".join("%s::bigint[]" if pd.api.types.is_integer_dtype(dim_date[c]) else "%s::text[]"
+                               for c in dim_date.columns)
+            cur.execute(
+                f'INSERT INTO public.dim_date ({", ".join(dim_date.columns)}) SELECT * FROM unnest({arrays}) '
+                "ON CONFLICT (date_key) DO NOTHING;",
+                [dim_date[c].tolist() for c in dim_date.columns]
+            )
+            n = _copy_frame(cur, fact, 'fact_flights')
+    return n, [int(d) for d in fact['date_key'].unique()]
+
+def _apply_advised_indexes(conn_func):
+    # Import di sini: index_advisor -> analytics_runner -> load_warehouse (circular import)
+    import index_advisor
+    index_advisor.apply_advised_indexes(conn_func)
+
+def finalize_load(tables, conn_func):
+    """Buat ulang index hasil advisor, refresh rollup untuk tanggal yang dimuat lalu catat versi load"""
+    # ---------------------------------------------------------
+    # 4. Refresh Rollup Tables (untuk query analitik / dashboard)
+    # ---------------------------------------------------------
+    print("\n[3/3] Refreshing Rollup Tables...")
+    fact_flights = tables['fact_flights']['frame']
+    with instrumentation.step("apply_advised_indexes"):
+        _apply_advised_indexes(conn_func)
+    with instrumentation.step("refresh_rollups"):
+        if 'date_key' in fact_flights.columns:
+            rollup_warehouse.refresh_rollups(conn_func, fact_flights['date_key'].unique(), replace=True)
+        else:
+            print("   ⚠️ Skip Rollup: 'date_key' not found.")
+
+    with instrumentation.step("record_load_version"):
+        record_load_version(conn_func, len(fact_flights))
+
+def _load_star_schema(df, conn_func, type_overrides=None):
+    """Membangun dan memuat tabel dimensi, fakta, dan rollup memakai 'conn_func'."""
+    print("\n==========================================")
+    print("   STARTING STAR SCHEMA LOAD (COPY MODE)  ")
+    print("==========================================\n")
+
+    with instrumentation.step("build_star_schema", df) as s:
+        tables = build_star_schema(df)
+        s["outputs"] = [spec['frame'] for spec in tables.values()]
+
+    load_dimension_tables(tables, conn_func, type_overrides)
+    load_fact_table(tables, conn_func, type_overrides)
+    finalize_load(tables, conn_func)
+
+# ---------------------------------------------------------
+# MODE OUT-OF-CORE: load star schema per partisi
+# ---------------------------------------------------------
+def load_star_schema_partitions(partitions, type_overrides=None, single_transaction=False):
+    """
+    Versi streaming load_star_schema_to_dw untuk mode out-of-core. 'partitions' adalah
+    callable yang setiap dipanggil mengembalikan iterator DataFrame df_final per partisi.
+    Partisi dibaca dua kali: pass 1 mengumpulkan dimensi (kecil) dan ringkasan tipe kolom
+    fakta, pass 2 COPY fakta per partisi; hanya satu partisi yang ada di memori.
+    """
+    with LoadSession(single_transaction=single_transaction) as session:
+        _load_star_schema_partitions(partitions, session.connection, type_overrides)
 
     print("\n==========================================")
     print("       WAREHOUSE LOAD COMPLETED           ")
-    print("==========================================\n")
\ No newline at end of file
+    print("==========================================\n")
+
+def _load_star_schema_partitions(partitions, conn_func, type_overrides=None):
+    print("\n==========================================")
+    print("  STARTING STAR SCHEMA LOAD (PARTITIONS)  ")
+    print("==========================================\n")
+
+    # Pass 1: dimensi digabung antar partisi (baris pertama per key dipertahankan, sama
+    # seperti drop_duplicates pada df utuh) + ringkasan tipe kolom fakta
+    dims, fact_stats, fact_spec, date_keys = {}, {}, None, set()
+    fact_rows, n_parts = 0, 0
+    with instrumentation.step("scan_partitions") as s:
+        for df in partitions():
+            tables = build_star_schema(df)
+            for table_name, spec in tables.items():
+                frame = spec['frame']
+                if table_name == 'fact_flights':
+                    if fact_spec is None:
+                        fact_spec = {**spec, 'columns': list(frame.columns)}
+                    for c in fact_spec['columns']:
+                        fact_stats[c] = _merge_type_stats(fact_stats.get(c), _type_stats(frame[c]))
+                    if 'date_key' in frame.columns:
+                        date_keys.update(int(d) for d in frame['date_key'].unique())
+                    fact_rows += len(frame)
+                    continue
+                if table_name in dims:
+                    frame = pd.concat([dims[table_name]['frame'], frame], ignore_index=True)
+                dims[table_name] = {**spec, 'frame': frame.drop_duplicates(subset=spec['primary_key_cols'])}
+            n_parts += 1
+        # Kalender dim_date per partisi bisa berlubang di antara partisi; dibangun ulang dari rentang total
+        if 'dim_date' in dims and date_keys:
+            dims['dim_date']['frame'] = datetime_keys.dim_date(min(date_keys), max(date_keys))
+        for spec in dims.values():
+            spec['frame'] = spec['frame'].sort_values(spec['primary_key_cols']).reset_index(drop=True)
+        s["outputs"] = [spec['frame'] for spec in dims.values()]
+    print(f"   -> {n_parts} partisi dipindai: {fact_rows:,} baris fakta, {len(date_keys)} tanggal")
+
+    if fact_spec is None:
+        print("   ⚠️ Skip Load: tidak ada partisi.")
+        return
+
+    load_dimension_tables(dims, conn_func, type_overrides)
+
+    # Pass 2: tabel fakta dibuat dari tipe gabungan semua partisi, lalu COPY per partisi
+    print("\n[2/3] Creating Fact Table...")
+    print(f"   -> Loading table 'fact_flights' ({n_parts} partisi)...")
+    column_types = {
+        c: (type_overrides or {}).get(c) or _pg_type_from_stats(fact_stats[c]) for c in fact_spec['columns']
+    }
+    n = 0
+    with instrumentation.step("load_table", table='fact_flights'):
+        with conn_func() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SET search_path TO public;")
+                _create_table(cur, 'fact_flights', column_types,
+                              fact_spec['primary_key_cols'], fact_spec['foreign_key_definitions'])
+                for df in partitions():
+                    fact = build_star_schema(df)['fact_flights']['frame']
+                    n += _copy_frame(cur, fact[fact_spec['columns']], 'fact_flights')
+    print(f"      ✅ Loaded {n:,} rows into public.fact_flights")
+    reset_ingest_log(conn_func)
+
+    # ---------------------------------------------------------
+    # Refresh Rollup Tables (untuk query analitik / dashboard)
+    # ---------------------------------------------------------
+    print("\n[3/3] Refreshing Rollup Tables...")
+    with instrumentation.step("apply_advised_indexes"):
+        _apply_advised_indexes(conn_func)
+    with instrumentation.step("refresh_rollups"):
+        if date_keys:
+            rollup_warehouse.refresh_rollups(conn_func, date_keys, replace=True)
+        else:
+            print("   ⚠️ Skip Rollup: 'date_key' not found.")
+
+    with instrumentation.step("record_load_version"):
+        record_load_version(conn_func, n)
@@ -1,79 +1,348 @@
+import argparse
+import os
+
 import pandas as pd
+import instrumentation  # Modul untuk Instrumentasi per Fase (JSON + Prometheus)
 import extraction_source1  # Modul untuk Flight.csv
-import extraction_source2  # Modul untuk Weather.csv
+import extraction_source2  # Modul untuk Weather.csv / Open-Meteo API
 import transformation   # Modul untuk Transformasi Data
 import data_validation  # Modul untuk Validasi Data
 import load_warehouse   # [BARU] Modul untuk Koneksi Database
+import export_columnar  # Modul untuk Export Star Schema ke Parquet
+import out_of_core      # Mode Out-of-Core (partisi Arrow IPC di disk)
+import phase_scheduler  # Scheduler fase berbasis dependency graph
+import city_locations   # Kamus kota -> location_id Weather.csv (top N kota)
+import column_plan      # Rencana kebutuhan kolom (projection pushdown)
+import index_advisor    # Index & BRIN advisor berbasis workload query analitik
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Big Data ETL Pipeline (Flight + Weather)")
+    parser.add_argument("--quiet", action="store_true", help="Tanpa preview DataFrame (head/info)")
+    parser.add_argument("--report", default=os.getenv("ETL_REPORT", "etl_run_report.json"),
+                        help="File laporan run (JSON)")
+    parser.add_argument("--metrics", default=os.getenv("ETL_METRICS", "etl_metrics.prom"),
+                        help="File metrik format teks Prometheus")
+    parser.add_argument("--top-n", type=int, default=city_locations.TOP_N,
+                        help="Jumlah kota teratas (origin & destination) yang diproses")
+    parser.add_argument("--city-locations", default=city_locations.LOCATIONS_FILE,
+                        help="CSV kamus kota -> location_id (city, location_id, latitude, longitude)")
+    parser.add_argument("--weather-source", choices=extraction_source2.WEATHER_SOURCES,
+                        default=extraction_source2.WEATHER_SOURCE,
+                        help="Sumber data cuaca: snapshot Weather.csv atau Open-Meteo API (dengan cache lokal)")
+    parser.add_argument("--workers", type=int, default=phase_scheduler.MAX_WORKERS,
+                        help="Jumlah thread untuk fase yang independen (1 = berurutan seperti sebelumnya)")
+    parser.add_argument("--out-of-core", action="store_true",
+                        help="Proses per partisi di disk (memori konstan, untuk backfill multi-tahun)")
+    parser.add_argument("--partition-rows", type=int, default=out_of_core.PARTITION_ROWS,
+                        help="Jumlah baris per partisi pada mode out-of-core")
+    parser.add_argument("--work-dir", default=out_of_core.WORK_DIR,
+                        help="Folder partisi Arrow IPC pada mode out-of-core")
+    parser.add_argument("--advise-indexes", action="store_true",
+                        help="Setelah load: benchmark kandidat index untuk query analitik, simpan yang menguntungkan")
+    parser.add_argument("--no-plots", action="store_true",
+                        default=os.getenv("ETL_PLOTS", "1").lower() in ("0", "false", "no"),
+                        help="Lewati plot distribusi [6/6] (matplotlib/seaborn tidak diimport)")
+    parser.add_argument("--verbose", action="store_true",
+                        help="Mode out-of-core: tampilkan log transformasi setiap partisi")
+    args = parser.parse_args(argv)
+    if args.quiet:
+        instrumentation.set_quiet(True)
+    city_locations.configure(top_n=args.top_n, path=args.city_locations)
+    extraction_source2.configure(source=args.weather_source)
+    instrumentation.start_run("etl")
+    column_plan.reset()
+
+    if args.out_of_core:
+        run_out_of_core(args)
+        return
 
-def main():
     print("==========================================")
     print("      STARTING BIG DATA ETL PIPELINE      ")
     print("==========================================\n")
-    
+
+    # Fase dijalankan sesuai dependensi (lihat build_phase_graph): ekstraksi Flight & Weather
+    # paralel, index cuaca dibangun selagi Flight di-filter/clean, dan tabel dimensi dimuat
+    # selagi data akhir divalidasi. Fact table & export tetap menunggu validasi selesai.
+    scheduler = phase_scheduler.PhaseScheduler(max_workers=args.workers)
+    build_phase_graph(scheduler, advise_indexes=args.advise_indexes, plots=not args.no_plots)
+    try:
+        results = scheduler.run()
+    except PhaseFailed as e:
+        print(f"[FAILED] {e}")
+        return
+    finally:
+        rollback_unfinished_load(scheduler)
+    df_final = results["enrichment"]
+
+
     # ---------------------------------------------------------
-    # TAHAP 1: EXTRACTION
+    # FINAL OUTPUT
     # ---------------------------------------------------------
-    print(">>> PHASE 1: EXTRACTION")
+    print("\n==========================================")
+    print("           PIPELINE COMPLETED             ")
+    print("==========================================")
     
-    # 1. Extraction Source 1 (Flight Data)
+    if not instrumentation.QUIET:
+        print("\n--- Final Data Preview (5 Baris Teratas) ---")
+        pd.set_option('display.max_columns', None)
+        print(df_final.head())
+
+        print("\n--- Info Dataset Akhir ---")
+        print(df_final.info())
+
+    # ---------------------------------------------------------
+    # JADWAL FASE & LAPORAN INSTRUMENTASI (JSON + Prometheus)
+    # ---------------------------------------------------------
+    print("\n--- Jadwal Fase & Critical Path ---")
+    instrumentation.add_section("schedule", scheduler.print_report())
+
+    print("\n--- Kolom yang Tidak Dibawa (Projection Pushdown) ---")
+    instrumentation.add_section("column_plan", column_plan.print_report())
+
+    print("\n--- Ringkasan Waktu & Memori per Fase ---")
+    report = instrumentation.write_report(args.report, args.metrics)
+    instrumentation.print_summary(report)
+
+
+class PhaseFailed(RuntimeError):
+    """Fase gagal secara terkontrol (misal sumber data tidak bisa dimuat)"""
+
+
+# pandas >= 3 selalu copy-on-write: shallow copy aman diubah tanpa menyentuh DataFrame asal.
+# Versi lama tanpa CoW memakai deep copy karena fase lain membaca DataFrame yang sama bersamaan.
+COPY_ON_WRITE = int(pd.__version__.split(".")[0]) >= 3 or pd.get_option("mode.copy_on_write") is True
+
+
+def _private_copy(df):
+    return df.copy(deep=not COPY_ON_WRITE)
+
+
+# ---------------------------------------------------------
+# FASE PIPELINE (task untuk phase_scheduler, hasil dependensi = argumen)
+# ---------------------------------------------------------
+def extract_flight():
+    print(">>> PHASE 1: EXTRACTION (Flight)")
     flight_df = extraction_source1.extract_etl_source1()
-    if flight_df is not None:
-        print("[SUCCESS] Data Flight berhasil dimuat.")
-    else:
-        print("[FAILED] Gagal memuat Data Flight.")
-        return
+    if flight_df is None:
+        raise PhaseFailed("Gagal memuat Data Flight.")
+    print("[SUCCESS] Data Flight berhasil dimuat.")
+    return flight_df
 
-    # 2. Extraction Source 2 (Weather Data)
+
+def extract_weather():
+    print(">>> PHASE 1: EXTRACTION (Weather)")
     weather_df = extraction_source2.extract_etl_source2()
-    if weather_df is not None:
-        print("[SUCCESS] Data Weather berhasil dimuat.")
-    else:
-        print("[FAILED] Gagal memuat Data Weather.")
-        return
+    if weather_df is None:
+        raise PhaseFailed("Gagal memuat Data Weather.")
+    print("[SUCCESS] Data Weather berhasil dimuat.")
+    return weather_df
 
 
-    # ---------------------------------------------------------
-    # TAHAP 2: TRANSFORMATION (CLEANING & FILTERING)
-    # ---------------------------------------------------------
+def filter_flights(flight_df):
+    # Filter Top N Cities; clean & cek duplikat/outlier menyusul sebagai task terpisah
     print("\n>>> PHASE 2: TRANSFORMATION")
-    
-    # 1. Filter Flight Data (Top 10 Cities)
-    flight_df_filtered = transformation.filter_data(flight_df)
-    
-    # 2. Clean Flight Data (Nulls & Inconsistencies)
-    flight_df_cleaned = transformation.clean_data(flight_df_filtered)
-    
-    # 3. Check Duplicates & Outliers (Flight & Weather)
-    transformation.check_duplicate_outliers(flight_df_cleaned, weather_df)
+    return transformation.filter_data(flight_df)
+
+
+def build_weather_index(weather_df):
+    """
+    Standarisasi datetime Weather + tabel lookup merge. Kolom baru ditambahkan ke shallow
+    copy agar cek duplikat yang membaca weather_df mentah tidak ikut berubah.
+    """
+    print("\n>>> PHASE 3: STANDARDIZATION (Weather)")
+    weather_df_std = transformation.standarisasi_weather(weather_df.copy(deep=False))
+    return weather_df_std, transformation.build_weather_lookup(weather_df_std)
+
+
+def standardize_flight(flight_df_cleaned, weather_index):
+    # Lowercase kolom, Encoding Kota/Airline, Format Tanggal (df Flight bersih tetap utuh)
+    print("\n>>> PHASE 3: STANDARDIZATION (Flight)")
+    flight_df_std, _ = transformation.standarisasi(_private_copy(flight_df_cleaned), weather_index[0])
+    return flight_df_std
+
+
+def merge_datasets(flight_df_std, weather_index):
+    print("\n>>> PHASE 4: MERGING DATASETS")
+    weather_df_std, weather_lookup = weather_index
+    df_merged = transformation.merge_data(flight_df_std, weather_df_std, weather_lookup)
+    print(f"Hasil Merge: {df_merged.shape[0]} baris, {df_merged.shape[1]} kolom")
+    return df_merged
+
+
+def enrich(df_merged):
+    # Menambah kolom baru (selisih suhu, tekanan, dll)
+    print("\n>>> PHASE 5: FEATURE ENGINEERING")
+    return transformation.data_enrichment(df_merged)
+
+
+def validate(flight_df_cleaned, df_final, weather_index):
+    # Menggunakan 'df_final' agar kolom hasil enrichment ikut tervalidasi.
+    # Pengecekan [1/6]-[5/6] menjadi gerbang load fact & export; plot [6/6] berjalan terpisah.
+    print("\n>>> PHASE 6: DATA VALIDATION")
+    data_validation.validate_data(flight_df_cleaned, df_final, weather_index[0], plot=False)
+
+
+def plot_distributions(df_final):
+    data_validation.plot_distributions(df_final)
+
+
+def build_star_tables(df_final):
+    print("\n>>> PHASE 7: LOAD TO DATA WAREHOUSE")
+    print("\n==========================================")
+    print("   STARTING STAR SCHEMA LOAD (COPY MODE)  ")
+    print("==========================================\n")
+    return load_warehouse.build_star_schema(df_final)
+
+
+def load_dimensions(tables):
+    # Dimensi hanya butuh key, jadi dimuat bersamaan dengan validasi. Satu transaksi untuk
+    # dimensi -> fact -> rollup: jika validasi/load fact gagal, dimensi lama tidak ikut terganti
+    session = load_warehouse.LoadSession(single_transaction=True)
+    load_warehouse.load_dimension_tables(tables, session.connection)
+    return session
+
 
+def load_fact(tables, session, _validated):
+    load_warehouse.load_fact_table(tables, session.connection)
+
+
+def finalize_load(tables, session, _fact_loaded):
+    with session:
+        load_warehouse.finalize_load(tables, session.connection)
+    print("\n==========================================")
+    print("       WAREHOUSE LOAD COMPLETED           ")
+    print("==========================================\n")
+
+
+def rollback_unfinished_load(scheduler):
+    # Load belum selesai (fase gagal): transaksi load di-rollback dan pool ditutup
+    session = scheduler.results.get("load_dimensions")
+    if session is not None and "finalize_load" not in scheduler.results:
+        session.close(commit=False)
+
+
+def advise_warehouse_indexes(_loaded=None):
+    # Post-load: index untuk query di warehouse/sql_analitycs, hanya yang terbukti mempercepat
+    print("\n>>> PHASE 9: INDEX ADVISOR")
+    with load_warehouse.LoadSession() as session:
+        report = index_advisor.advise(session.connection)
+    instrumentation.add_section("index_advice", report)
+
+
+def export_parquet(df_final, tables, _validated):
+    # Dimensi + fact (partisi year/month) untuk Power BI & notebook, hanya partisi yang berubah
+    print("\n>>> PHASE 8: EXPORT COLUMNAR (PARQUET)")
+    export_columnar.export_star_schema(df_final, tables=tables)
+
+
+def build_phase_graph(scheduler, advise_indexes=False, plots=True, load=True):
+    """
+    Mendaftarkan fase ETL ke scheduler; urutan add() = urutan sekuensial (--workers 1).
+    load=False: tanpa fase warehouse (benchmark tanpa PostgreSQL), export tetap berjalan.
+    """
+    scheduler.add("extract_flight", extract_flight)
+    scheduler.add("extract_weather", extract_weather)
+    # TAHAP 2: TRANSFORMATION (Filter Top N Cities, Nulls & Inconsistencies, Duplicates & Outliers)
+    scheduler.add("filter", filter_flights, deps=["extract_flight"])
+    scheduler.add("clean", transformation.clean_data, deps=["filter"])
+    scheduler.add("check_duplicate_outliers", transformation.check_duplicate_outliers,
+                  deps=["clean", "extract_weather"])
+    # TAHAP 3-5: STANDARDIZATION, MERGING, ENRICHMENT
+    scheduler.add("weather_index", build_weather_index, deps=["extract_weather"])
+    scheduler.add("standardization", standardize_flight, deps=["clean", "weather_index"])
+    scheduler.add("merging", merge_datasets, deps=["standardization", "weather_index"])
+    scheduler.add("enrichment", enrich, deps=["merging"])
+    # TAHAP 6: VALIDATION (plot matplotlib harus di thread utama)
+    scheduler.add("validation", validate, deps=["clean", "enrichment", "weather_index"])
+    if plots:
+        scheduler.add("distribution_plot", plot_distributions, deps=["enrichment"], main_thread=True)
+    # TAHAP 7-8: LOAD & EXPORT
+    scheduler.add("build_star_schema", build_star_tables, deps=["enrichment"])
+    if load:
+        scheduler.add("load_dimensions", load_dimensions, deps=["build_star_schema"])
+        scheduler.add("load_fact", load_fact, deps=["build_star_schema", "load_dimensions", "validation"])
+        scheduler.add("finalize_load", finalize_load, deps=["build_star_schema", "load_dimensions", "load_fact"])
+    scheduler.add("export", export_parquet, deps=["enrichment", "build_star_schema", "validation"])
+    if advise_indexes and load:
+        scheduler.add("advise_indexes", advise_warehouse_indexes, deps=["finalize_load"])
+    return scheduler
+
+
+def run_out_of_core(args):
+    """
+    Pipeline yang sama dengan main() tetapi per partisi di disk (lihat out_of_core.py).
+    Yang tetap di memori hanya data cuaca + lookup merge dan kamus encoder.
+    """
+    paths = out_of_core.work_paths(args.work_dir)
+    os.makedirs(args.work_dir, exist_ok=True)
+
+    print("==========================================")
+    print("   STARTING BIG DATA ETL (OUT-OF-CORE)    ")
+    print("==========================================\n")
 
     # ---------------------------------------------------------
-    # TAHAP 3: STANDARDIZATION
+    # TAHAP 1: EXTRACTION (CSV -> partisi Arrow IPC)
     # ---------------------------------------------------------
-    print("\n>>> PHASE 3: STANDARDIZATION")
-    
-    # Standarisasi (Lowercase kolom, Encoding Kota/Airline, Format Tanggal)
-    flight_df_std, weather_df_std = transformation.standarisasi(flight_df_cleaned, weather_df)
+    print(">>> PHASE 1: EXTRACTION")
+
+    with instrumentation.step("extraction") as s:
+        flight_path = extraction_source1.ensure_etl_source1()
+        if flight_path is None:
+            print("[FAILED] Gagal memuat Data Flight.")
+            return
+        raw = out_of_core.convert_csv_to_partitions(flight_path, paths["raw"], args.partition_rows,
+                                                    top_n=args.top_n)
+        print("[SUCCESS] Data Flight berhasil dipartisi.")
+
+        weather_df = extraction_source2.extract_etl_source2()
+        if weather_df is not None:
+            print("[SUCCESS] Data Weather berhasil dimuat.")
+        else:
+            print("[FAILED] Gagal memuat Data Weather.")
+            return
+        s["outputs"] = weather_df
 
 
     # ---------------------------------------------------------
-    # TAHAP 4: MERGING
+    # TAHAP 2: TRANSFORMATION (FILTERING & CLEANING per partisi)
     # ---------------------------------------------------------
-    print("\n>>> PHASE 4: MERGING DATASETS")
-    
-    # Menggabungkan Flight dan Weather
-    df_merged = transformation.merge_data(flight_df_std, weather_df_std)
-    
-    print(f"Hasil Merge: {df_merged.shape[0]} baris, {df_merged.shape[1]} kolom")
+    print("\n>>> PHASE 2: TRANSFORMATION")
+
+    with instrumentation.step("transformation"):
+        origin_cities, dest_cities = raw["top_cities"]
+        print(f"Top {len(origin_cities)} Origin Cities: {origin_cities}")
+        print(f"Top {len(dest_cities)} Destination Cities: {dest_cities}")
+        cleaned = out_of_core.clean_partitions(paths["raw"], paths["clean"], raw["top_cities"], args.verbose)
+        print("   ⚠️ Skip Cek Duplikat & Outlier: membutuhkan seluruh data di memori.")
 
 
     # ---------------------------------------------------------
-    # TAHAP 5: DATA ENRICHMENT
+    # TAHAP 3-5: STANDARDIZATION, MERGING, ENRICHMENT (per partisi)
     # ---------------------------------------------------------
-    print("\n>>> PHASE 5: FEATURE ENGINEERING")
-    
-    # Menambah kolom baru (selisih suhu, tekanan, dll)
-    df_final = transformation.data_enrichment(df_merged)
+    print("\n>>> PHASE 3-5: STANDARDIZATION, MERGING & FEATURE ENGINEERING")
+
+    with instrumentation.step("standardization", weather_df) as s:
+        weather_df_std, weather_lookup = out_of_core.prepare_weather(weather_df)
+        s["outputs"] = weather_lookup
+
+    with instrumentation.step("merging"):
+        final = out_of_core.process_partitions(
+            paths["clean"], paths["final"], weather_df_std, weather_lookup,
+            cleaned["encoders"], args.verbose
+        )
+
+    out_of_core.write_manifest(args.work_dir, {
+        "source": os.path.abspath(flight_path),
+        "partition_rows": args.partition_rows,
+        "top_n": args.top_n,
+        "city_locations": os.path.abspath(args.city_locations),
+        "weather_source": args.weather_source,
+        "rows_raw": raw["rows"],
+        "rows_clean": cleaned["rows"],
+        "rows_final": final["rows"],
+        "top_cities": raw["top_cities"],
+        "encoders": cleaned["encoders"],
+    })
 
 
     # ---------------------------------------------------------
@@ -81,34 +350,40 @@ def main():
     # ---------------------------------------------------------
     print("\n>>> PHASE 6: DATA VALIDATION")
 
-    # Menggunakan 'df_final' agar kolom hasil enrichment ikut tervalidasi.
-    data_validation.validate_data(flight_df_cleaned, df_final, weather_df_std)
+    with instrumentation.step("validation"):
+        data_validation.validate_partitions(
+            out_of_core.iter_partitions(paths["final"]), cleaned["rows"], weather_df_std
+        )
 
 
     # ---------------------------------------------------------
-    # TAHAP 7: LOADING TO DATABASE
-    # ---------------------------------------------------------
-# ---------------------------------------------------------
     # TAHAP 7: LOAD TO WAREHOUSE
     # ---------------------------------------------------------
     print("\n>>> PHASE 7: LOAD TO DATA WAREHOUSE")
-    # Menggunakan fungsi baru dengan Star Schema & COPY command
-    load_warehouse.load_star_schema_to_dw(df_final)
+    with instrumentation.step("load"):
+        load_warehouse.load_star_schema_partitions(lambda: out_of_core.iter_partitions(paths["final"]))
+    if args.advise_indexes:
+        with instrumentation.step("advise_indexes"):
+            advise_warehouse_indexes()
 
 
     # ---------------------------------------------------------
-    # FINAL OUTPUT
+    # TAHAP 8: EXPORT COLUMNAR (PARQUET)
     # ---------------------------------------------------------
+    print("\n>>> PHASE 8: EXPORT COLUMNAR (PARQUET)")
+    print("   ⚠️ Skip Export: belum didukung pada mode out-of-core "
+          f"(hasil akhir tersedia sebagai partisi Arrow di {paths['final']}).")
+
     print("\n==========================================")
     print("           PIPELINE COMPLETED             ")
     print("==========================================")
-    
-    print("\n--- Final Data Preview (5 Baris Teratas) ---")
-    pd.set_option('display.max_columns', None)
-    print(df_final.head())
-    
-    print("\n--- Info Dataset Akhir ---")
-    print(df_final.info())
+
+    print("\n--- Kolom yang Tidak Dibawa (Projection Pushdown) ---")
+    instrumentation.add_section("column_plan", column_plan.print_report())
+
+    print("\n--- Ringkasan Waktu & Memori per Fase ---")
+    report = instrumentation.write_report(args.report, args.metrics)
+    instrumentation.print_summary(report)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,259 @@
+import contextlib
+import glob
+import json
+import os
+import shutil
+import time
+
+import pandas as pd
+
+import city_locations
+import column_plan
+import instrumentation
+import transformation
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+except ImportError as exc:
+    raise SystemExit(
+        "pyarrow is required for out-of-core mode. Install with: pip install pyarrow"
+    ) from exc
+
+# ---------------------------------------------------------
+# Mode out-of-core untuk backfill multi-tahun.
+# Flight.csv dikonversi (streaming) menjadi partisi Arrow IPC di disk yang dibaca lewat
+# memory map, lalu setiap partisi diproses satu per satu:
+#   raw/   -> filter top N kota + cleaning           -> clean/
+#   clean/ -> standarisasi + merge cuaca + enrichment -> final/
+# Yang tetap di memori hanya tabel cuaca (index merge) dan kamus encoder,
+# sehingga pemakaian memori sebesar satu partisi, bukan sebesar seluruh data.
+# ---------------------------------------------------------
+
+WORK_DIR = os.getenv("ETL_WORK_DIR", "etl_work")
+PARTITION_ROWS = int(os.getenv("ETL_PARTITION_ROWS", "500000"))
+# Reader CSV Arrow membaca ~35 blok ke depan, jadi blok kecil menjaga memori konversi tetap rendah
+READ_BLOCK_SIZE = 1024 * 1024
+TYPE_SAMPLE_ROWS = 10_000
+CITY_COLUMNS = ['ORIGIN_CITY', 'DEST_CITY']
+# Kolom label_encode di standarisasi(); kelasnya dikumpulkan dari seluruh partisi
+ENCODE_COLUMNS = ['AIRLINE', 'AIRLINE_CODE', 'ORIGIN', 'DEST']
+MANIFEST_FILE = "_manifest.json"
+
+
+# ---------------------------------------------------------
+# PARTISI ARROW IPC
+# ---------------------------------------------------------
+def partition_paths(directory):
+    """Path partisi di 'directory' (urut sesuai nomor partisi)"""
+    return sorted(glob.glob(os.path.join(directory, "part-*.arrow")))
+
+
+def read_partition(path, columns=None):
+    """Membaca satu partisi lewat memory map (hanya halaman yang dipakai yang dimuat OS)"""
+    source = pa.memory_map(path, "r")
+    table = pa.ipc.open_file(source).read_all()
+    if columns is not None:
+        table = table.select([c for c in columns if c in table.column_names])
+    return table.to_pandas()
+
+
+def iter_partitions(directory, columns=None):
+    """Generator DataFrame per partisi; hanya satu partisi yang ada di memori"""
+    for path in partition_paths(directory):
+        yield read_partition(path, columns)
+
+
+def write_partition(frame, path):
+    """Menulis DataFrame / Arrow Table ke file Arrow IPC (.tmp lalu di-rename)"""
+    table = frame if isinstance(frame, pa.Table) else pa.Table.from_pandas(frame, preserve_index=False)
+    tmp_path = path + ".tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+    return os.path.getsize(path)
+
+
+def _reset_dir(directory):
+    if os.path.isdir(directory):
+        shutil.rmtree(directory)
+    os.makedirs(directory)
+
+
+@contextlib.contextmanager
+def _partition_output(verbose):
+    """Log per partisi (print di fungsi transformation) dibuang kecuali verbose"""
+    if verbose:
+        yield
+        return
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+# ---------------------------------------------------------
+# 1. KONVERSI CSV -> PARTISI
+# ---------------------------------------------------------
+def _csv_column_types(path, delimiter):
+    """
+    Tipe kolom Arrow dari sampel pandas, agar partisi menghasilkan dtype yang sama dengan
+    pd.read_csv (misal FL_DATE tetap string, bukan date32 hasil inferensi Arrow).
+    """
+    sample = pd.read_csv(path, sep=delimiter, nrows=TYPE_SAMPLE_ROWS, usecols=column_plan.flight_usecols)
+    types = {}
+    for col, dtype in sample.dtypes.items():
+        if pd.api.types.is_bool_dtype(dtype):
+            types[col] = pa.bool_()
+        elif pd.api.types.is_integer_dtype(dtype):
+            types[col] = pa.int64()
+        elif pd.api.types.is_float_dtype(dtype):
+            types[col] = pa.float64()
+        else:
+            types[col] = pa.string()
+    return types
+
+
+@instrumentation.instrument()
+def convert_csv_to_partitions(path, out_dir, partition_rows=PARTITION_ROWS, delimiter=',', top_n=None):
+    """
+    Konversi CSV secara streaming (blok ~1 MB) menjadi partisi Arrow IPC berisi maksimal
+    'partition_rows' baris. Sekaligus menghitung frekuensi ORIGIN_CITY & DEST_CITY untuk
+    menentukan top N kota (lihat city_locations) tanpa membaca ulang data.
+    """
+    print(f"   -> Konversi {path} ke partisi Arrow IPC ({partition_rows:,} baris/partisi)...")
+    start_time = time.time()
+    _reset_dir(out_dir)
+
+    # Hanya kolom yang dibutuhkan di hilir (column_plan) yang di-parse & ditulis ke partisi
+    column_types = _csv_column_types(path, delimiter)
+    column_plan.estimate_unparsed(path, column_plan.FLIGHT_UNUSED, delimiter)
+    reader = pa_csv.open_csv(
+        path,
+        read_options=pa_csv.ReadOptions(block_size=READ_BLOCK_SIZE),
+        parse_options=pa_csv.ParseOptions(delimiter=delimiter),
+        convert_options=pa_csv.ConvertOptions(column_types=column_types, include_columns=list(column_types),
+                                              strings_can_be_null=True),
+    )
+
+    # Frekuensi kota disimpan dalam urutan kemunculan pertama (tie-break seperti value_counts)
+    city_counts = {col: {} for col in CITY_COLUMNS}
+    writer, sink, part_rows, n_parts, total_rows = None, None, 0, 0, 0
+
+    def close_part():
+        writer.close()
+        sink.close()
+        os.replace(sink_path + ".tmp", sink_path)
+
+    for batch in reader:
+        for col in CITY_COLUMNS:
+            counts = city_counts[col]
+            for item in pc.value_counts(batch.column(col)).to_pylist():
+                if item["values"] is not None:
+                    counts[item["values"]] = counts.get(item["values"], 0) + item["counts"]
+
+        offset = 0
+        while offset < batch.num_rows:
+            if writer is None:
+                sink_path = os.path.join(out_dir, f"part-{n_parts:05d}.arrow")
+                sink = pa.OSFile(sink_path + ".tmp", "wb")
+                writer = pa.ipc.new_file(sink, batch.schema)
+                n_parts += 1
+            take = min(partition_rows - part_rows, batch.num_rows - offset)
+            writer.write_batch(batch.slice(offset, take))
+            offset += take
+            part_rows += take
+            total_rows += take
+            if part_rows >= partition_rows:
+                close_part()
+                writer, part_rows = None, 0
+    if writer is not None:
+        close_part()
+
+    top_cities = tuple(
+        city_locations.select_top_cities(
+            pd.Series(city_counts[col], dtype="int64").sort_values(ascending=False, kind="stable"), top_n)
+        for col in CITY_COLUMNS
+    )
+    n_bytes = sum(os.path.getsize(p) for p in partition_paths(out_dir))
+    column_plan.record("extract_flight", None, column_plan.FLIGHT_UNUSED, rows=total_rows)
+    print(f"      ✅ {total_rows:,} baris -> {n_parts} partisi ({n_bytes / 1024 / 1024:.2f} MB) "
+          f"dalam {time.time() - start_time:.4f} seconds")
+    return {"rows": total_rows, "partitions": n_parts, "bytes": n_bytes, "top_cities": top_cities}
+
+
+# ---------------------------------------------------------
+# 2. FILTER + CLEANING PER PARTISI
+# ---------------------------------------------------------
+@instrumentation.instrument()
+def clean_partitions(raw_dir, out_dir, top_cities, verbose=False):
+    """
+    filter_data (top N kota global) + clean_data per partisi -> out_dir.
+    Mengembalikan jumlah baris hasil dan kamus encoder {kolom: kelas terurut} untuk
+    label_encode, dikumpulkan dari seluruh partisi.
+    """
+    _reset_dir(out_dir)
+    uniques = {col: set() for col in ENCODE_COLUMNS}
+    rows_in, rows_out = 0, 0
+
+    for i, path in enumerate(partition_paths(raw_dir)):
+        with instrumentation.step("partition"), _partition_output(verbose):
+            part = read_partition(path)
+            rows_in += len(part)
+            part = transformation.filter_data(part, top_cities)
+            part = transformation.clean_data(part)
+            if part.empty:
+                continue
+            for col in ENCODE_COLUMNS:
+                uniques[col].update(part[col].dropna().unique())
+            write_partition(part, os.path.join(out_dir, f"part-{i:05d}.arrow"))
+            rows_out += len(part)
+
+    # Urutan kelas sama dengan label_encode tanpa kamus (nilai unik terurut)
+    encoders = {col.lower(): sorted(values) for col, values in uniques.items()}
+    print(f"   -> Filtering & cleaning: {rows_in:,} -> {rows_out:,} baris")
+    return {"rows_in": rows_in, "rows": rows_out, "encoders": encoders}
+
+
+# ---------------------------------------------------------
+# 3. STANDARISASI + MERGE + ENRICHMENT PER PARTISI
+# ---------------------------------------------------------
+def prepare_weather(df2):
+    """Standarisasi datetime Weather.csv sekali + tabel lookup merge (tetap di memori)"""
+    transformation.standarisasi_weather(df2)
+    return df2, transformation.build_weather_lookup(df2)
+
+
+@instrumentation.instrument()
+def process_partitions(clean_dir, out_dir, weather_std, weather_lookup, encoders, verbose=False):
+    """standarisasi -> merge_data -> data_enrichment per partisi -> out_dir"""
+    _reset_dir(out_dir)
+    rows, n_bytes = 0, 0
+
+    for path in partition_paths(clean_dir):
+        with instrumentation.step("partition"), _partition_output(verbose):
+            part = read_partition(path)
+            part, _ = transformation.standarisasi(part, weather_std, encoders)
+            part = transformation.merge_data(part, weather_std, weather_lookup)
+            part = transformation.data_enrichment(part)
+            n_bytes += write_partition(part, os.path.join(out_dir, os.path.basename(path)))
+            rows += len(part)
+
+    print(f"   -> Standarisasi, merge & enrichment: {rows:,} baris "
+          f"({n_bytes / 1024 / 1024:.2f} MB di {out_dir})")
+    return {"rows": rows, "bytes": n_bytes}
+
+
+# ---------------------------------------------------------
+# ORKESTRASI
+# ---------------------------------------------------------
+def work_paths(work_dir=WORK_DIR):
+    return {name: os.path.join(work_dir, name) for name in ("raw", "clean", "final")}
+
+
+def write_manifest(work_dir, manifest):
+    path = os.path.join(work_dir, MANIFEST_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+
@@ -0,0 +1,198 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import instrumentation
+
+# ---------------------------------------------------------
+# Scheduler fase berbasis dependency graph (DAG) untuk main1.py.
+# Setiap task = fungsi + daftar dependensi; hasil dependensi diteruskan sebagai argumen
+# posisi (urut sesuai 'deps'). Task yang semua dependensinya selesai langsung dijalankan
+# di thread pool, sehingga pekerjaan independen (misal ekstraksi Flight & Weather)
+# berjalan bersamaan. Thread dipakai (bukan proses) karena antar task mengalir DataFrame
+# besar yang mahal di-pickle; parser CSV, operasi numpy/pandas dan COPY psycopg2 melepas
+# GIL di bagian beratnya. Task dengan main_thread=True (plot matplotlib) tetap di thread utama.
+# Setelah run tersedia timeline per task dan critical path (rantai dependensi terpanjang).
+# ---------------------------------------------------------
+
+MAX_WORKERS = int(os.getenv("ETL_MAX_WORKERS", "4"))
+
+
+class PhaseScheduler:
+    """
+    Pemakaian:
+        scheduler = PhaseScheduler(max_workers=4)
+        scheduler.add("extract_flight", extract_flight)
+        scheduler.add("filter", transformation.filter_data, deps=["extract_flight"])
+        results = scheduler.run()
+
+    Urutan add() harus topologis (dependensi didaftarkan lebih dulu); dengan
+    max_workers=1 task dijalankan berurutan sesuai urutan add() di thread utama.
+    """
+
+    def __init__(self, max_workers=MAX_WORKERS):
+        self.max_workers = max(1, int(max_workers))
+        self.tasks = {}
+        self.results = {}
+        self.timeline = {}
+        self.wall_seconds = None
+
+    def add(self, name, func, deps=(), main_thread=False):
+        if name in self.tasks:
+            raise ValueError(f"Task '{name}' sudah terdaftar")
+        missing = [d for d in deps if d not in self.tasks]
+        if missing:
+            raise ValueError(f"Task '{name}': dependensi belum terdaftar {missing}")
+        self.tasks[name] = {"func": func, "deps": list(deps), "main_thread": main_thread}
+
+    # ---------------------------------------------------------
+    # EKSEKUSI
+    # ---------------------------------------------------------
+    def _run_task(self, name, run_start):
+        task = self.tasks[name]
+        args = [self.results[d] for d in task["deps"]]
+        start = time.perf_counter()
+        status = "error"
+        try:
+            with instrumentation.step(name, args) as s:
+                result = task["func"](*args)
+                s["outputs"] = result
+            status = "ok"
+        finally:
+            end = time.perf_counter()
+            self.timeline[name] = {
+                "start": round(start - run_start, 4),
+                "end": round(end - run_start, 4),
+                "seconds": round(end - start, 4),
+                "thread": threading.current_thread().name,
+                "status": status,
+            }
+        self.results[name] = result
+        return result
+
+    def run(self):
+        """Menjalankan semua task; error pertama dilempar ulang setelah task yang berjalan selesai"""
+        run_start = time.perf_counter()
+        try:
+            if self.max_workers == 1:
+                for name in self.tasks:
+                    self._run_task(name, run_start)
+            else:
+                self._run_parallel(run_start)
+        finally:
+            self.wall_seconds = round(time.perf_counter() - run_start, 4)
+        return self.results
+
+    def _run_parallel(self, run_start):
+        # Task baru di-dispatch dari on_done (thread worker) dan dari thread utama setelah task
+        # main_thread selesai, selalu di bawah 'cond', sehingga worker tetap terisi selagi thread
+        # utama menjalankan plot. Condition memakai RLock: add_done_callback pada future yang sudah
+        # selesai memanggil on_done secara inline (dispatch bersarang) di thread yang sama.
+        cond = threading.Condition()
+        state = {"pending": list(self.tasks), "main_queue": [], "running": 0, "error": None}
+
+        def dispatch():
+            # Dipanggil dengan 'cond' terkunci. Semua task siap dikeluarkan dari pending dulu,
+            # baru di-submit: dispatch bersarang dari on_done inline tidak melihat task yang sama
+            while state["error"] is None:
+                ready = [n for n in state["pending"] if all(d in self.results for d in self.tasks[n]["deps"])]
+                if not ready:
+                    return
+                state["pending"] = [n for n in state["pending"] if n not in ready]
+                for name in ready:
+                    if self.tasks[name]["main_thread"]:
+                        state["main_queue"].append(name)
+                        continue
+                    state["running"] += 1
+                    future = pool.submit(self._run_task, name, run_start)
+                    future.add_done_callback(on_done)
+
+        def on_done(future):
+            with cond:
+                state["running"] -= 1
+                if future.exception() is not None and state["error"] is None:
+                    state["error"] = future.exception()
+                dispatch()
+                cond.notify_all()
+
+        with ThreadPoolExecutor(self.max_workers, thread_name_prefix="phase") as pool:
+            while True:
+                with cond:
+                    dispatch()  # awal run & setelah task main_thread selesai
+                    if state["error"] is not None or not (state["running"] or state["main_queue"]):
+                        break
+                    if not state["main_queue"]:
+                        cond.wait()  # dibangunkan on_done (task selesai / task main_thread siap)
+                        continue
+                    name = state["main_queue"].pop(0)
+                try:
+                    self._run_task(name, run_start)
+                except Exception as e:
+                    with cond:
+                        state["error"] = state["error"] or e
+
+        if state["error"] is not None:
+            skipped = [n for n in self.tasks if n not in self.timeline]
+            if skipped:
+                print(f"   ⚠️ Task dibatalkan karena error: {skipped}")
+            raise state["error"]
+
+    # ---------------------------------------------------------
+    # LAPORAN
+    # ---------------------------------------------------------
+    def critical_path(self):
+        """(daftar task, detik): rantai dependensi dengan total durasi terpanjang"""
+        finish, prev = {}, {}
+        for name, task in self.tasks.items():
+            if name not in self.timeline:
+                continue
+            best, best_dep = 0.0, None
+            for dep in task["deps"]:
+                if finish.get(dep, -1.0) > best:
+                    best, best_dep = finish[dep], dep
+            finish[name] = best + self.timeline[name]["seconds"]
+            prev[name] = best_dep
+        if not finish:
+            return [], 0.0
+
+        name = max(finish, key=finish.get)
+        total = finish[name]
+        path = []
+        while name is not None:
+            path.append(name)
+            name = prev[name]
+        return path[::-1], round(total, 4)
+
+    def report(self):
+        """Dict laporan jadwal (untuk instrumentation.add_section / JSON)"""
+        path, path_seconds = self.critical_path()
+        serial = round(sum(t["seconds"] for t in self.timeline.values()), 4)
+        return {
+            "max_workers": self.max_workers,
+            "wall_seconds": self.wall_seconds,
+            "serial_seconds": serial,
+            "critical_path": path,
+            "critical_path_seconds": path_seconds,
+            "tasks": [
+                {"task": name, "deps": self.tasks[name]["deps"], **self.timeline[name]}
+                for name in sorted(self.timeline, key=lambda n: self.timeline[n]["start"])
+            ],
+        }
+
+    def print_report(self):
+        report = self.report()
+        on_path = set(report["critical_path"])
+        print(f"\n{'task':<28}{'start':>9}{'end':>9}{'seconds':>10}  {'thread':<14}")
+        for t in report["tasks"]:
+            flag = " *" if t["task"] in on_path else ""
+            status = "" if t["status"] == "ok" else "  ❌"
+            print(f"{t['task']:<28}{t['start']:>9.3f}{t['end']:>9.3f}{t['seconds']:>10.3f}  "
+                  f"{t['thread']:<14}{flag}{status}")
+        print(f"\nCritical path (*): {' -> '.join(report['critical_path'])} "
+              f"= {report['critical_path_seconds']:.3f} s")
+        if report["wall_seconds"]:
+            print(f"Wall time: {report['wall_seconds']:.3f} s | total waktu task (sekuensial): "
+                  f"{report['serial_seconds']:.3f} s | speedup ~{report['serial_seconds'] / report['wall_seconds']:.2f}x "
+                  f"({report['max_workers']} worker)")
+        return report
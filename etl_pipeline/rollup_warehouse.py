@@ -0,0 +1,127 @@
+import time
+
+# Nama tabel rollup (summary) yang dibaca oleh query di warehouse/sql_analitycs
+ROLLUP_TABLE = "agg_flights_weather"
+
+# ---------------------------------------------------------
+# Definisi bucket cuaca (harus sama persis dengan CASE di query 1.sql - 8.sql)
+# ---------------------------------------------------------
+# origin_precip_band : 0 = 0 mm, 1 = (0 - 0.1) mm, 2 = 0.1 - 5 mm, 3 = > 5 mm
+# origin_temp_band   : 0 = < 0°C, 1 = 0 - 30°C, 2 = > 30°C
+# dest_cloud_band    : 0 = < 25%, 1 = 25 - 75%, 2 = > 75%
+# Nilai NULL dipertahankan agar hasil GROUP BY sama dengan query di fact_flights.
+ROLLUP_DDL = f"""
+CREATE TABLE IF NOT EXISTS public."{ROLLUP_TABLE}" (
+    date_key BIGINT NOT NULL,
+    airline_key BIGINT,
+    origin_city_key BIGINT,
+    dest_city_key BIGINT,
+    origin_weather_code_wmo_code BIGINT,
+    origin_precip_band SMALLINT,
+    origin_temp_band SMALLINT,
+    dest_cloud_band SMALLINT,
+    is_storm BOOLEAN NOT NULL,
+    is_clear BOOLEAN NOT NULL,
+    is_snow BOOLEAN NOT NULL,
+    n_flights BIGINT NOT NULL,
+    n_on_time BIGINT NOT NULL,
+    dep_delay_sum BIGINT,
+    dep_delay_cnt BIGINT NOT NULL,
+    arr_delay_sum BIGINT,
+    arr_delay_cnt BIGINT NOT NULL,
+    taxi_out_sum BIGINT,
+    taxi_out_cnt BIGINT NOT NULL,
+    cancelled_sum BIGINT,
+    cancelled_cnt BIGINT NOT NULL,
+    delay_due_weather_sum BIGINT,
+    delay_due_weather_cnt BIGINT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS "{ROLLUP_TABLE}_date_key_idx" ON public."{ROLLUP_TABLE}" (date_key);
+"""
+
+ROLLUP_INSERT = f"""
+INSERT INTO public."{ROLLUP_TABLE}"
+SELECT
+    ff.date_key,
+    ff.airline_key,
+    ff.origin_city_key,
+    ff.dest_city_key,
+    ff.origin_weather_code_wmo_code,
+    CASE
+        WHEN ff.origin_precipitation_mm = 0 THEN 0
+        WHEN ff.origin_precipitation_mm > 0 AND ff.origin_precipitation_mm < 0.1 THEN 1
+        WHEN ff.origin_precipitation_mm BETWEEN 0.1 AND 5 THEN 2
+        WHEN ff.origin_precipitation_mm > 5 THEN 3
+    END AS origin_precip_band,
+    CASE
+        WHEN ff.origin_temperature_2m_c < 0 THEN 0
+        WHEN ff.origin_temperature_2m_c BETWEEN 0 AND 30 THEN 1
+        WHEN ff.origin_temperature_2m_c > 30 THEN 2
+    END AS origin_temp_band,
+    CASE
+        WHEN ff.dest_cloud_cover_percent < 25 THEN 0
+        WHEN ff.dest_cloud_cover_percent BETWEEN 25 AND 75 THEN 1
+        WHEN ff.dest_cloud_cover_percent > 75 THEN 2
+    END AS dest_cloud_band,
+    COALESCE(ff.origin_precipitation_mm > 3 OR ff.origin_wind_speed_10m_kmh > 35, FALSE) AS is_storm,
+    COALESCE(ff.origin_precipitation_mm = 0
+             AND ff.origin_wind_speed_10m_kmh < 10
+             AND ff.origin_cloud_cover_percent < 20
+             AND ff.origin_snowfall_cm = 0, FALSE) AS is_clear,
+    COALESCE(ff.origin_snowfall_cm > 0, FALSE) AS is_snow,
+    COUNT(*) AS n_flights,
+    SUM(CASE WHEN ff.dep_delay <= 0 THEN 1 ELSE 0 END) AS n_on_time,
+    SUM(ff.dep_delay) AS dep_delay_sum,
+    COUNT(ff.dep_delay) AS dep_delay_cnt,
+    SUM(ff.arr_delay) AS arr_delay_sum,
+    COUNT(ff.arr_delay) AS arr_delay_cnt,
+    SUM(ff.taxi_out) AS taxi_out_sum,
+    COUNT(ff.taxi_out) AS taxi_out_cnt,
+    SUM(ff.cancelled) AS cancelled_sum,
+    COUNT(ff.cancelled) AS cancelled_cnt,
+    SUM(ff.delay_due_weather) AS delay_due_weather_sum,
+    COUNT(ff.delay_due_weather) AS delay_due_weather_cnt
+FROM public.fact_flights ff
+WHERE ff.date_key = ANY(%s)
+GROUP BY 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11;
+"""
+
+
+def refresh_rollups(conn_func, date_keys, replace=False):
+    """
+    Refresh tabel rollup secara inkremental, hanya untuk tanggal yang terdampak.
+    replace=True (fact_flights baru di-replace penuh): semua baris rollup lama dihapus,
+    karena dim_date berisi seluruh kalender sehingga tanggal yang tidak lagi punya
+    penerbangan tidak bisa dikenali lewat dim_date.
+    'conn_func' adalah context manager koneksi yang menangani commit
+    (lihat load_warehouse.LoadSession.connection).
+    """
+    date_keys = sorted({int(d) for d in date_keys})
+    print(f"   -> Refreshing rollup '{ROLLUP_TABLE}' untuk {len(date_keys)} tanggal...")
+    start_time = time.time()
+
+    with conn_func() as conn:
+        with conn.cursor() as cur:
+            cur.execute(ROLLUP_DDL)
+
+            # 1. Hapus baris lama: semua (fact di-replace) atau tanggal terdampak + tanggal di luar dim_date
+            if replace:
+                cur.execute(f'DELETE FROM public."{ROLLUP_TABLE}";')
+            else:
+                cur.execute(
+                    f'''
+                    DELETE FROM public."{ROLLUP_TABLE}" r
+                    WHERE r.date_key = ANY(%s)
+                       OR NOT EXISTS (SELECT 1 FROM public.dim_date d WHERE d.date_key = r.date_key);
+                    ''',
+                    (date_keys,)
+                )
+            deleted = cur.rowcount
+
+            # 2. Agregasi ulang dari fact_flights hanya untuk tanggal terdampak
+            cur.execute(ROLLUP_INSERT, (date_keys,))
+            inserted = cur.rowcount
+            cur.execute(f'ANALYZE public."{ROLLUP_TABLE}";')
+
+    print(f"      ✅ Rollup refreshed: {deleted:,} baris dihapus, {inserted:,} baris ditulis "
+          f"({time.time() - start_time:.4f} seconds)")
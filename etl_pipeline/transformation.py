@@ -1,32 +1,43 @@
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import LabelEncoder
-from sklearn.preprocessing import OrdinalEncoder
 
-def filter_data(df1):
+import city_locations
+import column_plan
+import datetime_keys
+import instrumentation
+
+@instrumentation.instrument()
+def filter_data(df1, top_cities=None, top_n=None):
     """
     Melakukan filtering untuk mengambil data penerbangan dari dan ke
-    Top 10 kota (Origin & Destination).
+    Top N kota (Origin & Destination), default 10 (city_locations.TOP_N).
+    Hanya kota yang terdaftar di kamus lokasi (punya location_id cuaca) yang dihitung.
+    'top_cities' = (origin_list, dest_list) yang sudah dihitung dari seluruh data
+    (mode out-of-core: partisi tidak menghitung ulang top N sendiri).
     """
     print("\n--- Memulai Proses Filtering ---")
     initial_rows = len(df1)
     
-    # Mendapatkan Top 10 Kota Asal
-    top_10_origin_cities = df1['ORIGIN_CITY'].value_counts().head(10).index.tolist()
-    print(f"Top 10 Origin Cities: {top_10_origin_cities}")
-    
-    # Mendapatkan Top 10 Kota Tujuan
-    top_10_dest_cities = df1['DEST_CITY'].value_counts().head(10).index.tolist()
-    print(f"Top 10 Destination Cities: {top_10_dest_cities}")
+    if top_cities is not None:
+        top_origin_cities, top_dest_cities = (list(c) for c in top_cities)
+    else:
+        # Mendapatkan Top N Kota Asal & Tujuan
+        top_origin_cities = city_locations.select_top_cities(df1['ORIGIN_CITY'].value_counts(), top_n)
+        top_dest_cities = city_locations.select_top_cities(df1['DEST_CITY'].value_counts(), top_n)
+    print(f"Top {len(top_origin_cities)} Origin Cities: {top_origin_cities}")
+    print(f"Top {len(top_dest_cities)} Destination Cities: {top_dest_cities}")
     
     # Filter dataset
-    df1_filtered = df1[df1['ORIGIN_CITY'].isin(top_10_origin_cities) & 
-                     df1['DEST_CITY'].isin(top_10_dest_cities)]
+    df1_filtered = df1[df1['ORIGIN_CITY'].isin(top_origin_cities) & 
+                     df1['DEST_CITY'].isin(top_dest_cities)]
+
+    column_plan.record("filter", df1_filtered, column_plan.FLIGHT_UNUSED)
 
-    print(f"\nData setelah filtering top 10 kota. Baris awal: {initial_rows}, Baris akhir: {len(df1_filtered)}\n\n")
+    print(f"\nData setelah filtering top {max(len(top_origin_cities), len(top_dest_cities))} kota. Baris awal: {initial_rows}, Baris akhir: {len(df1_filtered)}\n\n")
     return df1_filtered
 
 
+@instrumentation.instrument()
 def clean_data(df1_filtered):
     """
     Melakukan transformasi dan pembersihan data (imputasi null, drop kolom, handling inkonsistensi)
@@ -35,241 +46,268 @@ def clean_data(df1_filtered):
     print("--- Memulai Proses Data Cleaning ---")
     
     # 1. Hapus Kolom Tidak Perlu 
-    print("\n===== Drop Kolom yang Tidak Diperlukan =====")
-    if 'AIRLINE_DOT' in df1_filtered.columns:
-        df1_filtered = df1_filtered.drop('AIRLINE_DOT', axis=1)
-        print("\nColumn 'AIRLINE_DOT' has been dropped.\n\n")
-    else:
-        print("\nColumn 'AIRLINE_DOT' does not exist in the DataFrame.\n\n")
+    with instrumentation.step("drop_columns", df1_filtered) as s:
+        print("\n===== Drop Kolom yang Tidak Diperlukan =====")
+        if 'AIRLINE_DOT' in df1_filtered.columns:
+            df1_filtered = df1_filtered.drop('AIRLINE_DOT', axis=1)
+            print("\nColumn 'AIRLINE_DOT' has been dropped.\n\n")
+        else:
+            print("\nColumn 'AIRLINE_DOT' does not exist in the DataFrame.\n\n")
 
-    if 'CANCELLATION_CODE' in df1_filtered.columns:
-        df1_filtered = df1_filtered.drop('CANCELLATION_CODE', axis=1)
-        print("\nColumn 'CANCELLATION_CODE' has been dropped.\n\n")
-    else:
-        print("\nColumn 'CANCELLATION_CODE' does not exist in the DataFrame.\n\n")
+        if 'CANCELLATION_CODE' in df1_filtered.columns:
+            df1_filtered = df1_filtered.drop('CANCELLATION_CODE', axis=1)
+            print("\nColumn 'CANCELLATION_CODE' has been dropped.\n\n")
+        else:
+            print("\nColumn 'CANCELLATION_CODE' does not exist in the DataFrame.\n\n")
+        s["outputs"] = df1_filtered
 
 
 
     # 2. Imputasi Missing Value pada Kolom Delay
     # Mengisi NaN dengan 0 karena jika tidak ada info, diasumsikan tidak ada delay spesifik
-    print("\n===== Imputasi Missing Value pada Kolom Delay =====")
-    delay_columns = [
-        'DELAY_DUE_CARRIER',
-        'DELAY_DUE_WEATHER',
-        'DELAY_DUE_NAS',
-        'DELAY_DUE_SECURITY',
-        'DELAY_DUE_LATE_AIRCRAFT'
-    ]
-    for col in delay_columns:
-        if col in df1_filtered.columns:
-            df1_filtered[col] = df1_filtered[col].fillna(0)
-    print("\nImputasi kolom DELAY (Carrier, Weather, NAS, Security, Late Aircraft) selesai.\n\n")
+    with instrumentation.step("impute_delay"):
+        print("\n===== Imputasi Missing Value pada Kolom Delay =====")
+        delay_columns = [
+            'DELAY_DUE_CARRIER',
+            'DELAY_DUE_WEATHER',
+            'DELAY_DUE_NAS',
+            'DELAY_DUE_SECURITY',
+            'DELAY_DUE_LATE_AIRCRAFT'
+        ]
+        for col in delay_columns:
+            if col in df1_filtered.columns:
+                df1_filtered[col] = df1_filtered[col].fillna(0)
+        print("\nImputasi kolom DELAY (Carrier, Weather, NAS, Security, Late Aircraft) selesai.\n\n")
 
     # 3. Menghapus Baris Data yang Inkonsisten
     # Menghapus data yang statusnya TIDAK CANCELLED, tapi kolom waktunya kosong (NaN)
-    print("\n===== Hapus Baris Data yang Inkonsisten =====")
-    missing_time_columns = [
-        'DEP_TIME', 'DEP_DELAY', 'TAXI_OUT', 'WHEELS_OFF', 
-        'WHEELS_ON', 'TAXI_IN', 'ARR_TIME', 'ARR_DELAY', 
-        'AIR_TIME', 'ELAPSED_TIME'
-    ]
+    with instrumentation.step("drop_inconsistent", df1_filtered) as s:
+        print("\n===== Hapus Baris Data yang Inkonsisten =====")
+        missing_time_columns = [
+            'DEP_TIME', 'DEP_DELAY', 'TAXI_OUT', 'WHEELS_OFF', 
+            'WHEELS_ON', 'TAXI_IN', 'ARR_TIME', 'ARR_DELAY', 
+            'AIR_TIME', 'ELAPSED_TIME'
+        ]
     
-    # Cek kolom waktu yang ada di dataframe saat ini
-    valid_time_cols = [col for col in missing_time_columns if col in df1_filtered.columns]
+        # Cek kolom waktu yang ada di dataframe saat ini
+        valid_time_cols = [col for col in missing_time_columns if col in df1_filtered.columns]
     
-    rows_before = len(df1_filtered)
+        rows_before = len(df1_filtered)
     
-    # Ambil data yang tidak dibatalkan (CANCELLED == 0)
-    not_cancelled_flights = df1_filtered[df1_filtered['CANCELLED'] == 0]
+        # Ambil data yang tidak dibatalkan (CANCELLED == 0)
+        not_cancelled_flights = df1_filtered[df1_filtered['CANCELLED'] == 0]
     
-    # Cari baris yang tidak cancel tapi kolom waktunya ada yang null
-    inconsistent_indices = not_cancelled_flights[not_cancelled_flights[valid_time_cols].isnull().any(axis=1)].index
+        # Cari baris yang tidak cancel tapi kolom waktunya ada yang null
+        inconsistent_indices = not_cancelled_flights[not_cancelled_flights[valid_time_cols].isnull().any(axis=1)].index
     
-    # Drop baris tersebut
-    if not inconsistent_indices.empty:
-        df1_filtered = df1_filtered.drop(inconsistent_indices)
-        print(f"Dihapus {len(inconsistent_indices)} baris inkonsisten (Tidak cancel tapi waktu kosong).")
+        # Drop baris tersebut
+        if not inconsistent_indices.empty:
+            df1_filtered = df1_filtered.drop(inconsistent_indices)
+            print(f"Dihapus {len(inconsistent_indices)} baris inkonsisten (Tidak cancel tapi waktu kosong).")
     
-    print(f"Data Cleaning Selesai. Hasil: {df1_filtered.shape[0]} baris, {df1_filtered.shape[1]} kolom\n\n")
+        print(f"Data Cleaning Selesai. Hasil: {df1_filtered.shape[0]} baris, {df1_filtered.shape[1]} kolom\n\n")
+        s["outputs"] = df1_filtered
     
     return df1_filtered
 
 
+@instrumentation.instrument()
 def check_duplicate_outliers (df1_filtered, df2):
     print("\n--- Memulai Pengecekan Duplikat & Outlier ---")
     # 1. Cek Duplikat
-    duplicate_count = df1_filtered.duplicated().sum()
-    print("\n===== Cek Duplikat di Flight.csv =====")
-    if duplicate_count > 0:
-        print(f"Ditemukan {duplicate_count} data duplikat. Sedang menghapus...")
-        df1_filtered = df1_filtered.drop_duplicates()
-        print("Data duplikat berhasil dihapus.\n\n")
-    else:
-        print("Tidak ada data duplikat.\n\n")
-
-    duplicate2_count = df2.duplicated().sum()
-    print("\n===== Cek Duplikat di Weather.csv =====")
-    if duplicate2_count > 0:
-        print(f"Ditemukan {duplicate2_count} data duplikat. Sedang menghapus...")
-        df2 = df2.drop_duplicates()
-        print("Data duplikat berhasil dihapus.\n\n")
-    else:
-        print("Tidak ada data duplikat.\n\n")
+    with instrumentation.step("duplicates"):
+        duplicate_count = df1_filtered.duplicated().sum()
+        print("\n===== Cek Duplikat di Flight.csv =====")
+        if duplicate_count > 0:
+            print(f"Ditemukan {duplicate_count} data duplikat. Sedang menghapus...")
+            df1_filtered = df1_filtered.drop_duplicates()
+            print("Data duplikat berhasil dihapus.\n\n")
+        else:
+            print("Tidak ada data duplikat.\n\n")
+
+        duplicate2_count = df2.duplicated().sum()
+        print("\n===== Cek Duplikat di Weather.csv =====")
+        if duplicate2_count > 0:
+            print(f"Ditemukan {duplicate2_count} data duplikat. Sedang menghapus...")
+            df2 = df2.drop_duplicates()
+            print("Data duplikat berhasil dihapus.\n\n")
+        else:
+            print("Tidak ada data duplikat.\n\n")
 
     # 2. Cek Outlier pada Kolom Numerik di Flight.csv
     # Tidak dilakukan pembersihan outliers karena mungkin terdapat insight penting yang bisa diambil dari outliers tersebut
-    print("\n===== Cek Outlier di Flight.csv =====")
-    numeric_cols = df1_filtered.select_dtypes(include=['int64', 'float64']).columns
-    columns_with_outliers = []
+    with instrumentation.step("outliers"):
+        print("\n===== Cek Outlier di Flight.csv =====")
+        numeric_cols = df1_filtered.select_dtypes(include=['int64', 'float64']).columns
+        columns_with_outliers = []
 
-    for col in numeric_cols:
-        Q1 = df1_filtered[col].quantile(0.25)
-        Q3 = df1_filtered[col].quantile(0.75)
-        IQR = Q3 - Q1
+        for col in numeric_cols:
+            Q1 = df1_filtered[col].quantile(0.25)
+            Q3 = df1_filtered[col].quantile(0.75)
+            IQR = Q3 - Q1
 
-        lower_bound = Q1 - 1.5 * IQR
-        upper_bound = Q3 + 1.5 * IQR
+            lower_bound = Q1 - 1.5 * IQR
+            upper_bound = Q3 + 1.5 * IQR
 
-        outliers = df1_filtered[(df1_filtered[col] < lower_bound) | (df1_filtered[col] > upper_bound)]
+            outliers = df1_filtered[(df1_filtered[col] < lower_bound) | (df1_filtered[col] > upper_bound)]
 
-        if not outliers.empty:
-            print(f"\nColumn '{col}': {len(outliers)} outliers found.")
-            columns_with_outliers.append(col)
-        else:
-            print(f"\nColumn '{col}': No outliers found.")
+            if not outliers.empty:
+                print(f"\nColumn '{col}': {len(outliers)} outliers found.")
+                columns_with_outliers.append(col)
+            else:
+                print(f"\nColumn '{col}': No outliers found.")
 
 
-def standarisasi (df1_filtered, df2) :
+def standarisasi_weather(df2):
     """
-    Melakukan standarisasi data, meliputi lowercase nama kolom, encoding pada kolom kategorikal, dan standarisasi format datetime
+    Standarisasi format datetime Weather.csv: kolom 'time' (YYYY-MM-DDTHH:MM) dipecah
+    menjadi 'date' (int YYYYMMDD) dan 'time_hour_minute' (int HHMM). Mengubah df2 in-place.
+    """
+    # Extract date and time parts (parse vektor datetime64, lihat datetime_keys)
+    timestamps = datetime_keys.parse_timestamps(df2['time'])
+    df2['date'] = datetime_keys.date_key(timestamps)
+    df2['time_hour_minute'] = datetime_keys.hour_key(timestamps)
+
+    instrumentation.preview(df2, columns=['time', 'date', 'time_hour_minute'],
+                            title="First 5 rows of df2 with new 'date' and 'time_hour_minute' columns:", end="\n")
+
+    print("\nData types of new columns:")
+    print(df2[['date', 'time_hour_minute']].dtypes)
+    return df2
+
+
+def label_encode(values, classes=None):
+    """
+    Pengganti sklearn LabelEncoder dengan kode yang identik: kelas = nilai unik terurut,
+    kode = posisi nilai di kelas (int64). Mengembalikan (kode, kelas).
+    'classes' (misal kamus encoder mode out-of-core) dipakai apa adanya; nilai di luar kelas -> ValueError.
+    """
+    values = pd.Series(values, copy=False)
+    if values.isna().any():
+        raise ValueError(f"Kolom '{values.name}' berisi nilai kosong, tidak bisa di-encode")
+    if classes is None:
+        codes, classes = pd.factorize(values, sort=True)
+        return codes.astype(np.int64), np.asarray(classes, dtype=object)
+
+    # Nilai unik batch dicari di kelas (bukan per baris), lalu dipetakan balik lewat kode factorize
+    classes = np.asarray(classes, dtype=object)
+    codes, uniques = pd.factorize(values)
+    positions = pd.Index(classes).get_indexer(uniques)
+    if (positions < 0).any():
+        unseen = sorted(uniques[positions < 0])
+        raise ValueError(f"Label tidak ada di kamus encoder '{values.name}': {unseen}")
+    return positions.astype(np.int64)[codes], classes
+
+
+@instrumentation.instrument()
+def standarisasi (df1_filtered, df2, encoders=None) :
+    """
+    Melakukan standarisasi data, meliputi lowercase nama kolom, encoding pada kolom kategorikal, dan standarisasi format datetime.
+    'encoders' = {kolom: kelas terurut} dari seluruh data (mode out-of-core) agar kode
+    label_encode sama di setiap partisi; df2 yang sudah punya kolom date/time_hour_minute tidak diproses ulang.
     """
 
     print("\n--- Memulai Proses Standarisasi Data ---")
     
     # 1. Lowercase Nama Kolom
-    print("\n===== Lowercase Nama Kolom =====")
-    df1_filtered.columns = [col.lower() for col in df1_filtered.columns]
-    print("Standarisasi nama kolom ke lowercase selesai.\n")
-    print(f"{df1_filtered.head()}\n\n")
+    with instrumentation.step("lowercase_columns"):
+        print("\n===== Lowercase Nama Kolom =====")
+        df1_filtered.columns = [col.lower() for col in df1_filtered.columns]
+        print("Standarisasi nama kolom ke lowercase selesai.\n")
+        instrumentation.preview(df1_filtered)
     
     # 2. Encoding Kolom Kategorikal di df1_filtered
-    print("\n===== Encoding Kolom Kategorikal =====")
-    # 2.1 Label Encoder untuk kolom yang memiliki kategori yang bukan tingkatan
-    le = LabelEncoder()
-    le_cols = ['airline', 'airline_code', 'origin', 'dest']
+    with instrumentation.step("encoding", df1_filtered) as s:
+        print("\n===== Encoding Kolom Kategorikal =====")
+        # 2.1 Label Encoder untuk kolom yang memiliki kategori yang bukan tingkatan
+        le_cols = ['airline', 'airline_code', 'origin', 'dest']
     
-    for col in le_cols:
-            if col in df1_filtered.columns:
-                # Tentukan nama kolom baru (misal: airline -> airline_encode)
-                new_col_name = f"{col}_encode"
+        for col in le_cols:
+                if col in df1_filtered.columns:
+                    # Tentukan nama kolom baru (misal: airline -> airline_encode)
+                    new_col_name = f"{col}_encode"
                 
-                # Lakukan fit_transform dan simpan ke KOLOM BARU
-                df1_filtered[new_col_name] = le.fit_transform(df1_filtered[col])
-
-    # 2.2 Ordinal Encoder untuk kolom yang memiliki tingkatan (ORIGIN_CITY, DEST_CITY)
-    # Ordinal Encoder diterapkan di kolom tersebut untuk menyesuaikan dengan id lokasi di dataset Weather.csv untuk memudahkan saat merge data
-    oe = OrdinalEncoder(categories = [
-        ['Chicago, IL',
-        'Atlanta, GA',
-        'Dallas/Fort Worth, TX',
-        'Denver, CO',
-        'New York, NY',
-        'Charlotte, NC',
-        'Houston, TX',
-        'Los Angeles, CA',
-        'Washington, DC',
-        'Phoenix, AZ']
-        ])
-    
-    df1_filtered['origin_cities_encode'] = oe.fit_transform(df1_filtered[['origin_city']])
-    df1_filtered['dest_cities_encode'] = oe.fit_transform(df1_filtered[['dest_city']])
-    df1_filtered['origin_cities_encode'] = df1_filtered['origin_cities_encode'].astype(int)
-    df1_filtered['dest_cities_encode'] = df1_filtered['dest_cities_encode'].astype(int)
+                    # Encode dan simpan ke KOLOM BARU
+                    classes = encoders[col] if encoders is not None else None
+                    df1_filtered[new_col_name], _ = label_encode(df1_filtered[col], classes)
 
-    print("Proses Encoding selesai\n")
-    print(f"{df1_filtered.head()}\n\n")
+        # 2.2 Kota (ORIGIN_CITY, DEST_CITY) -> location_id dari kamus lokasi (city_locations.csv)
+        # Kode sama dengan location_id di dataset Weather.csv untuk memudahkan saat merge data
+        df1_filtered['origin_cities_encode'] = city_locations.encode_cities(df1_filtered['origin_city'])
+        df1_filtered['dest_cities_encode'] = city_locations.encode_cities(df1_filtered['dest_city'])
+
+        print("Proses Encoding selesai\n")
+        instrumentation.preview(df1_filtered)
+        s["outputs"] = df1_filtered
 
     # 3. Standarisasi Format Datetime
     # Menyamakan format datetime di kedua dataframe dengan menghilangkan tanda -
-    print("\n===== Memulai Proses Standarisasi Format Datetime =====")
+    with instrumentation.step("datetime", (df1_filtered, df2)) as s:
+        print("\n===== Memulai Proses Standarisasi Format Datetime =====")
 
-    # 3.1 Flight.csv (df1_filtered)
-    df1_filtered['fl_date'] = df1_filtered['fl_date'].str.replace('-', '').astype(int)
+        # 3.1 Flight.csv (df1_filtered)
+        df1_filtered['fl_date'] = datetime_keys.date_key(datetime_keys.parse_dates(df1_filtered['fl_date']))
 
-    print("Data type of 'fl_date' column after transformation:")
-    print(df1_filtered['fl_date'].dtype)
-    print("First 5 rows of 'fl_date' after transformation:")
-    print(df1_filtered['fl_date'].head())
+        print("Data type of 'fl_date' column after transformation:")
+        print(df1_filtered['fl_date'].dtype)
+        instrumentation.preview(df1_filtered['fl_date'], title="First 5 rows of 'fl_date' after transformation:", end="\n")
 
 
-    # 3.2 Weather.csv (df2)
-    # Extract date and time parts
-    df2['date'] = df2['time'].apply(lambda x: x.split('T')[0].replace('-', '')).astype(int)
-    df2['time_hour_minute'] = df2['time'].apply(lambda x: x.split('T')[1].replace(':', '')).astype(int)
+        # 3.2 Weather.csv (df2), dilewati jika df2 sudah distandarisasi sebelumnya
+        if not {'date', 'time_hour_minute'}.issubset(df2.columns):
+            standarisasi_weather(df2)
 
-    print("First 5 rows of df2 with new 'date' and 'time_hour_minute' columns:")
-    print(df2[['time', 'date', 'time_hour_minute']].head())
-
-    print("\nData types of new columns:")
-    print(df2[['date', 'time_hour_minute']].dtypes)
-
-    print("\nProses Standarisasi Datetime selesai\n")
-    print(f"{df1_filtered.head()}\n\n")
+        print("\nProses Standarisasi Datetime selesai\n")
+        instrumentation.preview(df1_filtered)
+        s["outputs"] = (df1_filtered, df2)
 
 
 
     # 4. Konsistensi Tipe Data
-    print("\n===== Memulai Proses Konsistensi Tipe Data =====")
-    time_related_nullable_columns = [
-    'dep_time', 'dep_delay', 'taxi_out', 'wheels_off', 'wheels_on',
-    'taxi_in', 'arr_time', 'arr_delay', 'elapsed_time', 'air_time'
-    ]
-
-    # Filter for rows where CANCELLED is 1
-    cancelled_flights_mask = df1_filtered['cancelled'] == 1
-
-    # Fill NaN values in specified time columns with 0 for cancelled flights
-    for col in time_related_nullable_columns:
-        df1_filtered.loc[cancelled_flights_mask, col] = df1_filtered.loc[cancelled_flights_mask, col].fillna(0)
-
-    float_cols_to_int = [
-    'dep_time', 'dep_delay', 'taxi_out', 'wheels_off', 'wheels_on',
-    'taxi_in', 'arr_time', 'arr_delay', 'cancelled', 'diverted',
-    'crs_elapsed_time', 'elapsed_time', 'air_time', 'distance',
-    'delay_due_carrier', 'delay_due_weather', 'delay_due_nas',
-    'delay_due_security', 'delay_due_late_aircraft'
-    ]
-
-    for col in float_cols_to_int:
-        df1_filtered[col] = df1_filtered[col].astype(int)
-
-    print("\n--- Proses Standarisasi Data Selesai---")
-    print(f"\n--- Hasil : {df1_filtered.shape[0]} baris, {df1_filtered.shape[1]} kolom---")
-    print(f"{df1_filtered.head()}\n\n")
+    with instrumentation.step("type_consistency", df1_filtered) as s:
+        print("\n===== Memulai Proses Konsistensi Tipe Data =====")
+        time_related_nullable_columns = [
+        'dep_time', 'dep_delay', 'taxi_out', 'wheels_off', 'wheels_on',
+        'taxi_in', 'arr_time', 'arr_delay', 'elapsed_time', 'air_time'
+        ]
+
+        # Filter for rows where CANCELLED is 1
+        cancelled_flights_mask = df1_filtered['cancelled'] == 1
+
+        # Fill NaN values in specified time columns with 0 for cancelled flights
+        for col in time_related_nullable_columns:
+            df1_filtered.loc[cancelled_flights_mask, col] = df1_filtered.loc[cancelled_flights_mask, col].fillna(0)
+
+        float_cols_to_int = [
+        'dep_time', 'dep_delay', 'taxi_out', 'wheels_off', 'wheels_on',
+        'taxi_in', 'arr_time', 'arr_delay', 'cancelled', 'diverted',
+        'crs_elapsed_time', 'elapsed_time', 'air_time', 'distance',
+        'delay_due_carrier', 'delay_due_weather', 'delay_due_nas',
+        'delay_due_security', 'delay_due_late_aircraft'
+        ]
+
+        for col in float_cols_to_int:
+            df1_filtered[col] = df1_filtered[col].astype(int)
+
+        print("\n--- Proses Standarisasi Data Selesai---")
+        print(f"\n--- Hasil : {df1_filtered.shape[0]} baris, {df1_filtered.shape[1]} kolom---")
+        instrumentation.preview(df1_filtered)
+        s["outputs"] = df1_filtered
     
 
     return df1_filtered, df2
 
 
-def merge_data (df1_filtered, df2):
+def build_weather_lookup(df2):
     """
-    Pada bagian ini akan dilakukan tahap penggabungan 2 df menjadi satu.
+    Menyiapkan tabel cuaca untuk merge origin & destination: kolom kunci di-rename
+    sesuai df1_filtered dan kolom cuaca diberi prefix origin_/dest_.
+    Mengembalikan (df2_origin_processed, df2_dest_processed); cukup dibangun sekali
+    lalu dipakai ulang untuk setiap partisi (mode out-of-core).
+    Kolom 'time' mentah tidak ikut (kuncinya sudah ada di date & time_hour_minute).
     """
-    print("\n--- Memulai Proses Merge Flight & Weather ---")
-    
-    # 1. Menyamakan Time
-    # Round down crs_dep_time to the nearest hundred (e.g., 1151 becomes 1100)
-    # The columns are already integer type based on previous steps.
-    df1_filtered['crs_dep_time_rounded'] = (df1_filtered['crs_dep_time'] // 100 * 100).astype(int)
-    crs_dep_time_idx = df1_filtered.columns.get_loc('crs_dep_time')
-    df1_filtered.insert(crs_dep_time_idx + 1, 'crs_dep_time_rounded', df1_filtered.pop('crs_dep_time_rounded'))
-
-    # Round down crs_arr_time to the nearest hundred (e.g., 1151 becomes 1100)
-    df1_filtered['crs_arr_time_rounded'] = (df1_filtered['crs_arr_time'] // 100 * 100).astype(int)
-    crs_arr_time_idx = df1_filtered.columns.get_loc('crs_arr_time')
-    df1_filtered.insert(crs_arr_time_idx + 1, 'crs_arr_time_rounded', df1_filtered.pop('crs_arr_time_rounded'))
+    column_plan.measure(df2, column_plan.WEATHER_KEY_ONLY, prefixes=('origin_', 'dest_'))
 
-    # 2. Merge Dataframe
     # Rename columns in df2 to match df1_filtered for merging
     df2_origin = df2.rename(columns={
         'date': 'fl_date',
@@ -280,7 +318,7 @@ def merge_data (df1_filtered, df2):
     # Select and prefix columns from df2 for origin weather
     df2_origin_cols = {}
     for col in df2_origin.columns:
-        if col not in ['fl_date', 'origin_cities_encode', 'crs_dep_time_rounded']:
+        if col not in ['fl_date', 'origin_cities_encode', 'crs_dep_time_rounded'] + column_plan.WEATHER_KEY_ONLY:
             df2_origin_cols[col] = 'origin_' + col.replace(' ', '_').replace('(', '').replace(')', '').replace('°C', 'c').replace('%', 'percent').replace('(mm)', 'mm').replace('(hPa)', 'hpa').replace('(cm)', 'cm').replace('(wmo_code)', 'wmo_code').replace('(km/h)', 'kmh').replace('(_)', 'degree')
 
     df2_origin_processed = df2_origin.rename(columns=df2_origin_cols)
@@ -293,14 +331,6 @@ def merge_data (df1_filtered, df2):
 
     df2_origin_processed = df2_origin_processed[columns_to_keep_origin_weather]
 
-    # Perform a left merge with df1_filtered for origin weather
-    df_merged_full = pd.merge(
-        df1_filtered,
-        df2_origin_processed,
-        on=['fl_date', 'origin_cities_encode', 'crs_dep_time_rounded'],
-        how='left'
-    )
-
     # Rename columns in df2 to match df1_filtered for destination merging
     df2_dest = df2.rename(columns={
         'date': 'fl_date',
@@ -311,7 +341,7 @@ def merge_data (df1_filtered, df2):
     # Select and prefix columns from df2 for destination weather
     df2_dest_cols = {}
     for col in df2_dest.columns:
-        if col not in ['fl_date', 'dest_cities_encode', 'crs_arr_time_rounded']:
+        if col not in ['fl_date', 'dest_cities_encode', 'crs_arr_time_rounded'] + column_plan.WEATHER_KEY_ONLY:
             df2_dest_cols[col] = 'dest_' + col.replace(' ', '_').replace('(', '').replace(')', '').replace('°C', 'c').replace('%', 'percent').replace('(mm)', 'mm').replace('(hPa)', 'hpa').replace('(cm)', 'cm').replace('(wmo_code)', 'wmo_code').replace('(km/h)', 'kmh').replace('(_)', 'degree')
 
     df2_dest_processed = df2_dest.rename(columns=df2_dest_cols)
@@ -323,28 +353,113 @@ def merge_data (df1_filtered, df2):
     ] + list(df2_dest_cols.values())
 
     df2_dest_processed = df2_dest_processed[columns_to_keep_dest_df2]
+    column_plan.record("weather_lookup", df2_origin_processed, ['origin_time', 'dest_time'])
+
+    return df2_origin_processed, df2_dest_processed
+
+
+# Kunci packed (tanggal, jam, lokasi) untuk lookup cuaca ber-index: date_hour_key (YYYYMMDDHHMM) * radix + lokasi
+WEATHER_KEY = 'weather_key'
+LOCATION_RADIX = 100_000
 
-    # Perform a left merge with df_merged_full for destination df2
-    final_merged_df = pd.merge(
-        df_merged_full,
-        df2_dest_processed,
-        on=['fl_date', 'dest_cities_encode', 'crs_arr_time_rounded'],
-        how='left'
-    )
 
-    print("Shape of final merged DataFrame:", final_merged_df.shape)
-    print("First 5 rows of final merged DataFrame (showing relevant destination weather columns):")
-    print(final_merged_df[[
-        'fl_date', 'dest_city', 'dest_cities_encode', 'crs_arr_time_rounded',
-        'dest_temperature_2m_c', 'dest_precipitation_mm', 'dest_rain_mm'
-    ]].head())
+def weather_key(dates, locations, times):
+    """Kunci int64 (date YYYYMMDD, location_id, time HHMM) untuk index_weather_lookup"""
+    return datetime_keys.date_hour_key(dates, times) * LOCATION_RADIX + np.asarray(locations, dtype=np.int64)
 
-    print("\n--- Proses Merge Selesai\n ---")
-    print(f"{final_merged_df.head()}\n\n")
+
+def index_weather_lookup(weather_lookup):
+    """
+    Hasil build_weather_lookup diindeks dengan weather_key (hash index dibangun sekali), sehingga
+    merge_data untuk batch kecil cukup lookup per baris batch, tanpa hashing ulang seluruh tabel cuaca.
+    Jika kunci cuaca tidak unik, lookup dikembalikan apa adanya (merge biasa).
+    """
+    indexed = []
+    for lookup in weather_lookup:
+        keys = pd.Index(weather_key(lookup.iloc[:, 0], lookup.iloc[:, 1], lookup.iloc[:, 2]), name=WEATHER_KEY)
+        if not keys.is_unique:
+            return weather_lookup
+        frame = lookup.iloc[:, 3:].set_axis(keys, axis=0)
+        frame.index.get_indexer(keys[:1])  # bangun hash table index sekarang, bukan di batch pertama
+        indexed.append(frame)
+    return tuple(indexed)
+
+
+def _join_weather(left, lookup, on):
+    """Left join ke lookup cuaca; lookup hasil index_weather_lookup di-join lewat index-nya"""
+    if lookup.index.name != WEATHER_KEY:
+        return pd.merge(left, lookup, on=on, how='left')
+    keys = weather_key(left[on[0]], left[on[1]], left[on[2]])
+    matched = lookup.reindex(keys).reset_index(drop=True)
+    return pd.concat([left.reset_index(drop=True), matched], axis=1)
+
+
+@instrumentation.instrument()
+def merge_data (df1_filtered, df2, weather_lookup=None):
+    """
+    Pada bagian ini akan dilakukan tahap penggabungan 2 df menjadi satu.
+    'weather_lookup' (hasil build_weather_lookup, opsional index_weather_lookup) dipakai jika sudah tersedia.
+    """
+    print("\n--- Memulai Proses Merge Flight & Weather ---")
+    
+    # 1. Menyamakan Time
+    # Round down crs_dep_time to the nearest hundred (e.g., 1151 becomes 1100)
+    # The columns are already integer type based on previous steps.
+    with instrumentation.step("round_times"):
+        df1_filtered['crs_dep_time_rounded'] = (df1_filtered['crs_dep_time'] // 100 * 100).astype(int)
+        crs_dep_time_idx = df1_filtered.columns.get_loc('crs_dep_time')
+        df1_filtered.insert(crs_dep_time_idx + 1, 'crs_dep_time_rounded', df1_filtered.pop('crs_dep_time_rounded'))
+
+        # Round down crs_arr_time to the nearest hundred (e.g., 1151 becomes 1100)
+        df1_filtered['crs_arr_time_rounded'] = (df1_filtered['crs_arr_time'] // 100 * 100).astype(int)
+        crs_arr_time_idx = df1_filtered.columns.get_loc('crs_arr_time')
+        df1_filtered.insert(crs_arr_time_idx + 1, 'crs_arr_time_rounded', df1_filtered.pop('crs_arr_time_rounded'))
+        column_plan.measure(df1_filtered, column_plan.MERGE_KEY_ONLY)
+
+    # 2. Merge Dataframe
+    # Tabel cuaca ber-prefix origin_/dest_ (dibangun sekali per run jika 'weather_lookup' diberikan)
+    with instrumentation.step("weather_lookup"):
+        if weather_lookup is None:
+            weather_lookup = build_weather_lookup(df2)
+        df2_origin_processed, df2_dest_processed = weather_lookup
+
+    with instrumentation.step("merge_origin", df1_filtered) as s:
+        # Perform a left merge with df1_filtered for origin weather
+        df_merged_full = _join_weather(
+            df1_filtered,
+            df2_origin_processed,
+            ['fl_date', 'origin_cities_encode', 'crs_dep_time_rounded']
+        )
+        column_plan.record("merge_origin", df_merged_full, ['origin_time'])
+        s["outputs"] = df_merged_full
+
+    with instrumentation.step("merge_dest", df_merged_full) as s:
+        # Perform a left merge with df_merged_full for destination df2
+        final_merged_df = _join_weather(
+            df_merged_full,
+            df2_dest_processed,
+            ['fl_date', 'dest_cities_encode', 'crs_arr_time_rounded']
+        )
+
+        print("Shape of final merged DataFrame:", final_merged_df.shape)
+        instrumentation.preview(final_merged_df, columns=[
+            'fl_date', 'dest_city', 'dest_cities_encode', 'crs_arr_time_rounded',
+            'dest_temperature_2m_c', 'dest_precipitation_mm', 'dest_rain_mm'
+        ], title="First 5 rows of final merged DataFrame (showing relevant destination weather columns):", end="\n")
+
+        # Kunci pembulatan jam hanya untuk join; dibuang (tanpa copy) agar tidak terbawa ke fase berikutnya
+        for col in column_plan.MERGE_KEY_ONLY:
+            del final_merged_df[col]
+        column_plan.record("merge", final_merged_df, column_plan.MERGE_KEY_ONLY + ['origin_time', 'dest_time'])
+
+        print("\n--- Proses Merge Selesai\n ---")
+        instrumentation.preview(final_merged_df)
+        s["outputs"] = final_merged_df
 
     return final_merged_df
 
 
+@instrumentation.instrument()
 def data_enrichment (final_merged_df):
     """
     Pada bagian ini akan dilakukan penambahan 5 kolom baru.
@@ -367,6 +482,6 @@ def data_enrichment (final_merged_df):
     final_merged_df['dest_cloud_cover_diff'] = final_merged_df['dest_cloud_cover_percent'] - final_merged_df['dest_cloud_cover_low_percent']
 
     print("\n--- Proses Feature Engineering Selesai dengan penambahan Kolom temp_2m_c_diff, surface_pressure_hpa_diff, wind_speed_10m_km_h_diff, wind_speed_100m_km_h_diff, dest_cloud_cover_diff ---\n")
-    print(f"{final_merged_df.head()}\n\n")
+    instrumentation.preview(final_merged_df)
 
     return final_merged_df
\ No newline at end of file
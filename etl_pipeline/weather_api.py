@@ -0,0 +1,300 @@
+import asyncio
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import random
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+import numpy as np
+import pandas as pd
+
+import city_locations
+
+# ---------------------------------------------------------
+# Extractor cuaca langsung dari Open-Meteo Historical API (pengganti snapshot Weather.csv).
+# - Rentang tanggal dipecah per CHUNK_MONTHS bulan (batas kalender tetap), lokasi dari
+#   kamus city_locations.csv digabung per BATCH_LOCATIONS koordinat dalam satu request.
+# - Request berjalan bersamaan dengan asyncio (maks CONCURRENCY, RATE_LIMIT request/detik),
+#   retry dengan exponential backoff untuk 429 / 5xx / error jaringan.
+# - Respons disimpan per (koordinat, rentang, variabel) di CACHE_DIR (JSON gzip), sehingga
+#   run berikutnya hanya mengambil rentang yang belum ada.
+# - Output: DataFrame dengan skema sama persis dengan Weather.csv (WEATHER_COLUMNS).
+# API_URL bisa diarahkan ke mock server lokal (benchmarks/mock_open_meteo.py).
+# ---------------------------------------------------------
+
+API_URL = os.getenv("OPEN_METEO_URL", "https://archive-api.open-meteo.com/v1/archive")
+CACHE_DIR = os.getenv("WEATHER_CACHE_DIR", "weather_cache")
+START_DATE = os.getenv("WEATHER_START", "2019-01-01")
+END_DATE = os.getenv("WEATHER_END", "2023-08-31")
+TIMEZONE = os.getenv("WEATHER_TIMEZONE", "auto")
+CONCURRENCY = int(os.getenv("WEATHER_API_CONCURRENCY", "4"))
+RATE_LIMIT = float(os.getenv("WEATHER_API_RATE", "5"))  # request per detik
+MAX_RETRIES = 4
+BACKOFF_SECONDS = 1.0
+TIMEOUT_SECONDS = 60
+BATCH_LOCATIONS = 10
+CHUNK_MONTHS = 12
+# Data archive beberapa hari terakhir masih bisa berubah: chunk yang menyentuhnya tidak di-cache
+ARCHIVE_DELAY_DAYS = 7
+RETRY_STATUS = {429, 500, 502, 503, 504}
+CACHE_COMPRESS_LEVEL = 3
+
+# Variabel hourly Open-Meteo -> nama kolom Weather.csv (urutan kolom ikut urutan ini)
+WEATHER_COLUMNS = {
+    "temperature_2m": "temperature_2m (°C)",
+    "precipitation": "precipitation (mm)",
+    "rain": "rain (mm)",
+    "snowfall": "snowfall (cm)",
+    "weather_code": "weather_code (wmo code)",
+    "surface_pressure": "surface_pressure (hPa)",
+    "cloud_cover": "cloud_cover (%)",
+    "cloud_cover_low": "cloud_cover_low (%)",
+    "wind_speed_10m": "wind_speed_10m (km/h)",
+    "wind_speed_100m": "wind_speed_100m (km/h)",
+    "wind_direction_10m": "wind_direction_10m (°)",
+    "wind_direction_100m": "wind_direction_100m (°)",
+    "wind_gusts_10m": "wind_gusts_10m (km/h)",
+}
+HOURLY_VARIABLES = list(WEATHER_COLUMNS)
+# Kolom yang dibaca pd.read_csv(Weather.csv) sebagai int64 (float64 jika ada nilai kosong)
+INTEGER_VARIABLES = ["weather_code", "cloud_cover", "cloud_cover_low", "wind_direction_10m", "wind_direction_100m"]
+
+
+# ---------------------------------------------------------
+# RENCANA REQUEST & CACHE
+# ---------------------------------------------------------
+def date_chunks(start, end, chunk_months=CHUNK_MONTHS):
+    """[(start, end)] per blok 'chunk_months' bulan dengan batas kalender tetap (key cache stabil)"""
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    if end < start:
+        raise ValueError(f"end ({end.date()}) sebelum start ({start.date()})")
+    chunks = []
+    block_start = pd.Timestamp(year=start.year, month=1 + (start.month - 1) // chunk_months * chunk_months, day=1)
+    while block_start <= end:
+        block_end = block_start + pd.DateOffset(months=chunk_months) - pd.Timedelta(days=1)
+        chunks.append((max(block_start, start).strftime("%Y-%m-%d"), min(block_end, end).strftime("%Y-%m-%d")))
+        block_start = block_end + pd.Timedelta(days=1)
+    return chunks
+
+
+def cache_path(cache_dir, latitude, longitude, start, end, variables=HOURLY_VARIABLES, timezone=TIMEZONE):
+    """File cache untuk satu koordinat + rentang; variabel & timezone masuk ke digest nama file"""
+    digest = hashlib.sha1(json.dumps([list(variables), timezone]).encode()).hexdigest()[:12]
+    return os.path.join(cache_dir, f"{latitude:.4f}_{longitude:.4f}", f"{start}_{end}_{digest}.json.gz")
+
+
+def _read_cache(path):
+    with open(path, "rb") as f:
+        return json.loads(gzip.decompress(f.read()))
+
+
+def _write_cache(path, payload):
+    # json.dumps (encoder C) + gzip level rendah: json.dump ke file memakai encoder Python per token
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(gzip.compress(json.dumps(payload).encode("utf-8"), compresslevel=CACHE_COMPRESS_LEVEL))
+    os.replace(tmp_path, path)
+
+
+def _cacheable(end):
+    return pd.Timestamp(end) < pd.Timestamp(datetime.date.today()) - pd.Timedelta(days=ARCHIVE_DELAY_DAYS)
+
+
+def build_url(base_url, coords, start, end, variables=HOURLY_VARIABLES, timezone=TIMEZONE):
+    """URL request hourly untuk satu batch koordinat [(lat, lon)]"""
+    params = {
+        "latitude": ",".join(f"{lat:.4f}" for lat, _ in coords),
+        "longitude": ",".join(f"{lon:.4f}" for _, lon in coords),
+        "start_date": start,
+        "end_date": end,
+        "hourly": ",".join(variables),
+        "timezone": timezone,
+    }
+    return f"{base_url}?{urllib.parse.urlencode(params, safe=',')}"
+
+
+# ---------------------------------------------------------
+# HTTP ASYNC: RATE LIMIT + RETRY
+# ---------------------------------------------------------
+class RateLimiter:
+    """Membatasi laju request (request/detik) antar coroutine; 0 = tanpa batas"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class ApiError(RuntimeError):
+    """Respons error dari API yang tidak perlu di-retry (misal parameter tidak valid)"""
+
+
+def _http_get(url, timeout):
+    """GET blocking (dijalankan di thread lewat asyncio.to_thread); mengembalikan JSON"""
+    request = urllib.request.Request(url, headers={"Accept": "application/json", "Accept-Encoding": "gzip"})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        body = response.read()
+        if response.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+    return json.loads(body)
+
+
+async def fetch_json(url, limiter, semaphore, stats, retries=MAX_RETRIES, timeout=TIMEOUT_SECONDS):
+    """Satu request dengan rate limit, batas konkurensi, dan retry (backoff + jitter, Retry-After)"""
+    for attempt in range(retries + 1):
+        retry_after = None
+        async with semaphore:
+            await limiter.wait()
+            stats["requests"] += 1
+            try:
+                return await asyncio.to_thread(_http_get, url, timeout)
+            except urllib.error.HTTPError as e:
+                if e.code not in RETRY_STATUS:
+                    try:
+                        reason = json.loads(e.read()).get("reason", e.reason)
+                    except (ValueError, AttributeError):
+                        reason = e.reason
+                    raise ApiError(f"HTTP {e.code}: {reason}") from e
+                error = e
+                retry_after = e.headers.get("Retry-After") if e.headers else None
+            except (urllib.error.URLError, TimeoutError, ConnectionError) as e:
+                error = e
+        if attempt == retries:
+            raise error
+        stats["retries"] += 1
+        delay = float(retry_after) if retry_after and retry_after.isdigit() else BACKOFF_SECONDS * 2 ** attempt
+        await asyncio.sleep(delay * (1 + random.random() * 0.25))
+
+
+def _split_response(payload, n_coords):
+    """Open-Meteo mengembalikan list untuk banyak koordinat dan dict untuk satu koordinat"""
+    items = payload if isinstance(payload, list) else [payload]
+    if len(items) != n_coords:
+        raise ApiError(f"Respons berisi {len(items)} lokasi, diminta {n_coords}")
+    return items
+
+
+# ---------------------------------------------------------
+# ORKESTRASI
+# ---------------------------------------------------------
+def _to_frame(payload, location_id, variables):
+    hourly = payload.get("hourly") or {}
+    missing = [v for v in ["time"] + list(variables) if v not in hourly]
+    if missing:
+        raise ApiError(f"Respons location_id {location_id} tanpa variabel {missing}")
+    frame = pd.DataFrame({WEATHER_COLUMNS.get(v, v): hourly[v] for v in variables})
+    frame.insert(0, "time", pd.Series(hourly["time"], dtype=object))
+    frame.insert(0, "location_id", np.int64(location_id))
+    return frame
+
+
+def _normalize_types(df, variables):
+    """Dtype sama dengan pd.read_csv(Weather.csv): kolom integer -> int64 jika tanpa nilai kosong"""
+    for v in variables:
+        col = WEATHER_COLUMNS.get(v, v)
+        values = pd.to_numeric(df[col], errors="coerce").astype("float64")
+        if v in INTEGER_VARIABLES and values.notna().all():
+            values = values.astype("int64")
+        df[col] = values
+    df["time"] = df["time"].astype(str)
+    return df
+
+
+async def fetch_weather_async(locations, start=START_DATE, end=END_DATE, variables=HOURLY_VARIABLES,
+                              cache_dir=CACHE_DIR, base_url=API_URL, concurrency=CONCURRENCY,
+                              rate_limit=RATE_LIMIT, timezone=TIMEZONE, batch_locations=BATCH_LOCATIONS,
+                              chunk_months=CHUNK_MONTHS):
+    """
+    Mengambil cuaca hourly untuk 'locations' (DataFrame: location_id, latitude, longitude).
+    Mengembalikan (DataFrame skema Weather.csv, statistik request/cache).
+    """
+    stats = {"chunks": 0, "cached": 0, "fetched": 0, "requests": 0, "retries": 0}
+    rows = list(locations[["location_id", "latitude", "longitude"]].itertuples(index=False))
+    frames = {}
+    missing = {}
+    for chunk in date_chunks(start, end, chunk_months):
+        for loc in rows:
+            stats["chunks"] += 1
+            path = cache_path(cache_dir, loc.latitude, loc.longitude, *chunk, variables, timezone)
+            if os.path.exists(path):
+                stats["cached"] += 1
+                frames[(loc.location_id, chunk)] = path
+            else:
+                missing.setdefault(chunk, []).append(loc)
+
+    limiter, semaphore = RateLimiter(rate_limit), asyncio.Semaphore(concurrency)
+
+    async def fetch_batch(chunk, batch):
+        url = build_url(base_url, [(loc.latitude, loc.longitude) for loc in batch], *chunk, variables, timezone)
+        items = _split_response(await fetch_json(url, limiter, semaphore, stats), len(batch))
+        for loc, item in zip(batch, items):
+            payload = {"hourly": item.get("hourly"), "hourly_units": item.get("hourly_units")}
+            frames[(loc.location_id, chunk)] = _to_frame(payload, loc.location_id, variables)
+            if _cacheable(chunk[1]):
+                path = cache_path(cache_dir, loc.latitude, loc.longitude, *chunk, variables, timezone)
+                await asyncio.to_thread(_write_cache, path, payload)
+            stats["fetched"] += 1
+
+    await asyncio.gather(*[
+        fetch_batch(chunk, locs[i:i + batch_locations])
+        for chunk, locs in missing.items()
+        for i in range(0, len(locs), batch_locations)
+    ])
+
+    # Urutan hasil sama dengan Weather.csv: per location_id lalu waktu
+    parts = []
+    for loc in rows:
+        for chunk in date_chunks(start, end, chunk_months):
+            part = frames[(loc.location_id, chunk)]
+            parts.append(_to_frame(_read_cache(part), loc.location_id, variables) if isinstance(part, str) else part)
+    df = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(
+        columns=["location_id", "time"] + [WEATHER_COLUMNS.get(v, v) for v in variables])
+    return _normalize_types(df, variables), stats
+
+
+def fetch_weather(locations, **kwargs):
+    """Versi sinkron fetch_weather_async (di notebook / event loop aktif pakai 'await fetch_weather_async')"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(fetch_weather_async(locations, **kwargs))
+    raise RuntimeError("Event loop sedang berjalan: gunakan 'await weather_api.fetch_weather_async(...)'")
+
+
+def extract_weather_api(locations=None, start=START_DATE, end=END_DATE, cache_dir=CACHE_DIR):
+    """
+    Extraction Source 2 dari Open-Meteo API untuk semua lokasi di kamus city_locations.
+    Mengembalikan DataFrame dengan skema Weather.csv, atau None jika gagal.
+    """
+    print("   [EXTRACT] Memulai pengambilan Data Weather dari Open-Meteo API (Source 2)...")
+    start_time = time.time()
+    locations = city_locations.load_locations() if locations is None else locations
+    try:
+        df, stats = fetch_weather(locations, start=start, end=end, cache_dir=cache_dir)
+    except Exception as e:
+        print(f"   [ERROR] Terjadi kesalahan saat ekstraksi Source 2 (API): {e}")
+        return None
+
+    print(f"   [API] {len(locations)} lokasi, {start} s/d {end}: {stats['chunks']} chunk "
+          f"({stats['cached']} dari cache, {stats['fetched']} diambil), "
+          f"{stats['requests']} request, {stats['retries']} retry")
+    print(f"Status: Berhasil Memuat Data ke Memori")
+    print(f"Number of Rows: {df.shape[0]}")
+    print(f"Number of Columns: {df.shape[1]}")
+    print(f"Extraction Time: {time.time() - start_time:.4f} seconds")
+    print(f"--- Extraction Completed ---")
+    return df
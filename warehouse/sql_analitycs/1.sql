@@ -1,19 +1,19 @@
 -- "Survival Rate" Penerbangan (On-Time Performance di Cuaca Ekstrem) --
+-- Dibaca dari tabel rollup agg_flights_weather (di-refresh oleh loader), bukan fact_flights
 
 SELECT 
     da.airline, -- Ambil nama maskapai dari tabel dimensi
-    COUNT(*) as total_flights_saat_badai,
+    SUM(agg.n_flights)::BIGINT as total_flights_saat_badai,
     
     -- Hitung jumlah penerbangan yang tetap On-Time (Delay <= 0) meski badai
-    SUM(CASE WHEN ff.dep_delay <= 0 THEN 1 ELSE 0 END) as on_time_flights,
+    SUM(agg.n_on_time)::BIGINT as on_time_flights,
     
     -- Hitung Survival Rate (Persentase)
-    ROUND((SUM(CASE WHEN ff.dep_delay <= 0 THEN 1 ELSE 0 END)::DECIMAL / COUNT(*)) * 100, 2) as survival_rate_persen
+    ROUND((SUM(agg.n_on_time)::DECIMAL / SUM(agg.n_flights)) * 100, 2) as survival_rate_persen
 
-FROM fact_flights ff
-JOIN dim_airline da ON ff.airline_key = da.airline_key -- Wajib Join
-WHERE ff.origin_precipitation_mm > 3 
-   OR ff.origin_wind_speed_10m_kmh > 35 -- Perhatikan akhiran '_kmh' (bukan '_km_h')
+FROM agg_flights_weather agg
+JOIN dim_airline da ON agg.airline_key = da.airline_key -- Wajib Join
+WHERE agg.is_storm -- origin_precipitation_mm > 3 OR origin_wind_speed_10m_kmh > 35
 GROUP BY 1
-HAVING COUNT(*) > 50 -- Filter sampel minimal
-ORDER BY survival_rate_persen DESC;
\ No newline at end of file
+HAVING SUM(agg.n_flights) > 50 -- Filter sampel minimal
+ORDER BY survival_rate_persen DESC;
@@ -1,10 +1,11 @@
 -- Ketahanan Bandara Besar (Hub) vs Kecil --
+-- Dibaca dari tabel rollup agg_flights_weather (di-refresh oleh loader), bukan fact_flights
 
 WITH AirportVolume AS (
     -- Kita perlu JOIN ke dimensi untuk mendapatkan nama kota
-    SELECT doc.origin_city, COUNT(*) as total 
-    FROM fact_flights ff
-    JOIN dim_origin_city doc ON ff.origin_city_key = doc.origin_city_key
+    SELECT doc.origin_city, SUM(agg.n_flights)::BIGINT as total 
+    FROM agg_flights_weather agg
+    JOIN dim_origin_city doc ON agg.origin_city_key = doc.origin_city_key
     GROUP BY 1
 ),
 AirportType AS (
@@ -18,12 +19,16 @@ AirportType AS (
 )
 SELECT 
     t.tipe_bandara,
-    AVG(ff.dep_delay) as avg_delay_all,
-    AVG(CASE WHEN ff.origin_precipitation_mm > 0 THEN ff.dep_delay END) as avg_delay_hujan,
-    (AVG(CASE WHEN ff.origin_precipitation_mm > 0 THEN ff.dep_delay END) - AVG(ff.dep_delay)) as gap_dampak_cuaca
-FROM fact_flights ff
+    SUM(agg.dep_delay_sum)::DECIMAL / NULLIF(SUM(agg.dep_delay_cnt), 0) as avg_delay_all,
+    -- origin_precip_band > 0 setara dengan origin_precipitation_mm > 0
+    SUM(CASE WHEN agg.origin_precip_band > 0 THEN agg.dep_delay_sum END)::DECIMAL
+        / NULLIF(SUM(CASE WHEN agg.origin_precip_band > 0 THEN agg.dep_delay_cnt END), 0) as avg_delay_hujan,
+    (SUM(CASE WHEN agg.origin_precip_band > 0 THEN agg.dep_delay_sum END)::DECIMAL
+        / NULLIF(SUM(CASE WHEN agg.origin_precip_band > 0 THEN agg.dep_delay_cnt END), 0)
+     - SUM(agg.dep_delay_sum)::DECIMAL / NULLIF(SUM(agg.dep_delay_cnt), 0)) as gap_dampak_cuaca
+FROM agg_flights_weather agg
 -- Join ke dimensi kota dulu...
-JOIN dim_origin_city doc ON ff.origin_city_key = doc.origin_city_key 
+JOIN dim_origin_city doc ON agg.origin_city_key = doc.origin_city_key 
 -- ...baru join ke hasil CTE kategori bandara
 JOIN AirportType t ON doc.origin_city = t.origin_city
-GROUP BY 1;
\ No newline at end of file
+GROUP BY 1;
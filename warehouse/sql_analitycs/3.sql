@@ -1,16 +1,14 @@
 -- Maskapai Paling Tepat Waktu saat Cuaca Cerah -- 
+-- Dibaca dari tabel rollup agg_flights_weather (di-refresh oleh loader), bukan fact_flights
 
 SELECT 
     da.airline, -- Diambil dari tabel dimensi
-    AVG(ff.dep_delay) as baseline_delay_cerah,
-    AVG(ff.taxi_out) as baseline_taxi_cerah,
-    COUNT(*) as total_flight_sample
-FROM fact_flights ff
-JOIN dim_airline da ON ff.airline_key = da.airline_key -- Wajib join untuk mendapatkan nama airline
-WHERE ff.origin_precipitation_mm = 0 
-  AND ff.origin_wind_speed_10m_kmh < 10 -- Sesuaikan nama kolom dengan schema (kmh vs km_h)
-  AND ff.origin_cloud_cover_percent < 20
-  AND ff.origin_snowfall_cm = 0
+    SUM(agg.dep_delay_sum)::DECIMAL / NULLIF(SUM(agg.dep_delay_cnt), 0) as baseline_delay_cerah,
+    SUM(agg.taxi_out_sum)::DECIMAL / NULLIF(SUM(agg.taxi_out_cnt), 0) as baseline_taxi_cerah,
+    SUM(agg.n_flights)::BIGINT as total_flight_sample
+FROM agg_flights_weather agg
+JOIN dim_airline da ON agg.airline_key = da.airline_key -- Wajib join untuk mendapatkan nama airline
+WHERE agg.is_clear -- precipitation = 0, wind_speed_10m < 10, cloud_cover < 20, snowfall = 0
 GROUP BY da.airline
-HAVING COUNT(*) > 100
-ORDER BY baseline_delay_cerah ASC;
\ No newline at end of file
+HAVING SUM(agg.n_flights) > 100
+ORDER BY baseline_delay_cerah ASC;
@@ -1,4 +1,5 @@
 -- Analisis Delay dan Pembatalan berdasarkan Kode Cuaca --
+-- Dibaca dari tabel rollup agg_flights_weather (di-refresh oleh loader), bukan fact_flights
 
 SELECT 
     origin_weather_code_wmo_code,
@@ -11,8 +12,8 @@ SELECT
         WHEN origin_weather_code_wmo_code >= 95 THEN 'Badai Petir (Thunderstorm)'
         ELSE 'Lainnya'
     END AS deskripsi_cuaca,
-    AVG(dep_delay) as avg_delay,
-    SUM(cancelled) as total_batal
-FROM fact_flights
+    SUM(dep_delay_sum)::DECIMAL / NULLIF(SUM(dep_delay_cnt), 0) as avg_delay,
+    SUM(cancelled_sum) as total_batal
+FROM agg_flights_weather
 GROUP BY 1, 2
-ORDER BY avg_delay DESC;
\ No newline at end of file
+ORDER BY avg_delay DESC;
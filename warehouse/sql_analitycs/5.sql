@@ -1,12 +1,13 @@
 -- Dampak Cloud Cover terhadap Delay Kedatangan --
+-- Dibaca dari tabel rollup agg_flights_weather (di-refresh oleh loader), bukan fact_flights
 
 SELECT 
     CASE 
-        WHEN dest_cloud_cover_percent < 25 THEN 'Langit Bersih (0-25%)'
-        WHEN dest_cloud_cover_percent BETWEEN 25 AND 75 THEN 'Berawan Sebagian (25-75%)'
-        WHEN dest_cloud_cover_percent > 75 THEN 'Mendung Total (>75%)'
+        WHEN dest_cloud_band = 0 THEN 'Langit Bersih (0-25%)'
+        WHEN dest_cloud_band = 1 THEN 'Berawan Sebagian (25-75%)'
+        WHEN dest_cloud_band = 2 THEN 'Mendung Total (>75%)'
     END AS kondisi_langit_tujuan,
-    AVG(arr_delay) as rata_rata_delay_kedatangan
-FROM fact_flights
+    SUM(arr_delay_sum)::DECIMAL / NULLIF(SUM(arr_delay_cnt), 0) as rata_rata_delay_kedatangan
+FROM agg_flights_weather
 GROUP BY 1
-ORDER BY rata_rata_delay_kedatangan DESC;
\ No newline at end of file
+ORDER BY rata_rata_delay_kedatangan DESC;
@@ -1,13 +1,14 @@
 -- Analisis Delay berdasarkan Suhu --
+-- Dibaca dari tabel rollup agg_flights_weather (di-refresh oleh loader), bukan fact_flights
 
 SELECT 
     CASE 
-        WHEN origin_temperature_2m_c < 0 THEN 'Beku (< 0°C)'
-        WHEN origin_temperature_2m_c BETWEEN 0 AND 30 THEN 'Normal (0-30°C)'
-        WHEN origin_temperature_2m_c > 30 THEN 'Panas (> 30°C)'
+        WHEN origin_temp_band = 0 THEN 'Beku (< 0°C)'
+        WHEN origin_temp_band = 1 THEN 'Normal (0-30°C)'
+        WHEN origin_temp_band = 2 THEN 'Panas (> 30°C)'
     END AS kategori_suhu,
-    AVG(dep_delay) as avg_departure_delay,
-    AVG(arr_delay) as avg_arrival_delay
-FROM fact_flights
+    SUM(dep_delay_sum)::DECIMAL / NULLIF(SUM(dep_delay_cnt), 0) as avg_departure_delay,
+    SUM(arr_delay_sum)::DECIMAL / NULLIF(SUM(arr_delay_cnt), 0) as avg_arrival_delay
+FROM agg_flights_weather
 GROUP BY 1
-ORDER BY avg_departure_delay DESC;
\ No newline at end of file
+ORDER BY avg_departure_delay DESC;
@@ -1,23 +1,24 @@
 -- Maskapai paling Terdampak Salju --
+-- Dibaca dari tabel rollup agg_flights_weather (di-refresh oleh loader), bukan fact_flights
 
 SELECT 
     da.airline, -- Mengambil nama maskapai dari tabel dimensi
     
-    COUNT(*) as jumlah_penerbangan_salju,
+    SUM(agg.n_flights)::BIGINT as jumlah_penerbangan_salju,
     
     -- Rata-rata keterlambatan keberangkatan
-    ROUND(AVG(ff.dep_delay), 2) as rata_rata_delay_menit,
+    ROUND(SUM(agg.dep_delay_sum)::DECIMAL / NULLIF(SUM(agg.dep_delay_cnt), 0), 2) as rata_rata_delay_menit,
     
     -- Waktu Taxi-Out (Indikator proses De-icing)
-    ROUND(AVG(ff.taxi_out), 2) as rata_rata_waktu_taxi_menit, 
+    ROUND(SUM(agg.taxi_out_sum)::DECIMAL / NULLIF(SUM(agg.taxi_out_cnt), 0), 2) as rata_rata_waktu_taxi_menit, 
     
     -- Statistik Pembatalan
-    SUM(ff.cancelled) as jumlah_batal,
-    ROUND((SUM(ff.cancelled)::DECIMAL / COUNT(*)) * 100, 2) as persentase_pembatalan
+    SUM(agg.cancelled_sum) as jumlah_batal,
+    ROUND((SUM(agg.cancelled_sum)::DECIMAL / SUM(agg.n_flights)) * 100, 2) as persentase_pembatalan
 
-FROM fact_flights ff
-JOIN dim_airline da ON ff.airline_key = da.airline_key -- Join ke tabel dimensi
-WHERE ff.origin_snowfall_cm > 0 -- Filter hanya saat bersalju
+FROM agg_flights_weather agg
+JOIN dim_airline da ON agg.airline_key = da.airline_key -- Join ke tabel dimensi
+WHERE agg.is_snow -- Filter hanya saat bersalju (origin_snowfall_cm > 0)
 GROUP BY 1
-HAVING COUNT(*) > 50 -- Mengabaikan maskapai dengan sampel data terlalu sedikit
-ORDER BY rata_rata_delay_menit DESC;
\ No newline at end of file
+HAVING SUM(agg.n_flights) > 50 -- Mengabaikan maskapai dengan sampel data terlalu sedikit
+ORDER BY rata_rata_delay_menit DESC;